@@ -0,0 +1,553 @@
+#!/usr/bin/env python3
+"""Asesor de índices y perfilador de consultas para replikstore.db.
+
+1. Reúne las consultas a analizar: las capturadas con `capture` (cualquier
+   script que abra la base con readonly_db.py escribe sus sentencias en el
+   registro de SQLITE_QUERY_LOG), las de un fichero .sql (p. ej. las del
+   backend de Node) y, con --builtin, un conjunto de consultas típicas de
+   informes.
+2. Agrupa las consultas por forma (literales sustituidos por `?`) y ejecuta
+   EXPLAIN QUERY PLAN sobre un ejemplo de cada una.
+3. Marca los recorridos completos (SCAN sin índice) de tablas con más de
+   --min-rows filas y propone un índice: columnas de igualdad, después una
+   de rango u orden, y el resto de columnas usadas si caben (índice que
+   cubre la consulta).
+4. Con --benchmark mide cada propuesta en una copia temporal de la base
+   escalada --scale veces (o en --bench-db): tiempo antes y después de
+   crear el índice y el plan resultante. La base original no se modifica.
+
+Uso:
+    python3 Asesor_Indices.py capture --log consultas.jsonl -- python3 Consultar_BDD.py
+    python3 Asesor_Indices.py analyze --log consultas.jsonl --builtin
+    python3 Asesor_Indices.py analyze --queries consultas.sql --benchmark --scale 200
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from Consultar_BDD import has_rowid, list_tables, quote, row_count
+from readonly_db import DEFAULT_DB, QUERY_LOG_ENV, connect_readonly
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+QUERY_LOG = os.path.join(ROOT, "consultas.jsonl")
+STORE_DB = os.path.join(ROOT, "backend", "basedeDatos", "bd_replikstore.db")
+
+MIN_ROWS = 1000           # por debajo, un SCAN no merece un índice
+MAX_INDEX_COLUMNS = 6     # más columnas y el índice deja de compensar
+SCALE = 100
+MAX_SCALED_ROWS = 2_000_000
+REPEAT = 5
+
+# Consultas habituales de los informes, agrupadas por esquema: las tablas de
+# la tienda (bd_replikstore.db, simuladores/esquema_tienda.py) y las de la API
+# (replikstore.db). Con --builtin sólo se usan los grupos cuyas tablas existen
+# en la base analizada.
+BUILTIN_QUERIES = OrderedDict([
+    ("tienda", [
+        "SELECT fecha_hora, temperatura FROM registro_temperaturas "
+        "WHERE sensor_id = 1 AND fecha_hora >= 1748116775 ORDER BY fecha_hora",
+        "SELECT t.temperatura, t.fecha_hora FROM registro_temperaturas t "
+        "JOIN sensores_temperatura s ON s.id = t.sensor_id WHERE s.nevera_id = 1",
+        "SELECT v.id, v.total FROM ventas v WHERE v.fecha BETWEEN '2024-05-20' AND '2024-05-24'",
+        "SELECT d.producto_id, d.cantidad, d.precio FROM ventas v "
+        "JOIN detalle_venta d ON d.venta_id = v.id WHERE v.usuario_id = 2",
+        "SELECT producto_id, SUM(cantidad * precio) FROM detalle_venta GROUP BY producto_id",
+        "SELECT producto_id, SUM(cantidad) FROM ingresos_stock "
+        "WHERE fecha_ingreso >= '2024-05-21' GROUP BY producto_id",
+        "SELECT tipo, descripcion, fecha_hora FROM alertas "
+        "WHERE neveras_id = 1 AND nivel = 'alta' ORDER BY fecha_hora DESC",
+    ]),
+    ("api", [
+        "SELECT id, name, price, stock FROM products WHERE category = 'Periféricos' ORDER BY price",
+        "SELECT id, name, stock FROM products WHERE stock < 5 ORDER BY stock",
+        "SELECT id, name, price FROM products ORDER BY created_at DESC LIMIT 20",
+        "SELECT id, username, role FROM users WHERE email = 'admin@replikstore.com'",
+        "SELECT id, password, role FROM users WHERE username = 'admin'",
+    ]),
+])
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_CLAUSE = re.compile(
+    r"\b(SELECT|FROM|JOIN|ON|WHERE|GROUP\s+BY|ORDER\s+BY|HAVING|LIMIT|UNION)\b", re.I
+)
+# El alias va en una búsqueda hacia delante: sin alias, `FROM a JOIN b` no
+# debe consumir el JOIN de la tabla siguiente
+_TABLE_REF = re.compile(r"\b(?:FROM|JOIN)\s+\"?(\w+)\"?(?=(?:\s+(?:AS\s+)?(\w+))?)", re.I)
+_COLUMN_REF = re.compile(r"(?:\b(\w+)\s*\.\s*)?\"?\b([A-Za-z_]\w*)\b\"?")
+_STAR = re.compile(r"(?:^|,)\s*(?:(\w+)\s*\.\s*)?\*\s*(?=,|$)")
+_EARLY_EXIT = re.compile(r"\bLIMIT\b|\b(?:MIN|MAX)\s*\(\s*rowid\s*\)", re.I)
+_PLAN_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?(.*)$")
+_EQ_AFTER = re.compile(r"^(==?(?!=)|IN\b|IS\b)", re.I)
+_RANGE_AFTER = re.compile(r"^(<=|>=|<(?!>)|>|BETWEEN\b)", re.I)
+_KEYWORDS = {
+    "where", "join", "inner", "left", "right", "cross", "outer", "natural", "on",
+    "group", "order", "limit", "having", "union", "using", "as", "set", "values",
+}
+_SKIP_PREFIXES = ("PRAGMA", "BEGIN", "COMMIT", "ROLLBACK", "EXPLAIN", "ANALYZE")
+
+
+def normalize(sql: str) -> str:
+    """Forma de la consulta: espacios colapsados y literales sustituidos por `?`."""
+    sql = " ".join(sql.split()).rstrip(";").strip()
+    return _NUMBER.sub("?", _STRING.sub("?", sql))
+
+
+def _mask_strings(sql: str) -> str:
+    # Misma longitud que el original para conservar las posiciones
+    return _STRING.sub(lambda m: "'" + "_" * (len(m.group()) - 2) + "'", sql)
+
+
+def is_candidate(sql: str) -> bool:
+    head = sql.lstrip().upper()
+    if head.startswith(_SKIP_PREFIXES):
+        return False
+    if "SQLITE_MASTER" in head or "SQLITE_STAT" in head or "SQLITE_SCHEMA" in head:
+        return False
+    return head.startswith(("SELECT", "WITH", "UPDATE", "DELETE"))
+
+
+def load_log(path: str) -> List[str]:
+    """Sentencias de un registro JSONL escrito por readonly_db.query_logger."""
+    statements = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                statements.append(json.loads(line)["sql"])
+    return statements
+
+
+def load_sql_file(path: str) -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    text = re.sub(r"--[^\n]*", "", text)
+    return [s.strip() for s in text.split(";") if s.strip()]
+
+
+def collect(statements: Iterable[str]) -> "OrderedDict[str, dict]":
+    """Agrupa por forma, conservando el primer ejemplo y el número de ejecuciones."""
+    queries: "OrderedDict[str, dict]" = OrderedDict()
+    for sql in statements:
+        if not is_candidate(sql):
+            continue
+        shape = normalize(sql)
+        entry = queries.setdefault(shape, {"sql": " ".join(sql.split()).rstrip(";"),
+                                           "count": 0})
+        entry["count"] += 1
+    return queries
+
+
+class Schema:
+    """Columnas, clave rowid y tamaño estimado de cada tabla."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.columns: Dict[str, List[str]] = {}
+        self.rowid_alias: Dict[str, Optional[str]] = {}
+        self.rows: Dict[str, Optional[int]] = {}
+        for table in list_tables(conn):
+            if table.startswith("sqlite_"):
+                continue
+            info = conn.execute(f"PRAGMA table_info({quote(table)})").fetchall()
+            self.columns[table] = [row[1] for row in info]
+            pks = [row for row in info if row[5]]
+            alias = pks[0][1] if len(pks) == 1 and pks[0][2].upper() == "INTEGER" else None
+            self.rowid_alias[table] = alias if has_rowid(conn, table) else None
+            self.rows[table] = row_count(conn, table)[0]
+
+
+def builtin_queries(schema: Schema) -> Tuple[List[str], Dict[str, List[str]]]:
+    """Consultas de BUILTIN_QUERIES aplicables a `schema` y tablas que faltan
+    en cada grupo omitido."""
+    queries, skipped = [], {}
+    for group, statements in BUILTIN_QUERIES.items():
+        tables = {m.group(1) for sql in statements for m in _TABLE_REF.finditer(sql)}
+        missing = sorted(t for t in tables if t not in schema.columns)
+        if missing:
+            skipped[group] = missing
+        else:
+            queries += statements
+    return queries, skipped
+
+
+def table_refs(sql: str, schema: Schema) -> Dict[str, str]:
+    """Alias (y nombre) -> tabla para las tablas de FROM/JOIN."""
+    refs = {}
+    for match in _TABLE_REF.finditer(_mask_strings(sql)):
+        table, alias = match.group(1), match.group(2)
+        if table not in schema.columns:
+            continue
+        refs[table] = table
+        if alias and alias.lower() not in _KEYWORDS:
+            refs[alias] = table
+    return refs
+
+
+def _clause_at(clauses: List[Tuple[int, str]], pos: int) -> str:
+    current = ""
+    for start, name in clauses:
+        if start > pos:
+            break
+        current = name
+    return current
+
+
+def column_roles(sql: str, table: str, refs: Dict[str, str], schema: Schema) -> dict:
+    """Clasifica las columnas de `table` según dónde aparecen en la consulta.
+
+    Heurística sobre el texto, sin un parser SQL completo: basta para las
+    consultas de informes (sin subconsultas correlacionadas).
+    """
+    masked = _mask_strings(sql)
+    clauses = [(m.start(), " ".join(m.group(1).upper().split())) for m in _CLAUSE.finditer(masked)]
+    own = set(schema.columns[table])
+    aliases = {alias for alias, t in refs.items() if t == table}
+    others = set()
+    for alias, t in refs.items():
+        if t != table:
+            others.update(schema.columns[t])
+    roles = {"eq": [], "range": [], "order": [], "select": [], "star": False}
+
+    def add(role, column):
+        if column not in roles[role]:
+            roles[role].append(column)
+
+    select_list = re.search(r"\bSELECT\b(.*?)\bFROM\b", masked, re.I | re.S)
+    if select_list:
+        for star in _STAR.finditer(select_list.group(1).strip()):
+            if star.group(1) is None or star.group(1) in aliases:
+                roles["star"] = True
+
+    for match in _COLUMN_REF.finditer(masked):
+        qualifier, column = match.group(1), match.group(2)
+        if column not in own:
+            continue
+        if qualifier is not None and qualifier not in aliases:
+            continue
+        if qualifier is None and (column in others or column in refs):
+            continue  # ambigua o nombre de tabla
+        clause = _clause_at(clauses, match.start())
+        after = masked[match.end():].lstrip()
+        before = masked[:match.start()].rstrip()
+        if clause in ("WHERE", "ON"):
+            if _EQ_AFTER.match(after) or (before.endswith("=") and not before.endswith(("<=", ">=", "!="))):
+                add("eq", column)
+            elif _RANGE_AFTER.match(after) or before.endswith(("<", ">", "<=", ">=")):
+                add("range", column)
+            else:
+                add("select", column)
+        elif clause in ("GROUP BY", "ORDER BY"):
+            add("order", column)
+        elif clause in ("SELECT", "HAVING"):
+            add("select", column)
+    return roles
+
+
+def propose_index(table: str, roles: dict, schema: Schema) -> Optional[List[str]]:
+    """Columnas del índice propuesto, o None si no hay ninguna útil."""
+    rowid = schema.rowid_alias.get(table)
+    eq = [c for c in roles["eq"] if c != rowid]
+    ranges = [c for c in roles["range"] if c != rowid and c not in eq]
+    order = [c for c in roles["order"] if c != rowid and c not in eq]
+    if ranges:
+        key = eq + ranges[:1]
+    else:
+        key = eq + order
+    if not key:
+        return None
+    if not roles["star"]:
+        # El rowid va implícito en todo índice; el resto se añade para cubrir
+        covering = list(key)
+        for column in ranges + order + roles["select"]:
+            if column != rowid and column not in covering:
+                covering.append(column)
+        if len(covering) <= MAX_INDEX_COLUMNS:
+            return covering
+    return key
+
+
+def index_name(table: str, columns: List[str]) -> str:
+    return "idx_" + "_".join([table] + columns)
+
+
+def index_sql(table: str, columns: List[str]) -> str:
+    return (f"CREATE INDEX IF NOT EXISTS {quote(index_name(table, columns))} "
+            f"ON {quote(table)} ({', '.join(quote(c) for c in columns)})")
+
+
+def explain(conn: sqlite3.Connection, sql: str) -> List[str]:
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+
+
+def analyze(conn: sqlite3.Connection, queries: "OrderedDict[str, dict]",
+            min_rows: int = MIN_ROWS) -> List[dict]:
+    """Plan de cada consulta, recorridos completos marcados y propuestas."""
+    schema = Schema(conn)
+    report = []
+    for shape, entry in queries.items():
+        sql = entry["sql"]
+        item = {"shape": shape, "sql": sql, "count": entry["count"],
+                "plan": [], "scans": [], "error": None}
+        try:
+            item["plan"] = explain(conn, sql)
+        except sqlite3.Error as e:
+            item["error"] = str(e)
+            report.append(item)
+            continue
+        refs = table_refs(sql, schema)
+        for detail in item["plan"]:
+            match = _PLAN_SCAN.match(detail)
+            if not match or "INDEX" in match.group(3):
+                continue
+            table = refs.get(match.group(2) or match.group(1))
+            if table is None:
+                continue  # subconsulta, CTE o vista
+            rows = schema.rows.get(table) or 0
+            if rows < min_rows:
+                continue
+            columns = propose_index(table, column_roles(sql, table, refs, schema), schema)
+            if columns is None and _EARLY_EXIT.search(sql):
+                continue  # el recorrido se corta pronto (LIMIT, MIN/MAX de rowid)
+            item["scans"].append({
+                "table": table, "rows": rows, "detail": detail,
+                "index": columns, "index_sql": index_sql(table, columns) if columns else None,
+            })
+        item["temp_btree"] = [d for d in item["plan"] if d.startswith("USE TEMP B-TREE")]
+        report.append(item)
+    return report
+
+
+def scaled_copy(src: str, dest: str, scale: int = SCALE,
+                max_rows: int = MAX_SCALED_ROWS) -> Dict[str, Tuple[int, int]]:
+    """Copia `src` en `dest` multiplicando las filas de cada tabla por `scale`.
+
+    Las filas nuevas duplican las existentes (con rowid nuevo), así que las
+    claves foráneas siguen apuntando a filas válidas. Las tablas con columnas
+    UNIQUE sólo crecen hasta donde lo permiten (INSERT OR IGNORE).
+    """
+    source = connect_readonly(src)
+    target = sqlite3.connect(dest, isolation_level=None)
+    try:
+        source.backup(target)
+        target.execute("PRAGMA journal_mode = OFF")
+        target.execute("PRAGMA synchronous = OFF")
+        schema = Schema(target)
+        sizes = {}
+        for table, columns in schema.columns.items():
+            before = target.execute(f"SELECT COUNT(*) FROM {quote(table)}").fetchone()[0]
+            goal = min(before * scale, max(before, max_rows))
+            cols = ", ".join(quote(c) for c in columns if c != schema.rowid_alias[table])
+            current = before
+            target.execute("BEGIN")
+            while 0 < current < goal:
+                target.execute(
+                    f"INSERT OR IGNORE INTO {quote(table)} ({cols}) "
+                    f"SELECT {cols} FROM {quote(table)} LIMIT ?", (goal - current,)
+                )
+                grown = target.execute(f"SELECT COUNT(*) FROM {quote(table)}").fetchone()[0]
+                if grown == current:
+                    break
+                current = grown
+            target.execute("COMMIT")
+            sizes[table] = (before, current)
+        if target.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+            target.execute("ANALYZE")  # las estadísticas copiadas ya no valen
+        return sizes
+    finally:
+        source.close()
+        target.close()
+
+
+def time_query(conn: sqlite3.Connection, sql: str, repeat: int = REPEAT) -> float:
+    """Mediana en segundos de ejecutar `sql` y leer todas sus filas."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(sql).fetchall()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+
+def benchmark(db: str, report: List[dict], repeat: int = REPEAT) -> List[dict]:
+    """Crea cada índice propuesto en `db`, mide sus consultas y lo elimina."""
+    proposals: "OrderedDict[str, dict]" = OrderedDict()
+    for item in report:
+        if not item["sql"].lstrip().upper().startswith(("SELECT", "WITH")):
+            continue  # UPDATE/DELETE no se ejecutan en el benchmark
+        for scan in item["scans"]:
+            if scan["index"]:
+                entry = proposals.setdefault(scan["index_sql"], {
+                    "table": scan["table"], "columns": scan["index"],
+                    "index_sql": scan["index_sql"], "queries": [],
+                })
+                if item["sql"] not in entry["queries"]:
+                    entry["queries"].append(item["sql"])
+
+    conn = sqlite3.connect(db, isolation_level=None)
+    has_stats = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+    ).fetchone() is not None
+    results = []
+    try:
+        for proposal in proposals.values():
+            name = index_name(proposal["table"], proposal["columns"])
+            before = [time_query(conn, sql, repeat) for sql in proposal["queries"]]
+            started = time.perf_counter()
+            conn.execute(proposal["index_sql"])
+            if has_stats:
+                conn.execute(f"ANALYZE {quote(name)}")
+            build = time.perf_counter() - started
+            after = [time_query(conn, sql, repeat) for sql in proposal["queries"]]
+            plans = [explain(conn, sql) for sql in proposal["queries"]]
+            conn.execute(f"DROP INDEX {quote(name)}")
+            results.append(dict(proposal, build_s=build, queries=[
+                {"sql": sql, "before_s": b, "after_s": a,
+                 "speedup": b / a if a else None, "plan": plan,
+                 "used": any(name in detail for detail in plan)}
+                for sql, b, a, plan in zip(proposal["queries"], before, after, plans)
+            ]))
+    finally:
+        conn.close()
+    return results
+
+
+def print_report(report: List[dict], results: Optional[List[dict]],
+                 sizes: Optional[Dict[str, Tuple[int, int]]]):
+    flagged = [item for item in report if item["scans"]]
+    print(f"Consultas analizadas: {len(report)}; con recorridos completos: {len(flagged)}")
+    for item in report:
+        print(f"\n[{item['count']}x] {item['shape']}")
+        if item["error"]:
+            print(f"  omitida: {item['error']}")
+            continue
+        for detail in item["plan"]:
+            print(f"  plan: {detail}")
+        for scan in item["scans"]:
+            print(f"  ! SCAN de {scan['table']} (~{scan['rows']} filas)")
+            print(f"    propuesta: {scan['index_sql'] or 'ninguna (no hay columnas filtradas ni ordenadas)'}")
+        for detail in item["temp_btree"]:
+            print(f"  nota: {detail}")
+    if sizes:
+        print("\nCopia escalada:")
+        for table, (before, after) in sizes.items():
+            print(f"  {table}: {before} -> {after} filas")
+    if results is not None:
+        print("\nBenchmark de propuestas:")
+        if not results:
+            print("  (sin propuestas)")
+        for result in results:
+            print(f"\n  {result['index_sql']}  (creación {result['build_s'] * 1000:.0f} ms)")
+            for query in result["queries"]:
+                speedup = f"x{query['speedup']:.1f}" if query["speedup"] else "-"
+                if not query["used"]:
+                    speedup = "sin uso"
+                print(f"    {query['before_s'] * 1000:9.2f} ms -> {query['after_s'] * 1000:9.2f} ms"
+                      f"  {speedup:>7}  {normalize(query['sql'])[:90]}")
+                for detail in query["plan"]:
+                    print(f"      plan: {detail}")
+
+
+def cmd_capture(args) -> int:
+    if not args.command:
+        print("Falta el comando a ejecutar tras --", file=sys.stderr)
+        return 2
+    env = dict(os.environ, **{QUERY_LOG_ENV: os.path.abspath(args.log)})
+    returncode = subprocess.run(args.command, env=env).returncode
+    count = len(load_log(args.log)) if os.path.exists(args.log) else 0
+    print(f"{count} sentencias registradas en {args.log}")
+    return returncode
+
+
+def cmd_analyze(args) -> int:
+    statements = []
+    if args.log and os.path.exists(args.log):
+        statements += load_log(args.log)
+    for path in args.queries or []:
+        statements += load_sql_file(path)
+    use_builtin = args.builtin or not statements
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db, sizes, results = args.db, None, None
+        if args.benchmark:
+            # Con --benchmark se analiza la base escalada: los recorridos que
+            # importan son los que aparecerán cuando las tablas crezcan
+            db = args.bench_db
+            if not db:
+                db = os.path.join(tmpdir, "escalada.db")
+                sizes = scaled_copy(args.db, db, args.scale, args.max_rows)
+        # trace propio: las consultas del asesor no van al registro de capture
+        conn = connect_readonly(db, trace=lambda sql: None)
+        try:
+            if use_builtin:
+                builtin, skipped = builtin_queries(Schema(conn))
+                for group, missing in skipped.items():
+                    print(f"Consultas de '{group}' omitidas: faltan {', '.join(missing)} en {db}",
+                          file=sys.stderr)
+                if not builtin and not statements:
+                    print(f"Ninguna consulta de --builtin se aplica a {db}; usa --db con la "
+                          f"base de la tienda ({os.path.relpath(STORE_DB, ROOT)}) o la de la API "
+                          f"({os.path.relpath(DEFAULT_DB, ROOT)}), o pasa --log/--queries",
+                          file=sys.stderr)
+                    return 2
+                statements += builtin
+            report = analyze(conn, collect(statements), args.min_rows)
+        finally:
+            conn.close()
+        if args.benchmark:
+            results = benchmark(db, report, args.repeat)
+            if args.keep_copy and sizes is not None:
+                shutil.copy(db, args.keep_copy)
+
+    if args.json:
+        json.dump({"report": report, "scaled": sizes, "benchmark": results},
+                  sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_report(report, results, sizes)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    capture = sub.add_parser("capture", help="ejecuta un comando registrando sus consultas")
+    capture.add_argument("--log", default=QUERY_LOG)
+    capture.add_argument("command", nargs=argparse.REMAINDER)
+
+    analyze_p = sub.add_parser("analyze", help="planes, recorridos completos y propuestas")
+    analyze_p.add_argument("--db", default=DEFAULT_DB)
+    analyze_p.add_argument("--log", default=QUERY_LOG, help="registro JSONL de `capture`")
+    analyze_p.add_argument("--queries", action="append", help="fichero .sql (repetible)")
+    analyze_p.add_argument("--builtin", action="store_true",
+                           help="añade las consultas de informes del esquema de --db")
+    analyze_p.add_argument("--min-rows", type=int, default=MIN_ROWS)
+    analyze_p.add_argument("--benchmark", action="store_true")
+    analyze_p.add_argument("--bench-db", help="base ya poblada en la que medir, p. ej. con "
+                           "simuladores/generador_datos.py (se modifica)")
+    analyze_p.add_argument("--scale", type=int, default=SCALE)
+    analyze_p.add_argument("--max-rows", type=int, default=MAX_SCALED_ROWS)
+    analyze_p.add_argument("--repeat", type=int, default=REPEAT)
+    analyze_p.add_argument("--keep-copy", help="guarda aquí la copia escalada")
+    analyze_p.add_argument("--json", action="store_true")
+
+    args = parser.parse_args()
+    if args.cmd == "capture":
+        if args.command and args.command[0] == "--":
+            args.command = args.command[1:]
+        sys.exit(cmd_capture(args))
+    sys.exit(cmd_analyze(args))
+
+
+if __name__ == "__main__":
+    main()
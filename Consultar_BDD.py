@@ -1,37 +1,297 @@
 #!/usr/bin/env python3
+"""Inspecciona las bases de datos SQLite de backend/basedeDatos.
+
+Cada base se procesa en un proceso del pool con una conexión de solo
+lectura (ver readonly_db.py); las filas se leen con
+`fetchmany` y se escriben según se leen. El número de filas de cada tabla
+se toma de `sqlite_stat1` (si se ejecutó ANALYZE) o se estima con el rango
+de rowid, sin recorrer la tabla; `--exact-counts` fuerza COUNT(*).
+
+Uso:
+    python3 Consultar_BDD.py                          # texto en resultados.txt
+    python3 Consultar_BDD.py --format jsonl -o resultados.jsonl
+    python3 Consultar_BDD.py --format csv -o resultados_csv --limit 1000
+    python3 Consultar_BDD.py --sample 20              # 20 filas al azar por tabla
+"""
+import argparse
+import csv
+import json
 import os
+import random
+import shutil
 import sqlite3
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+from readonly_db import connect_readonly, read_snapshot
 
 ROOT = os.path.dirname(os.path.abspath(__file__))
 DB_DIR = os.path.join(ROOT, "backend", "basedeDatos")
 OUTPUT = os.path.join(ROOT, "resultados.txt")
+BATCH_SIZE = 500
+# --sample: rangos de rowid pequeños se sortean con ORDER BY random(); en los
+# grandes se sortean SAMPLE_OVERDRAW candidatos por fila pedida y ronda
+SAMPLE_SCAN_SPAN = 10_000
+SAMPLE_OVERDRAW = 2
+SAMPLE_ROUNDS = 4
+SAMPLE_CHUNK = 500
+
+
+def quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def list_tables(conn: sqlite3.Connection) -> List[str]:
+    return [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table';")]
+
+
+def has_rowid(conn: sqlite3.Connection, table: str) -> bool:
+    try:
+        conn.execute(f"SELECT rowid FROM {quote(table)} LIMIT 0")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def row_count(conn: sqlite3.Connection, table: str, exact: bool = False) -> Tuple[Optional[int], str]:
+    """Número de filas y su origen: `exacto`, `sqlite_stat1` o `rowid` (cota superior)."""
+    if exact:
+        return conn.execute(f"SELECT COUNT(*) FROM {quote(table)}").fetchone()[0], "exacto"
+    try:
+        row = conn.execute(
+            "SELECT stat FROM sqlite_stat1 WHERE tbl = ? ORDER BY idx IS NOT NULL LIMIT 1",
+            (table,)
+        ).fetchone()
+        if row is not None:
+            return int(row[0].split()[0]), "sqlite_stat1"
+    except sqlite3.OperationalError:
+        pass  # Sin ANALYZE no existe sqlite_stat1
+    if has_rowid(conn, table):
+        low, high = conn.execute(f"SELECT MIN(rowid), MAX(rowid) FROM {quote(table)}").fetchone()
+        return (0 if low is None else high - low + 1), "rowid"
+    return None, "desconocido"
+
+
+def sample_rowids(conn: sqlite3.Connection, table: str, n: int) -> List[int]:
+    """Hasta `n` rowids al azar que existen de verdad.
+
+    Se sortean rowids del rango [MIN, MAX] con sobremuestreo, porque los
+    huecos (filas borradas) no existen; con pocos aciertos tras SAMPLE_ROUNDS
+    rondas se recurre a ORDER BY random(), que recorre la tabla.
+    """
+    low, high = conn.execute(f"SELECT MIN(rowid), MAX(rowid) FROM {quote(table)}").fetchone()
+    if low is None:
+        return []
+    span = high - low + 1
+    if span <= SAMPLE_SCAN_SPAN:
+        return _random_rowids(conn, table, n)
+    found, tried = set(), set()
+    for _ in range(SAMPLE_ROUNDS):
+        missing = n - len(found)
+        if missing <= 0 or len(tried) >= span:
+            break
+        draw = min(span - len(tried), missing * SAMPLE_OVERDRAW)
+        # draw + len(tried) valores distintos contienen al menos `draw` sin probar
+        pool = random.sample(range(low, high + 1), min(span, draw + len(tried)))
+        candidates = [rowid for rowid in pool if rowid not in tried][:draw]
+        tried.update(candidates)
+        for start in range(0, len(candidates), SAMPLE_CHUNK):
+            chunk = candidates[start:start + SAMPLE_CHUNK]
+            found.update(row[0] for row in conn.execute(
+                f"SELECT rowid FROM {quote(table)} WHERE rowid IN ({','.join('?' * len(chunk))})",
+                chunk
+            ))
+    if len(found) < n and len(tried) < span:
+        return _random_rowids(conn, table, n)
+    return random.sample(sorted(found), min(n, len(found)))
+
+
+def _random_rowids(conn: sqlite3.Connection, table: str, n: int) -> List[int]:
+    return [row[0] for row in conn.execute(
+        f"SELECT rowid FROM {quote(table)} ORDER BY random() LIMIT ?", (n,)
+    )]
+
+
+def iter_rows(conn: sqlite3.Connection, table: str, limit: int,
+              sample: Optional[int]) -> Tuple[List[str], Iterator[tuple]]:
+    """Columnas y filas de la tabla, leídas en lotes con fetchmany."""
+    cursor = conn.cursor()
+    if sample and has_rowid(conn, table):
+        rowids = sorted(sample_rowids(conn, table, sample))
+        placeholders = ",".join("?" * len(rowids)) or "NULL"
+        cursor.execute(
+            f"SELECT * FROM {quote(table)} WHERE rowid IN ({placeholders}) ORDER BY rowid", rowids
+        )
+    elif sample:
+        # Tablas WITHOUT ROWID: no hay rango que sortear
+        cursor.execute(f"SELECT * FROM {quote(table)} ORDER BY random() LIMIT ?", (sample,))
+    else:
+        cursor.execute(f"SELECT * FROM {quote(table)} LIMIT ?", (sample or limit,))
+    columns = [desc[0] for desc in cursor.description]
+
+    def batches():
+        while True:
+            rows = cursor.fetchmany(BATCH_SIZE)
+            if not rows:
+                break
+            yield from rows
+
+    return columns, batches()
+
+
+def _cell(value):
+    if isinstance(value, bytes):
+        return value.hex()
+    return value
+
+
+class TextWriter:
+    def __init__(self, path: str):
+        self.out = open(path, "w", encoding="utf-8")
+
+    def database(self, dbfile: str):
+        self.out.write("\n==============================\n")
+        self.out.write(f"Base de datos: {dbfile}\n")
+        self.out.write("==============================\n")
+
+    def table(self, dbfile: str, table: str, count, source: str, columns, rows):
+        self.out.write(f"\n--- Tabla: {table} ---\n")
+        self.out.write(f"Filas ({source}): {count if count is not None else '?'}\n")
+        self.out.write("\t".join(columns) + "\n")
+        for row in rows:
+            self.out.write("\t".join(str(x) for x in row) + "\n")
+
+    def error(self, message: str):
+        self.out.write(message + "\n")
+
+    def close(self):
+        self.out.close()
+
+
+class JsonlWriter:
+    def __init__(self, path: str):
+        self.out = open(path, "w", encoding="utf-8")
+
+    def database(self, dbfile: str):
+        pass
+
+    def table(self, dbfile: str, table: str, count, source: str, columns, rows):
+        self.out.write(json.dumps({"db": dbfile, "table": table, "row_count": count,
+                                   "row_count_source": source, "columns": columns},
+                                  ensure_ascii=False) + "\n")
+        for row in rows:
+            record = {"db": dbfile, "table": table,
+                      "row": {c: _cell(v) for c, v in zip(columns, row)}}
+            self.out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def error(self, message: str):
+        self.out.write(json.dumps({"error": message}, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self.out.close()
+
+
+class CsvWriter:
+    """Un fichero por tabla, <salida>/<base>/<tabla>.csv, más <base>/_resumen.csv."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.dbdir = directory
+        self.summary = [("base", "tabla", "filas", "origen")]
+
+    def database(self, dbfile: str):
+        self.dbdir = os.path.join(self.directory, dbfile)
+        os.makedirs(self.dbdir, exist_ok=True)
+
+    def table(self, dbfile: str, table: str, count, source: str, columns, rows):
+        self.summary.append((dbfile, table, count, source))
+        path = os.path.join(self.dbdir, f"{table}.csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            writer.writerows([_cell(v) for v in row] for row in rows)
+
+    def error(self, message: str):
+        self.summary.append(("", "", None, message))
+
+    def close(self):
+        path = os.path.join(self.dbdir, "_resumen.csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(self.summary)
+
+
+WRITERS = {"text": TextWriter, "jsonl": JsonlWriter, "csv": CsvWriter}
+
+
+def inspect_database(dbpath: str, fmt: str, target: str, limit: int,
+                     sample: Optional[int], exact_counts: bool) -> str:
+    """Vuelca una base a `target` (fichero parcial o directorio). Se ejecuta en el pool."""
+    dbfile = os.path.basename(dbpath)
+    writer = WRITERS[fmt](target)
+    writer.database(dbfile)
+    try:
+        conn = connect_readonly(dbpath)
+        try:
+            for table in list_tables(conn):
+                try:
+                    # Un snapshot corto por tabla: recuento y filas consistentes
+                    with read_snapshot(conn):
+                        count, source = row_count(conn, table, exact_counts)
+                        columns, rows = iter_rows(conn, table, limit, sample)
+                        writer.table(dbfile, table, count, source, columns, rows)
+                except Exception as e:
+                    writer.error(f"Error consultando tabla {table}: {e}")
+        finally:
+            conn.close()
+    except Exception as e:
+        writer.error(f"Error abriendo base de datos {dbfile}: {e}")
+    writer.close()
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db-dir", default=DB_DIR)
+    parser.add_argument("--format", choices=sorted(WRITERS), default="text")
+    parser.add_argument("-o", "--output", help="fichero (text/jsonl) o directorio (csv)")
+    parser.add_argument("--limit", type=int, default=50, help="filas por tabla")
+    parser.add_argument("--sample", type=int, help="filas al azar por tabla en lugar de las primeras")
+    parser.add_argument("--exact-counts", action="store_true", help="contar con COUNT(*)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    default_output = {"text": OUTPUT, "jsonl": os.path.join(ROOT, "resultados.jsonl"),
+                      "csv": os.path.join(ROOT, "resultados_csv")}
+    output = args.output or default_output[args.format]
+    dbpaths = sorted(os.path.join(args.db_dir, f) for f in os.listdir(args.db_dir)
+                     if f.endswith(".db"))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if args.format == "csv":
+            targets = [output] * len(dbpaths)
+        else:
+            targets = [os.path.join(tmpdir, f"{i}.part") for i in range(len(dbpaths))]
+        with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(dbpaths) or 1))) as pool:
+            parts = list(pool.map(
+                inspect_database, dbpaths, [args.format] * len(dbpaths), targets,
+                [args.limit] * len(dbpaths), [args.sample] * len(dbpaths),
+                [args.exact_counts] * len(dbpaths)
+            ))
+
+        if args.format != "csv":
+            # Las partes se concatenan en el orden de las bases, no de llegada
+            with open(output, "w", encoding="utf-8") as out:
+                if args.format == "text":
+                    out.write(f"Consultando bases de datos en {args.db_dir}...\n")
+                for part in parts:
+                    with open(part, encoding="utf-8") as f:
+                        shutil.copyfileobj(f, out)
+                if args.format == "text":
+                    out.write(f"\nConsulta completada. Resultados en {os.path.basename(output)}\n")
+
+    print(f"Consulta completada. Resultados en {output}")
+
 
-with open(OUTPUT, "w", encoding="utf-8") as out:
-    out.write(f"Consultando bases de datos en {DB_DIR}...\n")
-    for dbfile in os.listdir(DB_DIR):
-        if dbfile.endswith(".db"):
-            dbpath = os.path.join(DB_DIR, dbfile)
-            out.write("\n==============================\n")
-            out.write(f"Base de datos: {dbfile}\n")
-            out.write("==============================\n")
-            try:
-                conn = sqlite3.connect(dbpath)
-                cursor = conn.cursor()
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-                tables = [row[0] for row in cursor.fetchall()]
-                for table in tables:
-                    out.write(f"\n--- Tabla: {table} ---\n")
-                    try:
-                        cursor.execute(f"SELECT * FROM {table} LIMIT 50;")
-                        columns = [desc[0] for desc in cursor.description]
-                        out.write("\t".join(columns) + "\n")
-                        for row in cursor.fetchall():
-                            out.write("\t".join(str(x) for x in row) + "\n")
-                    except Exception as e:
-                        out.write(f"Error consultando tabla {table}: {e}\n")
-                conn.close()
-            except Exception as e:
-                out.write(f"Error abriendo base de datos {dbfile}: {e}\n")
-    out.write("\nConsulta completada. Resultados en resultados.txt\n")
-
-print("Consulta completada. Puedes abrir resultados.txt para ver los datos.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Planificador de Blueprints sin editor.
+
+Compara la especificación declarativa (blueprint_spec.json) con un listado
+de assets del proyecto y el manifiesto de la última generación, y calcula
+las operaciones mínimas: crear, modificar (la especificación cambió) y
+eliminar (assets gestionados que ya no están en la especificación). No
+importa `unreal`; generate_blueprints.py aplica el plan dentro del editor.
+
+Los assets que no figuran en el manifiesto ni en la especificación no se
+tocan: no los creó el generador.
+
+Uso (dry-run):
+    python blueprint_planner.py --listing assets.txt --manifest Saved/blueprint_manifest.json
+    python blueprint_planner.py --listing assets.txt --output plan.json
+"""
+import argparse
+import hashlib
+import json
+import os
+
+SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'blueprint_spec.json')
+
+# Cambia si cambia la forma de crear los Blueprints: invalida el manifiesto
+GENERATOR_VERSION = 2
+
+
+def load_spec(path=SPEC_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def normalize_path(path, root='/Game'):
+    """
+    Normaliza una ruta para asegurar que comience con /Game/
+    """
+    if not path.startswith(root + '/'):
+        path = path.strip('/')
+        path = f'{root}/{path}'
+    return path
+
+
+def asset_path(object_path):
+    """
+    '/Game/A/BP_X.BP_X' (ruta de objeto, como en list_assets) -> '/Game/A/BP_X'
+    """
+    head, _, tail = object_path.rpartition('/')
+    return f"{head}/{tail.split('.', 1)[0]}"
+
+
+def desired_assets(spec):
+    """
+    Blueprints de la especificación, indexados por ruta del asset
+    """
+    root = spec.get('root', '/Game')
+    assets = {}
+    for entry in spec['blueprints']:
+        entry = dict(entry, folder=normalize_path(entry['folder'], root))
+        assets[f"{entry['folder']}/{entry['name']}"] = entry
+    return assets
+
+
+def spec_hash(entry):
+    """
+    Hash del contenido de una entrada (y de la versión del generador)
+    """
+    payload = json.dumps({'generator': GENERATOR_VERSION, 'spec': entry}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def plan(spec, listing, manifest, force=False):
+    """
+    Operaciones para llevar el proyecto a la especificación.
+
+    `listing`: rutas de assets existentes (de objeto o de paquete).
+    `manifest`: ruta -> hash de la última generación.
+    Devuelve {'operations': [...], 'manifest': {...}, 'unchanged': [...], 'root': ...};
+    'manifest' es el que quedará tras aplicar el plan.
+    """
+    root = spec.get('root', '/Game')
+    existing = {asset_path(p) for p in listing}
+    desired = desired_assets(spec)
+    operations = []
+    new_manifest = {}
+    unchanged = []
+
+    for path in sorted(set(manifest) - set(desired)):
+        if path in existing:
+            operations.append({'op': 'delete', 'path': path})
+
+    existing_dirs = {p.rpartition('/')[0] for p in existing}
+    for folder in spec.get('folders', []):
+        folder = normalize_path(folder, root)
+        if folder not in existing_dirs:
+            operations.append({'op': 'make_directory', 'path': folder})
+
+    for path, entry in desired.items():
+        digest = spec_hash(entry)
+        new_manifest[path] = digest
+        if path not in existing:
+            operations.append({'op': 'create', 'path': path, 'spec': entry})
+        elif force or manifest.get(path) != digest:
+            operations.append({'op': 'modify', 'path': path, 'spec': entry})
+        else:
+            unchanged.append(path)
+
+    return {'operations': operations, 'manifest': new_manifest, 'unchanged': unchanged,
+            'root': root}
+
+
+def summarize(result):
+    counts = {}
+    for operation in result['operations']:
+        counts[operation['op']] = counts.get(operation['op'], 0) + 1
+    return counts
+
+
+def load_listing(path):
+    """
+    Listado de assets: JSON (lista) o texto con una ruta por línea
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    if text.lstrip().startswith('['):
+        return json.loads(text)
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('assets', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Plan de Blueprints (dry-run, sin editor)')
+    parser.add_argument('--spec', default=SPEC_PATH)
+    parser.add_argument('--listing', help='assets existentes; sin él se asume un proyecto vacío')
+    parser.add_argument('--manifest', help='manifiesto de la última generación')
+    parser.add_argument('--force', action='store_true', help='rehacer todos los Blueprints')
+    parser.add_argument('--output', help='guarda el plan en JSON para aplicarlo en el editor')
+    args = parser.parse_args()
+
+    listing = load_listing(args.listing) if args.listing else []
+    manifest = load_manifest(args.manifest) if args.manifest else {}
+    result = plan(load_spec(args.spec), listing, manifest, args.force)
+
+    for operation in result['operations']:
+        print(f"{operation['op']:>14}  {operation['path']}")
+    print(f"{summarize(result) or 'sin cambios'}; {len(result['unchanged'])} sin cambios")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f'Plan guardado en {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Módulo `unreal` falso para probar los generadores de Blueprints sin editor.
+
+Guarda los assets en memoria (ruta -> clase padre) y cuenta las llamadas
+caras (guardados, creaciones, borrados). Uso en pruebas:
+
+    sys.modules['unreal'] = make_fake_unreal(saved_dir)
+"""
+import types
+
+
+def make_fake_unreal(saved_dir):
+    fake = types.ModuleType('unreal')
+    fake.assets = {}        # ruta del paquete -> nombre de la clase padre
+    fake.directories = set()
+    fake.functions = {}     # ruta del paquete -> funciones creadas
+    fake.calls = {'save_dirty_packages': 0, 'save_package': 0, 'create_asset': 0, 'delete': 0}
+
+    def uclass(name):
+        cls = type(name, (), {})
+        cls.static_class = staticmethod(lambda: name)
+        return cls
+
+    for name in ('Actor', 'Character', 'GameModeBase', 'WidgetBlueprint', 'Blueprint'):
+        setattr(fake, name, uclass(name))
+
+    class FakeBlueprint:
+        def __init__(self, path):
+            self.path = path
+
+        def get_blueprint_class(self):
+            return self
+
+        def get_outer(self):
+            return self.path
+
+    class EditorAssetLibrary:
+        @staticmethod
+        def does_asset_exist(path):
+            return path in fake.assets
+
+        @staticmethod
+        def delete_loaded_asset(path):
+            fake.calls['delete'] += 1
+            fake.functions.pop(path, None)
+            return fake.assets.pop(path, None) is not None
+
+        @staticmethod
+        def does_directory_exist(path):
+            return path in fake.directories or any(p.startswith(path + '/') for p in fake.assets)
+
+        @staticmethod
+        def make_directory(path):
+            fake.directories.add(path)
+            return True
+
+        @staticmethod
+        def list_assets(path, recursive=True, include_folder=False):
+            # Como el editor: rutas de objeto "/Game/A/BP_X.BP_X"
+            result = []
+            for asset in fake.assets:
+                folder, _, name = asset.rpartition('/')
+                if folder == path or (recursive and folder.startswith(path + '/')):
+                    result.append(f'{asset}.{name}')
+            return sorted(result)
+
+    class BlueprintFactory:
+        def __init__(self):
+            self.properties = {}
+
+        def set_editor_property(self, name, value):
+            self.properties[name] = value
+
+    class AssetTools:
+        def create_asset(self, name, folder, asset_class, factory):
+            fake.calls['create_asset'] += 1
+            path = f'{folder}/{name}'
+            fake.assets[path] = factory.properties['ParentClass']
+            return FakeBlueprint(path)
+
+    class AssetToolsHelpers:
+        @staticmethod
+        def get_asset_tools():
+            return AssetTools()
+
+    class Paths:
+        @staticmethod
+        def get_base_filename(path):
+            return path.rsplit('/', 1)[-1]
+
+        @staticmethod
+        def get_path(path):
+            return path.rsplit('/', 1)[0]
+
+        @staticmethod
+        def project_saved_dir():
+            return saved_dir
+
+    class EditorLoadingAndSavingUtils:
+        @staticmethod
+        def save_dirty_packages(save_map_packages, save_content_packages):
+            fake.calls['save_dirty_packages'] += 1
+            return True
+
+        @staticmethod
+        def save_package(package, path):
+            fake.calls['save_package'] += 1
+            return True
+
+    class EditorLevelLibrary:
+        @staticmethod
+        def editor_command(command):
+            pass
+
+    class BlueprintFunctionLibrary:
+        @staticmethod
+        def create_function(blueprint_class, name):
+            fake.functions.setdefault(blueprint_class.path, []).append(name)
+            return name
+
+        @staticmethod
+        def add_parameter(function, parameter):
+            pass
+
+        @staticmethod
+        def add_return_value(function, parameter):
+            pass
+
+    fake.EditorAssetLibrary = EditorAssetLibrary
+    fake.BlueprintFactory = BlueprintFactory
+    fake.AssetToolsHelpers = AssetToolsHelpers
+    fake.Paths = Paths
+    fake.EditorLoadingAndSavingUtils = EditorLoadingAndSavingUtils
+    fake.EditorLevelLibrary = EditorLevelLibrary
+    fake.BlueprintFunctionLibrary = BlueprintFunctionLibrary
+    fake.BlueprintVariable = lambda name, pin_type: (name, pin_type)
+    fake.EdGraphPinType = lambda *args: args
+    fake.EPinContainerType = types.SimpleNamespace(NONE=0)
+    fake.FEdGraphTerminalType = lambda: None
+    fake.Parameter = lambda name, type_name: (name, type_name)
+    return fake
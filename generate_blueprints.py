@@ -1,15 +1,11 @@
 import unreal
 import json
 import os
+import sys
 
-def normalize_path(path):
-    """
-    Normaliza una ruta para asegurar que comience con /Game/
-    """
-    if not path.startswith('/Game/'):
-        path = path.strip('/')
-        path = f'/Game/{path}'
-    return path
+from blueprint_planner import desired_assets, load_manifest, load_spec, normalize_path, plan
+
+MANIFEST_NAME = 'blueprint_manifest.json'
 
 def force_delete_asset(asset_path):
     """
@@ -25,13 +21,14 @@ def force_delete_asset(asset_path):
         print(f'Error al eliminar asset {asset_path}: {str(e)}')
     return False
 
-def create_blueprint(parent_class, name, folder_path, force_recreate=True):
+def create_blueprint(parent_class, name, folder_path, force_recreate=True, save=True, root='/Game'):
     """
-    Crea un nuevo Blueprint con la clase padre y nombre especificados
+    Crea un nuevo Blueprint con la clase padre y nombre especificados.
+    Con save=False no guarda: quien llama guarda todo al final.
     """
     try:
-        # Normalizar la ruta
-        full_path = normalize_path(folder_path)
+        # Normalizar la ruta (bajo el `root` de la especificación)
+        full_path = normalize_path(folder_path, root)
         package_path = f"{full_path}/{name}"
         
         # Si existe y force_recreate es True, intentar eliminar
@@ -61,12 +58,15 @@ def create_blueprint(parent_class, name, folder_path, force_recreate=True):
         )
         
         if new_blueprint is not None:
-            # Forzar la compilación del Blueprint
-            unreal.EditorLoadingAndSavingUtils.save_dirty_packages(
-                save_map_packages=True,
-                save_content_packages=True
-            )
-            print(f'Blueprint creado y guardado: {package_path}')
+            if save:
+                # Forzar la compilación del Blueprint
+                unreal.EditorLoadingAndSavingUtils.save_dirty_packages(
+                    save_map_packages=True,
+                    save_content_packages=True
+                )
+                print(f'Blueprint creado y guardado: {package_path}')
+            else:
+                print(f'Blueprint creado: {package_path}')
             return new_blueprint
         else:
             print(f'Error al crear Blueprint: {package_path}')
@@ -89,172 +89,191 @@ def clean_directory(directory_path):
     except Exception as e:
         print(f'Error al limpiar directorio {directory_path}: {str(e)}')
 
-def setup_digital_twin():
+def default_manifest_path():
+    return os.path.join(unreal.Paths.project_saved_dir(), MANIFEST_NAME)
+
+def save_manifest(path, assets):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'assets': assets}, f, indent=2, sort_keys=True)
+
+def add_blueprint_members(blueprint, entry):
     """
-    Configura todos los Blueprints necesarios para el gemelo digital
+    Añade al Blueprint las variables y funciones de su especificación
     """
     try:
-        # Limpiar directorios existentes
-        base_folders = [
-            'Blueprints/Core',
-            'Blueprints/Security',
-            'Blueprints/Inventory',
-            'Blueprints/Customer',
-            'Blueprints/Layout',
-            'Blueprints/Help'
-        ]
-        
-        print('Limpiando directorios existentes...')
-        for folder in base_folders:
-            path = normalize_path(folder)
-            clean_directory(path)
-            if not unreal.EditorAssetLibrary.does_directory_exist(path):
-                unreal.EditorAssetLibrary.make_directory(path)
-                print(f'Directorio creado: {path}')
+        blueprint_class = blueprint.get_blueprint_class()
         
-        # Forzar una recolección de basura
-        unreal.EditorLevelLibrary.editor_command('GC.CollectGarbage')
-        
-        print('Creando nuevos Blueprints...')
-        
-        # Crear GameMode principal
-        game_mode = create_blueprint(
-            unreal.GameModeBase.static_class(),
-            'BP_DigitalTwinGameMode',
-            '/Game/Blueprints/Core',
-            force_recreate=True
-        )
-        
-        # Definir sistemas principales
-        systems = {
-            'Blueprints/Security': {
-                'BP_SecurityCamera': unreal.Actor.static_class(),
-                'BP_SecuritySystem': unreal.Actor.static_class()
-            },
-            'Blueprints/Inventory': {
-                'BP_InventoryManager': unreal.Actor.static_class(),
-                'BP_Product': unreal.Actor.static_class()
-            },
-            'Blueprints/Customer': {
-                'BP_CustomerSimulation': unreal.Actor.static_class(),
-                'BP_VirtualCustomer': unreal.Character.static_class()
-            },
-            'Blueprints/Layout': {
-                'BP_LayoutEditor': unreal.Actor.static_class(),
-                'BP_LayoutValidator': unreal.Actor.static_class()
-            },
-            'Blueprints/Help': {
-                'WBP_HelpSystem': unreal.WidgetBlueprint.static_class(),
-                'BP_TutorialManager': unreal.Actor.static_class()
-            }
-        }
-        
-        created_blueprints = {}
+        for variable in entry.get('variables', []):
+            unreal.BlueprintVariable(
+                variable['Name'],
+                unreal.EdGraphPinType(
+                    variable['Type'].lower(),
+                    'ESPMode::Type::ThreadSafe',
+                    None,
+                    unreal.EPinContainerType.NONE,
+                    False,
+                    unreal.FEdGraphTerminalType()
+                )
+            )
         
-        # Crear Blueprints para cada sistema
-        for folder_path, blueprints in systems.items():
-            normalized_path = normalize_path(folder_path)
-            folder_name = folder_path.split('/')[-1]
-            created_blueprints[folder_name] = {}
+        for func in entry.get('functions', []):
+            function = unreal.BlueprintFunctionLibrary.create_function(
+                blueprint_class,
+                func['name']
+            )
             
-            for bp_name, parent_class in blueprints.items():
-                bp = create_blueprint(parent_class, bp_name, normalized_path, force_recreate=True)
-                if bp is not None:
-                    created_blueprints[folder_name][bp_name] = bp
-        
-        # Forzar guardado de todos los paquetes
+            # Añadir inputs y outputs
+            for input_name, input_type in func['inputs']:
+                unreal.BlueprintFunctionLibrary.add_parameter(
+                    function,
+                    unreal.Parameter(input_name, input_type)
+                )
+            
+            for output_name, output_type in func['outputs']:
+                unreal.BlueprintFunctionLibrary.add_return_value(
+                    function,
+                    unreal.Parameter(output_name, output_type)
+                )
+    except Exception as e:
+        print(f"Error al añadir variables y funciones a {entry['name']}: {str(e)}")
+
+def build_blueprint(entry, force_recreate=False, root='/Game'):
+    """
+    Crea (sin guardar) el Blueprint descrito por una entrada de la especificación
+    """
+    parent_class = getattr(unreal, entry['parent']).static_class()
+    bp = create_blueprint(parent_class, entry['name'], entry['folder'],
+                          force_recreate=force_recreate, save=False, root=root)
+    if bp is not None and (entry.get('variables') or entry.get('functions')):
+        add_blueprint_members(bp, entry)
+    return bp
+
+def list_project_assets(spec, manifest):
+    """
+    Assets existentes en las carpetas de la especificación y del manifiesto
+    """
+    root = spec.get('root', '/Game')
+    folders = {entry['folder'] for entry in desired_assets(spec).values()}
+    folders.update(path.rpartition('/')[0] for path in manifest)
+    listing = []
+    for folder in sorted(folders):
+        if unreal.EditorAssetLibrary.does_directory_exist(folder):
+            listing.extend(unreal.EditorAssetLibrary.list_assets(
+                folder, recursive=False, include_folder=False
+            ))
+    return listing
+
+def apply_plan(result, manifest=None):
+    """
+    Aplica las operaciones de un plan (blueprint_planner.plan) en bloque y
+    guarda los paquetes una sola vez al final. Devuelve el resumen y el
+    manifiesto resultante, que sólo incluye lo que se aplicó bien.
+    """
+    manifest = manifest or {}
+    assets = dict(result['manifest'])
+    summary = {'created': [], 'updated': [], 'deleted': [], 'unchanged': list(result['unchanged']),
+               'failed': []}
+    
+    for operation in result['operations']:
+        op, path = operation['op'], operation['path']
+        if op == 'make_directory':
+            unreal.EditorAssetLibrary.make_directory(path)
+            print(f'Directorio creado: {path}')
+        elif op == 'delete':
+            if force_delete_asset(path):
+                summary['deleted'].append(path)
+            else:
+                # Sigue en el proyecto: se conserva su hash anterior, si lo hay
+                previous = manifest.get(path)
+                if previous is None:
+                    assets.pop(path, None)
+                else:
+                    assets[path] = previous
+                summary['failed'].append(path)
+        else:
+            # modify: se rehace el Blueprint (cambia la clase padre o sus miembros)
+            bp = build_blueprint(operation['spec'], force_recreate=(op == 'modify'),
+                                 root=result.get('root', '/Game'))
+            if bp is None:
+                assets.pop(path, None)
+                summary['failed'].append(path)
+            else:
+                summary['updated' if op == 'modify' else 'created'].append(path)
+    
+    if summary['created'] or summary['updated'] or summary['deleted']:
         unreal.EditorLoadingAndSavingUtils.save_dirty_packages(
             save_map_packages=True,
             save_content_packages=True
         )
+    print(f"Blueprints: {len(summary['created'])} creados, {len(summary['updated'])} actualizados, "
+          f"{len(summary['deleted'])} eliminados, {len(summary['unchanged'])} sin cambios")
+    return summary, assets
+
+def sync_blueprints(spec=None, manifest_path=None, force=False):
+    """
+    Regeneración incremental: planifica contra los assets del proyecto y el
+    manifiesto, aplica sólo las diferencias y actualiza el manifiesto.
+    """
+    spec = load_spec() if spec is None else spec
+    manifest_path = manifest_path or default_manifest_path()
+    manifest = load_manifest(manifest_path)
+    result = plan(spec, list_project_assets(spec, manifest), manifest, force=force)
+    summary, assets = apply_plan(result, manifest)
+    save_manifest(manifest_path, assets)
+    return summary
+
+def apply_plan_file(plan_path, manifest_path=None):
+    """
+    Aplica un plan precalculado fuera del editor (blueprint_planner.py --output)
+    """
+    with open(plan_path, 'r', encoding='utf-8') as f:
+        result = json.load(f)
+    manifest_path = manifest_path or default_manifest_path()
+    summary, assets = apply_plan(result, load_manifest(manifest_path))
+    save_manifest(manifest_path, assets)
+    return summary
+
+def setup_digital_twin(incremental=True, manifest_path=None):
+    """
+    Configura todos los Blueprints necesarios para el gemelo digital.
+    Por defecto es incremental (ver sync_blueprints); con incremental=False
+    limpia las carpetas y recrea todo.
+    """
+    try:
+        if not incremental:
+            print('Limpiando directorios existentes...')
+            spec = load_spec()
+            for folder in sorted({entry['folder'] for entry in desired_assets(spec).values()}):
+                clean_directory(folder)
+            
+            # Forzar una recolección de basura
+            unreal.EditorLevelLibrary.editor_command('GC.CollectGarbage')
+            print('Creando nuevos Blueprints...')
         
+        sync_blueprints(manifest_path=manifest_path, force=not incremental)
         print('Configuración del gemelo digital completada')
         
     except Exception as e:
         print(f'Error durante la configuración: {str(e)}')
 
 def generate_websocket_blueprint():
-    # Configuración básica del Blueprint
-    blueprint_name = '/Game/Blueprints/BP_WebSocketManager'
-    blueprint_factory = unreal.BlueprintFactory()
-    blueprint_factory.set_editor_property('ParentClass', unreal.Actor)
-    
-    # Crear el Blueprint
-    package_path = '/Game/Blueprints'
-    blueprint = unreal.AssetToolsHelpers.get_asset_tools().create_asset(
-        'BP_WebSocketManager',
-        package_path,
-        unreal.Blueprint,
-        blueprint_factory
-    )
-    
-    # Añadir variables
-    blueprint_class = blueprint.get_blueprint_class()
-    
-    # Variables para WebSocket
-    unreal.BlueprintVariable(
-        'WebSocketURL',
-        unreal.EdGraphPinType(
-            'string',
-            'ESPMode::Type::ThreadSafe',
-            None,
-            unreal.EPinContainerType.NONE,
-            False,
-            unreal.FEdGraphTerminalType()
-        )
-    )
-    
-    # Funciones principales
-    functions = [
-        {
-            'name': 'ConnectToServer',
-            'inputs': [],
-            'outputs': [('Success', 'bool')]
-        },
-        {
-            'name': 'ProcessSensorData',
-            'inputs': [('SensorData', 'string')],
-            'outputs': []
-        },
-        {
-            'name': 'UpdateDigitalTwin',
-            'inputs': [
-                ('Temperature', 'float'),
-                ('Humidity', 'float'),
-                ('Pressure', 'float'),
-                ('Motion', 'bool'),
-                ('Stock', 'int')
-            ],
-            'outputs': []
-        }
-    ]
-    
-    # Crear funciones
-    for func in functions:
-        function = unreal.BlueprintFunctionLibrary.create_function(
-            blueprint_class,
-            func['name']
+    """
+    Crea y guarda sólo BP_WebSocketManager según la especificación
+    """
+    spec = load_spec()
+    package_path = normalize_path('Blueprints/BP_WebSocketManager', spec.get('root', '/Game'))
+    entry = desired_assets(spec)[package_path]
+    blueprint = build_blueprint(entry, force_recreate=True, root=spec.get('root', '/Game'))
+    if blueprint is not None:
+        unreal.EditorLoadingAndSavingUtils.save_package(
+            blueprint.get_outer(),
+            package_path
         )
-        
-        # Añadir inputs y outputs
-        for input_name, input_type in func['inputs']:
-            unreal.BlueprintFunctionLibrary.add_parameter(
-                function,
-                unreal.Parameter(input_name, input_type)
-            )
-        
-        for output_name, output_type in func['outputs']:
-            unreal.BlueprintFunctionLibrary.add_return_value(
-                function,
-                unreal.Parameter(output_name, output_type)
-            )
-    
-    # Compilar Blueprint
-    unreal.EditorLoadingAndSavingUtils.save_package(
-        blueprint.get_outer(),
-        '/Game/Blueprints/BP_WebSocketManager'
-    )
     
 if __name__ == '__main__':
-    setup_digital_twin()
-    generate_websocket_blueprint() 
\ No newline at end of file
+    # --full: limpia y recrea todo; --plan plan.json: aplica un plan precalculado
+    if '--plan' in sys.argv:
+        apply_plan_file(sys.argv[sys.argv.index('--plan') + 1])
+    else:
+        setup_digital_twin(incremental='--full' not in sys.argv)
@@ -1,32 +1,21 @@
 import os
 import json
 
+from blueprint_planner import desired_assets, load_spec
+
 # Carpeta de salida para los recursos generados
 OUTPUT_DIR = 'unreal/blueprints'
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-# Estructura base para el Blueprint (pseudo-formato, para guía visual)
+# Estructura base para el Blueprint (pseudo-formato, para guía visual).
+# Sale de la especificación declarativa blueprint_spec.json, la misma que
+# usa generate_blueprints.py dentro del editor.
+websocket_manager = desired_assets(load_spec())['/Game/Blueprints/BP_WebSocketManager']
 blueprint_structure = {
-    "BlueprintName": "BP_WebSocketManager",
-    "Description": "Actor que gestiona la conexión WebSocket y emite eventos para seguridad, inventario, clientes y layout.",
-    "Nodes": [
-        {"Type": "EventBeginPlay", "Description": "Conectar al WebSocket al iniciar el juego."},
-        {"Type": "WebSocketConnect", "URL": "ws://localhost:3001", "Description": "Conexión al backend."},
-        {"Type": "WebSocketOnMessage", "Description": "Procesar mensajes entrantes y emitir eventos UE5."},
-        {"Type": "SwitchOnString", "Variable": "message.type", "Cases": [
-            "security_event", "inventory_event", "customer_event", "layout_event", "layout_warning", "status_update"
-        ]},
-        {"Type": "CustomEvent", "Name": "OnSecurityEvent", "Description": "Evento para widgets de seguridad."},
-        {"Type": "CustomEvent", "Name": "OnInventoryEvent", "Description": "Evento para widgets de inventario."},
-        {"Type": "CustomEvent", "Name": "OnCustomerEvent", "Description": "Evento para widgets de clientes."},
-        {"Type": "CustomEvent", "Name": "OnLayoutEvent", "Description": "Evento para widgets de layout."},
-        {"Type": "CustomEvent", "Name": "OnLayoutWarning", "Description": "Evento para advertencias de layout."},
-        {"Type": "CustomEvent", "Name": "OnStatusUpdate", "Description": "Evento para actualización general de estado."}
-    ],
-    "Variables": [
-        {"Name": "WebSocket", "Type": "Object", "Class": "WebSocket"},
-        {"Name": "LastMessage", "Type": "String"}
-    ]
+    "BlueprintName": websocket_manager["name"],
+    "Description": websocket_manager["description"],
+    "Nodes": websocket_manager["nodes"],
+    "Variables": websocket_manager["variables"]
 }
 
 # Guardar estructura como guía visual
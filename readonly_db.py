@@ -0,0 +1,116 @@
+"""Conexiones SQLite de solo lectura para los scripts de informes.
+
+Los scripts de Python (Consultar_BDD.py y similares) leen la misma base que
+usa el backend en producción. Estas conexiones:
+
+- se abren con la URI `mode=ro` y `PRAGMA query_only`, así que no pueden
+  escribir ni crear el fichero por error;
+- usan `mmap_size` y una `cache_size` mayor que la predeterminada, con lo que
+  las lecturas grandes no pasan por read() página a página;
+- leen dentro de `read_snapshot`, una transacción de lectura corta. En modo
+  WAL los lectores no bloquean al escritor y cada snapshot ve un estado
+  consistente. En modo rollback-journal una lectura larga sí retrasa los
+  commits del backend, así que conviene mantener los snapshots breves.
+
+`immutable=True` desactiva todo el bloqueo. Úsese sólo con copias que
+nadie esté escribiendo.
+
+Si la variable de entorno SQLITE_QUERY_LOG apunta a un fichero, cada
+conexión sin `trace` propio añade ahí las sentencias que ejecuta (una línea
+JSON por sentencia). Asesor_Indices.py lo usa para capturar consultas reales.
+El fichero se cierra al cerrar (o liberar) la conexión.
+"""
+import json
+import os
+import sqlite3
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Callable, Optional
+from urllib.parse import quote
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB = os.path.join(ROOT, "backend", "basedeDatos", "replikstore.db")
+
+MMAP_SIZE = 256 * 1024 * 1024  # bytes
+CACHE_SIZE_KIB = 64 * 1024     # cache_size negativo = KiB
+BUSY_TIMEOUT_MS = 5000
+QUERY_LOG_ENV = "SQLITE_QUERY_LOG"
+
+
+class QueryLog:
+    """Callback de traza que añade cada sentencia a `path` en JSONL.
+
+    Cada línea se escribe con una sola llamada en modo append, así que varios
+    procesos pueden compartir el fichero. `close()` libera el fichero.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._out = open(path, "a", encoding="utf-8", buffering=1)
+
+    def __call__(self, sql: str):
+        self._out.write(json.dumps({"sql": sql, "pid": os.getpid(), "ts": time.time()},
+                                   ensure_ascii=False) + "\n")
+
+    @property
+    def closed(self) -> bool:
+        return self._out.closed
+
+    def close(self):
+        self._out.close()
+
+
+def query_logger(path: str) -> QueryLog:
+    return QueryLog(path)
+
+
+class ReadOnlyConnection(sqlite3.Connection):
+    """Conexión de connect_readonly: al cerrarla se cierra también su QueryLog."""
+
+    query_log: Optional[QueryLog] = None
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            if self.query_log is not None:
+                self.query_log.close()
+
+
+def connect_readonly(path: str = DEFAULT_DB, mmap_size: int = MMAP_SIZE,
+                     cache_kib: int = CACHE_SIZE_KIB, immutable: bool = False,
+                     trace: Optional[Callable[[str], None]] = None) -> sqlite3.Connection:
+    """Abre `path` en solo lectura con mmap y caché ampliada.
+
+    `trace` recibe cada sentencia SQL ejecutada (ver `set_trace_callback`);
+    sin él se usa el registro de SQLITE_QUERY_LOG, si está definido, y se
+    cierra con la conexión.
+    """
+    uri = f"file:{quote(os.path.abspath(path))}?mode=ro"
+    if immutable:
+        uri += "&immutable=1"
+    # isolation_level=None: las transacciones sólo las abre read_snapshot
+    conn = sqlite3.connect(uri, uri=True, isolation_level=None, factory=ReadOnlyConnection)
+    conn.execute("PRAGMA query_only = ON")
+    conn.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+    conn.execute(f"PRAGMA cache_size = -{int(cache_kib)}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    if trace is None and os.environ.get(QUERY_LOG_ENV):
+        trace = conn.query_log = query_logger(os.environ[QUERY_LOG_ENV])
+        # También si la conexión se libera sin close()
+        weakref.finalize(conn, trace.close)
+    if trace is not None:
+        conn.set_trace_callback(trace)
+    return conn
+
+
+@contextmanager
+def read_snapshot(conn: sqlite3.Connection):
+    """Transacción de lectura: las consultas del bloque ven el mismo estado."""
+    conn.execute("BEGIN")
+    try:
+        yield conn
+    finally:
+        conn.execute("COMMIT")
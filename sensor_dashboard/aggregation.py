@@ -0,0 +1,66 @@
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+PERCENTILES = (50, 90, 99)
+
+
+def aggregate_readings(readings: Sequence[dict], sensors: Sequence[dict],
+                       window: Optional[float] = None) -> List[dict]:
+    """Estadísticas por sensor sobre el historial, en una pasada vectorizada.
+
+    `window` (segundos) se cuenta hacia atrás desde la lectura más reciente,
+    no desde el reloj, para que el resultado dependa sólo de los datos.
+    Los fuera de rango usan los `min`/`max` de cada sensor en `sensors`.
+    """
+    index: Dict[str, int] = {s["id"]: i for i, s in enumerate(sensors)}
+    rows = [r for r in readings if r["id"] in index]
+    n = len(sensors)
+    # Sin lecturas: mismas claves, con los estadísticos a None
+    empty = {"count": 0, "mean": None, "min": None, "max": None,
+             **{f"p{pct}": None for pct in PERCENTILES}, "below_min": 0, "above_max": 0}
+    result = [{"id": s["id"], "name": s["name"], "unit": s["unit"], **empty} for s in sensors]
+    if not rows:
+        return result
+
+    idx = np.fromiter((index[r["id"]] for r in rows), dtype=np.intp, count=len(rows))
+    values = np.fromiter((r["value"] for r in rows), dtype=np.float64, count=len(rows))
+    if window is not None:
+        ts = np.fromiter((r["timestamp"].timestamp() for r in rows),
+                         dtype=np.float64, count=len(rows))
+        keep = ts >= ts.max() - window
+        idx, values = idx[keep], values[keep]
+
+    counts = np.bincount(idx, minlength=n)
+    sums = np.bincount(idx, weights=values, minlength=n)
+    lows = np.array([s["min"] for s in sensors], dtype=np.float64)
+    highs = np.array([s["max"] for s in sensors], dtype=np.float64)
+    below = np.bincount(idx, weights=values < lows[idx], minlength=n)
+    above = np.bincount(idx, weights=values > highs[idx], minlength=n)
+
+    # Orden por (sensor, valor): cada sensor queda en un tramo contiguo y
+    # los percentiles se interpolan dentro de su tramo.
+    order = np.lexsort((values, idx))
+    sorted_values = values[order]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = counts > 0
+    stats = {
+        "min": sorted_values[starts[present]],
+        "max": sorted_values[(starts + counts - 1)[present]],
+    }
+    for pct in PERCENTILES:
+        pos = starts[present] + (counts[present] - 1) * (pct / 100)
+        lo = np.floor(pos).astype(np.intp)
+        hi = np.ceil(pos).astype(np.intp)
+        frac = pos - lo
+        stats[f"p{pct}"] = sorted_values[lo] * (1 - frac) + sorted_values[hi] * frac
+
+    for j, i in enumerate(np.flatnonzero(present)):
+        entry = result[i]
+        entry["count"] = int(counts[i])
+        entry["mean"] = round(float(sums[i] / counts[i]), 2)
+        for key, column in stats.items():
+            entry[key] = round(float(column[j]), 2)
+        entry["below_min"] = int(below[i])
+        entry["above_max"] = int(above[i])
+    return result
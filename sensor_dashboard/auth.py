@@ -1,17 +1,44 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from typing import Optional
 from pydantic import BaseModel
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import os
+import threading
+import time
+from cache import TTLCache
+from user_store import create_user_store
 
 # Configuración de seguridad
 SECRET_KEY = os.getenv("JWT_SECRET", "tu_clave_secreta_super_segura")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Cachés de autenticación: token verificado -> usuario, y usuario -> modelo
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("AUTH_TOKEN_CACHE_TTL", "60"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("AUTH_USER_CACHE_TTL", "300"))
+token_cache = TTLCache(maxsize=int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096")),
+                       ttl=TOKEN_CACHE_TTL_SECONDS)
+user_cache = TTLCache(maxsize=int(os.getenv("AUTH_USER_CACHE_SIZE", "1024")),
+                      ttl=USER_CACHE_TTL_SECONDS)
+# Con varios workers las cachés son por proceso: una época compartida de
+# usuarios (ver share_invalidations) avisa a los demás de cada cambio
+_epoch_source = None
+_seen_epoch = None
+
+# Verificación bcrypt fuera del event loop (0 hilos = verificación en línea)
+PASSWORD_WORKERS = int(os.getenv("AUTH_PASSWORD_WORKERS", "2"))
+MAX_PENDING_LOGINS = int(os.getenv("AUTH_MAX_PENDING_LOGINS", "64"))
+
+# Límites de intentos de login por usuario (fallidos) y por IP (todos)
+USER_MAX_FAILED_LOGINS = int(os.getenv("AUTH_USER_MAX_FAILED_LOGINS", "5"))
+USER_FAILED_WINDOW_SECONDS = float(os.getenv("AUTH_USER_FAILED_WINDOW", "300"))
+IP_MAX_LOGIN_ATTEMPTS = int(os.getenv("AUTH_IP_MAX_LOGIN_ATTEMPTS", "30"))
+IP_ATTEMPT_WINDOW_SECONDS = float(os.getenv("AUTH_IP_ATTEMPT_WINDOW", "60"))
+
 # Modelos de datos
 class User(BaseModel):
     username: str
@@ -31,7 +58,9 @@ class TokenData(BaseModel):
     username: Optional[str] = None
 
 # Configuración de seguridad
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# jose (cryptography) y passlib se importan al primer uso para no pagar su
+# coste en el arranque de la aplicación
+_pwd_context = None
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 # Base de datos simulada (en memoria)
@@ -54,32 +83,195 @@ fake_users_db = {
     }
 }
 
+# Almacén de usuarios activo (USER_STORE=memory|sqlite)
+user_db = create_user_store(fake_users_db)
+
+def get_pwd_context():
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
+
 def verify_password(plain_password, hashed_password):
-    print(f"[DEBUG] Verificando contraseña: plain='{plain_password}' hashed='{hashed_password}'")
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return get_pwd_context().verify(plain_password, hashed_password)
+    except ValueError:
+        # Contraseñas sin hash reconocible (p. ej. texto plano en `usuarios`)
+        return False
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+def share_invalidations(read_epoch, bump_epoch):
+    """Comparte las invalidaciones entre procesos.
+
+    `bump_epoch()` se llama tras modificar un usuario y `read_epoch()` antes
+    de usar las cachés: si la época cambió (en este u otro worker), se
+    vacían enteras. Cuesta una lectura de la época por petición autenticada.
+    """
+    global _epoch_source, _seen_epoch
+    _epoch_source = (read_epoch, bump_epoch)
+    _seen_epoch = read_epoch()
+
+def _check_epoch():
+    global _seen_epoch
+    if _epoch_source is None:
+        return
+    current = _epoch_source[0]()
+    if current != _seen_epoch:
+        token_cache.clear()
+        user_cache.clear()
+        _seen_epoch = current
 
 def get_user(db, username: str):
-    if username in db:
-        user_dict = db[username]
-        return UserInDB(**user_dict)
+    _check_epoch()
+    key = (id(db), username)
+    user = user_cache.get(key)
+    if user is not None:
+        return user
+    # `db` puede ser un UserStore o un dict username -> datos
+    user_dict = db.get(username)
+    if user_dict is not None:
+        user = UserInDB(**user_dict)
+        user_cache.set(key, user)
+        return user
     return None
 
+def invalidate_user(username: str):
+    """Descarta el usuario y sus tokens verificados de las cachés."""
+    user_cache.discard_where(lambda key, _: key[1] == username)
+    token_cache.discard_where(lambda _, user: user.username == username)
+    if _epoch_source is not None:
+        _epoch_source[1]()
+
+def update_user(username: str, db=None, **changes):
+    """Modifica un usuario (rol, estado...) e invalida las cachés asociadas."""
+    db = user_db if db is None else db
+    db.update(username, **changes)
+    invalidate_user(username)
+
+def disable_user(username: str, db=None):
+    update_user(username, db=db, disabled=True)
+
+def set_user_role(username: str, role: str, db=None):
+    update_user(username, db=db, role=role)
+
 def authenticate_user(fake_db, username: str, password: str):
-    print(f"[DEBUG] Autenticando usuario: username='{username}' password='{password}'")
     user = get_user(fake_db, username)
     if not user:
-        print("[DEBUG] Usuario no encontrado")
         return False
     if not verify_password(password, user.hashed_password):
-        print("[DEBUG] Contraseña incorrecta")
         return False
-    print("[DEBUG] Usuario autenticado correctamente")
     return user
 
+class LoginBusyError(Exception):
+    """Hay demasiadas verificaciones de contraseña en cola."""
+
+_password_executor = None
+_pending_logins = 0
+
+def _get_password_executor():
+    global _password_executor
+    if _password_executor is None:
+        _password_executor = ThreadPoolExecutor(
+            max_workers=PASSWORD_WORKERS, thread_name_prefix="bcrypt"
+        )
+    return _password_executor
+
+async def verify_password_async(plain_password, hashed_password):
+    global _pending_logins
+    if PASSWORD_WORKERS <= 0:
+        return verify_password(plain_password, hashed_password)
+    if _pending_logins >= MAX_PENDING_LOGINS:
+        raise LoginBusyError()
+    _pending_logins += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _get_password_executor(), verify_password, plain_password, hashed_password
+        )
+    finally:
+        _pending_logins -= 1
+
+async def authenticate_user_async(fake_db, username: str, password: str):
+    """Igual que `authenticate_user`, pero sin bloquear el event loop con bcrypt."""
+    user = get_user(fake_db, username)
+    if not user:
+        return False
+    if not await verify_password_async(password, user.hashed_password):
+        return False
+    return user
+
+class AttemptLimiter:
+    """Ventana deslizante de intentos por clave (usuario o IP)."""
+
+    def __init__(self, max_attempts: int, window: float, max_keys: int = 10000):
+        self.max_attempts = max_attempts
+        self.window = window
+        self.max_keys = max_keys
+        self._attempts: "OrderedDict[str, deque]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prune(self, key: str, now: float):
+        attempts = self._attempts.get(key)
+        if attempts is None:
+            return None
+        while attempts and attempts[0] <= now - self.window:
+            attempts.popleft()
+        if not attempts:
+            del self._attempts[key]
+            return None
+        return attempts
+
+    def retry_after(self, key: str) -> float:
+        """Segundos hasta que la clave pueda volver a intentar (0 si puede ya)."""
+        now = time.monotonic()
+        with self._lock:
+            attempts = self._prune(key, now)
+            if attempts is None or len(attempts) < self.max_attempts:
+                return 0.0
+            return attempts[0] + self.window - now
+
+    def record(self, key: str):
+        now = time.monotonic()
+        with self._lock:
+            attempts = self._prune(key, now)
+            if attempts is None:
+                attempts = self._attempts[key] = deque()
+            attempts.append(now)
+            self._attempts.move_to_end(key)
+            while len(self._attempts) > self.max_keys:
+                self._attempts.popitem(last=False)
+
+    def reset(self, key: str):
+        with self._lock:
+            self._attempts.pop(key, None)
+
+class LoginThrottle:
+    """Limita los fallos por usuario y el total de intentos por IP."""
+
+    def __init__(self):
+        self.users = AttemptLimiter(USER_MAX_FAILED_LOGINS, USER_FAILED_WINDOW_SECONDS)
+        self.ips = AttemptLimiter(IP_MAX_LOGIN_ATTEMPTS, IP_ATTEMPT_WINDOW_SECONDS)
+
+    def check(self, username: str, client_ip: str) -> float:
+        """Registra el intento de la IP y retorna los segundos de espera exigidos."""
+        retry_after = max(self.users.retry_after(username), self.ips.retry_after(client_ip))
+        if not retry_after:
+            self.ips.record(client_ip)
+        return retry_after
+
+    def record_failure(self, username: str):
+        self.users.record(username)
+
+    def record_success(self, username: str):
+        self.users.reset(username)
+
+login_throttle = LoginThrottle()
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -95,6 +287,11 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         detail="Credenciales inválidas",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    _check_epoch()
+    user = token_cache.get(token)
+    if user is not None:
+        return user
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
@@ -103,9 +300,13 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         token_data = TokenData(username=username)
     except JWTError:
         raise credentials_exception
-    user = get_user(fake_users_db, username=token_data.username)
+    user = get_user(user_db, username=token_data.username)
     if user is None:
         raise credentials_exception
+    # El token se cachea como máximo hasta su expiración
+    exp = payload.get("exp")
+    ttl = exp - time.time() if exp is not None else None
+    token_cache.set(token, user, ttl=ttl)
     return user
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)):
@@ -113,6 +314,11 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
         raise HTTPException(status_code=400, detail="Usuario inactivo")
     return current_user
 
+def prewarm():
+    """Importa jose y el backend bcrypt de antemano (p. ej. en un hilo tras el arranque)."""
+    from jose import jwt  # noqa: F401
+    get_pwd_context().handler().get_backend()
+
 def require_role(role: str):
     async def role_checker(current_user: User = Depends(get_current_active_user)):
         if current_user.role != role:
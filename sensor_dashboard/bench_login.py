@@ -0,0 +1,122 @@
+"""Benchmark: latencia de /api/sensors durante una ráfaga de logins.
+
+Ejecuta la app en proceso (transporte ASGI de httpx, mismo event loop), de modo
+que cualquier trabajo síncrono en un login aparece como latencia en el resto
+de peticiones. Uso:
+
+    python bench_login.py --pollers 20 --logins 100
+    python bench_login.py --inline      # bcrypt en el event loop (comportamiento anterior)
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(latencies):
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(max(latencies, default=0) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+    }
+
+
+async def run(args):
+    import httpx
+    import auth
+    import main
+
+    auth.fake_users_db["bench"] = {
+        "username": "bench",
+        "full_name": "Benchmark",
+        "email": "bench@example.com",
+        "hashed_password": auth.get_password_hash("bench"),
+        "disabled": False,
+        "role": "user",
+    }
+    token = auth.create_access_token({"sub": "bench"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    samples = []  # (inicio, fin) de cada petición
+    stop = asyncio.Event()
+    transport = httpx.ASGITransport(app=main.app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def poller():
+            # Carga de bucle abierto: la latencia se mide desde el instante
+            # programado, así un event loop bloqueado cuenta como espera.
+            scheduled = time.perf_counter()
+            while not stop.is_set():
+                await client.get("/api/sensors", headers=headers)
+                samples.append((scheduled, time.perf_counter()))
+                scheduled = max(scheduled + args.interval, time.perf_counter())
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+
+        async def login():
+            response = await client.post(
+                "/token", data={"username": "bench", "password": "bench"}
+            )
+            return response.status_code
+
+        pollers = [asyncio.create_task(poller()) for _ in range(args.pollers)]
+        await asyncio.sleep(args.warmup)
+        burst_start = time.perf_counter()
+        codes = await asyncio.gather(*(login() for _ in range(args.logins)))
+        burst_end = time.perf_counter()
+        await asyncio.sleep(args.warmup)
+        stop.set()
+        await asyncio.gather(*pollers)
+
+    # Una petición cuenta para la ráfaga si se solapa con ella
+    baseline = [end - start for start, end in samples if end < burst_start]
+    during = [end - start for start, end in samples
+              if start < burst_end and end > burst_start]
+    return {
+        "mode": "inline" if args.inline else f"pool({auth.PASSWORD_WORKERS})",
+        "logins": args.logins,
+        "login_status": {str(c): codes.count(c) for c in sorted(set(codes))},
+        "burst_seconds": round(burst_end - burst_start, 2),
+        "api_baseline": summarize(baseline),
+        "api_during_burst": summarize(during),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pollers", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--interval", type=float, default=0.05)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--inline", action="store_true",
+                        help="verificar bcrypt en el event loop")
+    args = parser.parse_args()
+
+    if args.inline:
+        os.environ["AUTH_PASSWORD_WORKERS"] = "0"
+    # El benchmark usa una sola IP: que el throttling no falsee la ráfaga
+    os.environ.setdefault("AUTH_IP_MAX_LOGIN_ATTEMPTS", str(args.logins * 10))
+    os.environ.setdefault("AUTH_MAX_PENDING_LOGINS", str(args.logins))
+
+    result = asyncio.run(run(args))
+
+    print(f"Modo: {result['mode']}  logins: {result['logins']} "
+          f"{result['login_status']}  ráfaga: {result['burst_seconds']} s")
+    for phase in ("api_baseline", "api_during_burst"):
+        r = result[phase]
+        print(f"{phase:18} n={r['requests']:5d}  p50={r['p50_ms']:8.2f} ms  "
+              f"p99={r['p99_ms']:8.2f} ms  max={r['max_ms']:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+"""Prueba de carga del dashboard: login -> token -> sondeo de la API.
+
+Cada usuario virtual obtiene un token en /token y después consulta en bucle
+/api/sensors, /api/history y /api/export según los pesos de `--mix`.
+El informe incluye RPS, percentiles de latencia por endpoint y CPU/RSS de
+los procesos del servidor.
+
+Modos:
+    python loadtest.py --spawn                 # lanza uvicorn local (por defecto)
+    python loadtest.py --spawn --workers 2     # varios workers con estado en SQLite
+    python loadtest.py --inprocess             # transporte ASGI, sin sockets
+    python loadtest.py --url http://host:8000 --username u --password p
+
+Líneas base:
+    python loadtest.py --save spawn_w1         # escribe loadtest_baselines/spawn_w1.json
+    python loadtest.py --compare spawn_w1      # sale con 1 si hay regresión
+
+Cada informe guarda en "commit" la revisión del dashboard con que se tomó
+("-dirty" si había cambios sin confirmar): una línea base de otra revisión
+sólo es orientativa.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from bench_login import percentile
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DIR = os.path.join(CURRENT_DIR, "loadtest_baselines")
+LOADTEST_USER = "loadtest"
+LOADTEST_PASSWORD = "loadtest"
+
+DEFAULT_MIX = "sensors=6,history=3,export=1"
+ENDPOINTS = {
+    "sensors": "/api/sensors",
+    "history": "/api/history",
+    "export": "/api/export",
+}
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Endpoint desconocido en --mix: {name}")
+        weights[name] = int(weight or 1)
+    return weights
+
+
+# --- Métricas de procesos del servidor (Linux /proc) -----------------------
+
+def _children(pid: int) -> List[int]:
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+    return children
+
+
+def process_tree(pid: int) -> List[int]:
+    pids, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        pids.append(current)
+        pending.extend(_children(current))
+    return pids
+
+
+def cpu_seconds(pids: List[int]) -> float:
+    ticks = os.sysconf("SC_CLK_TCK")
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        total += int(fields[11]) + int(fields[12])  # utime + stime
+    return total / ticks
+
+
+def rss_mb(pids: List[int], field: str = "VmRSS") -> float:
+    total_kb = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith(field + ":"):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            continue
+    return round(total_kb / 1024, 1)
+
+
+# --- Servidor -----------------------------------------------------------
+
+def create_user_db(path: str):
+    """Base SQLite con un usuario admin para el login del test."""
+    from passlib.context import CryptContext
+
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "username TEXT UNIQUE NOT NULL, email TEXT UNIQUE NOT NULL, "
+        "password TEXT NOT NULL, role TEXT DEFAULT 'user', disabled INTEGER NOT NULL DEFAULT 0)"
+    )
+    hashed = CryptContext(schemes=["bcrypt"]).hash(LOADTEST_PASSWORD)
+    conn.execute(
+        "INSERT OR REPLACE INTO users (username, email, password, role) VALUES (?, ?, ?, 'admin')",
+        (LOADTEST_USER, "loadtest@example.com", hashed)
+    )
+    conn.commit()
+    conn.close()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn_server(workers: int, tmpdir: str):
+    port = free_port()
+    user_db = os.path.join(tmpdir, "users.db")
+    create_user_db(user_db)
+    env = dict(os.environ, USER_STORE="sqlite", USER_DB_PATH=user_db,
+               AUTH_IP_MAX_LOGIN_ATTEMPTS="100000")
+    if workers > 1:
+        env.update(DASHBOARD_STATE="sqlite",
+                   DASHBOARD_STATE_PATH=os.path.join(tmpdir, "state.db"))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=CURRENT_DIR, env=env, stdout=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                break
+        except OSError:
+            if proc.poll() is not None:
+                raise RuntimeError("uvicorn terminó antes de aceptar conexiones")
+            time.sleep(0.2)
+    else:
+        proc.terminate()
+        raise RuntimeError("uvicorn no respondió a tiempo")
+    if workers > 1:
+        # Esperar a que arranquen todos los procesos worker
+        while len(process_tree(proc.pid)) <= workers and time.time() < deadline:
+            time.sleep(0.2)
+    return proc, f"http://127.0.0.1:{port}"
+
+
+# --- Carga ------------------------------------------------------------
+
+async def virtual_user(client, args, weights, stop, results):
+    start = time.perf_counter()
+    response = await client.post(
+        "/token", data={"username": args.username, "password": args.password}
+    )
+    results["login"].append((time.perf_counter() - start, response.status_code))
+    if response.status_code != 200:
+        return
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}",
+               "Accept-Encoding": "gzip"}
+    names, name_weights = list(weights), list(weights.values())
+    etags: Dict[str, str] = {}
+    while not stop.is_set():
+        name = random.choices(names, name_weights)[0]
+        request_headers = dict(headers)
+        if args.conditional and name in etags:
+            request_headers["If-None-Match"] = etags[name]
+        start = time.perf_counter()
+        response = await client.get(ENDPOINTS[name], headers=request_headers)
+        await response.aread()
+        results[name].append((time.perf_counter() - start, response.status_code))
+        if "etag" in response.headers:
+            etags[name] = response.headers["etag"]
+        if args.think:
+            await asyncio.sleep(args.think)
+
+
+def summarize(samples, duration: float) -> dict:
+    latencies = [lat for lat, _ in samples]
+    errors = sum(1 for _, code in samples if code >= 400)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / duration, 1) if duration else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p90_ms": round(percentile(latencies, 90) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(max(latencies, default=0) * 1000, 2),
+    }
+
+
+async def run_load(args, base_url: Optional[str], app=None) -> dict:
+    import httpx
+
+    weights = parse_mix(args.mix)
+    results = {name: [] for name in ["login", *weights]}
+    stop = asyncio.Event()
+    limits = httpx.Limits(max_connections=args.concurrency)
+    if app is not None:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                                   base_url="http://loadtest")
+    else:
+        client = httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0)
+    async with client:
+        users = [asyncio.create_task(virtual_user(client, args, weights, stop, results))
+                 for _ in range(args.concurrency)]
+        started = time.perf_counter()
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*users)
+        duration = time.perf_counter() - started
+
+    endpoints = {name: summarize(samples, duration) for name, samples in results.items()}
+    polled = [s for name, samples in results.items() if name != "login" for s in samples]
+    return {
+        "duration_s": round(duration, 2),
+        "total": summarize(polled, duration),
+        "endpoints": endpoints,
+    }
+
+
+def git_revision() -> Optional[str]:
+    """Commit actual del dashboard, con "-dirty" si hay cambios sin confirmar.
+
+    Es el último commit que tocó este directorio (sin contar las líneas
+    base), así los cambios en otras partes del repositorio no invalidan la
+    comparación con loadtest_baselines.
+    """
+    try:
+        head = subprocess.run(
+            ["git", "log", "-1", "--format=%h", "--", ".", ":(exclude)loadtest_baselines"],
+            cwd=CURRENT_DIR, capture_output=True, text=True, check=True).stdout.strip()
+        changes = subprocess.run(
+            ["git", "status", "--porcelain", "--", ".", ":(exclude)loadtest_baselines"],
+            cwd=CURRENT_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return head + ("-dirty" if changes else "")
+
+
+def run(args) -> dict:
+    config = {
+        "mode": "inprocess" if args.inprocess else ("url" if args.url else "spawn"),
+        "workers": args.workers,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "mix": args.mix,
+        "think_s": args.think,
+        "conditional": args.conditional,
+    }
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if args.inprocess:
+            os.environ.setdefault("AUTH_IP_MAX_LOGIN_ATTEMPTS", "100000")
+            import auth
+            import main
+            auth.fake_users_db[LOADTEST_USER] = {
+                "username": LOADTEST_USER, "email": "loadtest@example.com",
+                "full_name": "Load test", "disabled": False, "role": "admin",
+                "hashed_password": auth.get_password_hash(LOADTEST_PASSWORD),
+            }
+            before = resource.getrusage(resource.RUSAGE_SELF)
+            report = asyncio.run(run_load(args, None, app=main.app))
+            after = resource.getrusage(resource.RUSAGE_SELF)
+            report["server"] = {
+                "cpu_s": round((after.ru_utime + after.ru_stime)
+                               - (before.ru_utime + before.ru_stime), 2),
+                "rss_peak_mb": round(after.ru_maxrss / 1024, 1),
+                "note": "cliente y servidor comparten proceso",
+            }
+        elif args.url:
+            report = asyncio.run(run_load(args, args.url))
+        else:
+            proc, base_url = spawn_server(args.workers, tmpdir)
+            try:
+                pids = process_tree(proc.pid)
+                cpu_before = cpu_seconds(pids)
+                report = asyncio.run(run_load(args, base_url))
+                cpu = cpu_seconds(pids) - cpu_before
+                report["server"] = {
+                    "processes": len(pids),
+                    "cpu_s": round(cpu, 2),
+                    "cpu_util": round(cpu / report["duration_s"], 2),
+                    "rss_mb": rss_mb(pids),
+                    "rss_peak_mb": rss_mb(pids, "VmHWM"),
+                }
+            finally:
+                proc.terminate()
+                proc.wait(timeout=10)
+    report["config"] = config
+    report["commit"] = git_revision()
+    report["host"] = {"python": platform.python_version(), "cpus": os.cpu_count()}
+    return report
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Regresiones de RPS o p99 frente a la línea base (fracción tolerada)."""
+    problems = []
+    for name, base in baseline["endpoints"].items():
+        current = report["endpoints"].get(name)
+        if current is None or not base["requests"]:
+            continue
+        if current["rps"] < base["rps"] * (1 - tolerance):
+            problems.append(f"{name}: rps {current['rps']} < base {base['rps']}")
+        if current["p99_ms"] > base["p99_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p99 {current['p99_ms']} ms > base {base['p99_ms']} ms")
+        if current["errors"] > base["errors"]:
+            problems.append(f"{name}: {current['errors']} errores (base {base['errors']})")
+    return problems
+
+
+def print_report(report: dict):
+    print(f"Duración: {report['duration_s']} s  config: {report['config']}")
+    print(f"{'endpoint':10} {'req':>7} {'err':>5} {'rps':>8} {'p50':>9} {'p90':>9} "
+          f"{'p99':>9} {'max':>9}")
+    for name, r in [*report["endpoints"].items(), ("TOTAL", report["total"])]:
+        print(f"{name:10} {r['requests']:7d} {r['errors']:5d} {r['rps']:8.1f} "
+              f"{r['p50_ms']:9.2f} {r['p90_ms']:9.2f} {r['p99_ms']:9.2f} {r['max_ms']:9.2f}")
+    if "server" in report:
+        print(f"Servidor: {report['server']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--spawn", action="store_true", help="lanzar uvicorn local (por defecto)")
+    target.add_argument("--inprocess", action="store_true", help="transporte ASGI en proceso")
+    target.add_argument("--url", help="servidor ya en marcha")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--think", type=float, default=0.0, help="pausa entre peticiones (s)")
+    parser.add_argument("--conditional", action="store_true",
+                        help="reenviar ETag en If-None-Match")
+    parser.add_argument("--username", default=LOADTEST_USER)
+    parser.add_argument("--password", default=LOADTEST_PASSWORD)
+    parser.add_argument("--save", metavar="NOMBRE", help="guardar como línea base")
+    parser.add_argument("--compare", metavar="NOMBRE", help="comparar con una línea base")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--json", action="store_true", help="imprimir el informe en JSON")
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, f"{args.save}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"Línea base guardada en {path}")
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f"{args.compare}.json"), encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("commit") != report["commit"]:
+            print(f"Aviso: línea base tomada en {baseline.get('commit') or 'revisión desconocida'}, "
+                  f"árbol actual {report['commit']}")
+        problems = compare(report, baseline, args.tolerance)
+        for problem in problems:
+            print(f"REGRESIÓN {problem}")
+        if problems:
+            sys.exit(1)
+        print("Sin regresiones frente a la línea base")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,50 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Request
+from fastapi import APIRouter, FastAPI, Depends, HTTPException, Query, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, StreamingResponse
-from pydantic import BaseModel
+from fastapi.responses import HTMLResponse, StreamingResponse
+from contextlib import asynccontextmanager
+import csv
+import io
+import math
 import random
-import time
-import datetime
-from typing import List, Dict
-from collections import deque
+import threading
+from typing import Optional
 import os
 from auth import (
-    authenticate_user, create_access_token, get_current_active_user,
-    require_role, fake_users_db, ACCESS_TOKEN_EXPIRE_MINUTES
+    authenticate_user_async, create_access_token, get_current_active_user,
+    require_role, user_db, login_throttle, LoginBusyError, prewarm,
+    share_invalidations, ACCESS_TOKEN_EXPIRE_MINUTES
 )
 from datetime import timedelta
+from state_store import create_state_store
+from cache import TTLCache
+from payloads import PayloadCache
 
-app = FastAPI()
+# Las rutas se declaran en un router y `create_app` las monta una sola vez.
+# Dependencias pesadas (jinja2, numpy, jose, passlib) se importan al primer uso.
+router = APIRouter()
 
-# Configuración de templates y archivos estáticos
 current_dir = os.path.dirname(os.path.abspath(__file__))
-templates = Jinja2Templates(directory=os.path.join(current_dir, "templates"))
-app.mount("/static", StaticFiles(directory=os.path.join(current_dir, "static")), name="static")
-
-# Almacenamiento en memoria
-lecturas_historicas = deque(maxlen=100)  # Mantener las últimas 100 lecturas
+_templates = None
+
+def get_templates():
+    global _templates
+    if _templates is None:
+        from fastapi.templating import Jinja2Templates
+        _templates = Jinja2Templates(directory=os.path.join(current_dir, "templates"))
+    return _templates
+
+# Estado de sensores: en memoria, o compartido entre workers (DASHBOARD_STATE=sqlite)
+state_store = create_state_store()
+if state_store.shared:
+    # disable_user/set_user_role en un worker invalidan las cachés de todos
+    share_invalidations(lambda: state_store.epoch("users"),
+                        lambda: state_store.bump_epoch("users"))
+# Antigüedad máxima de la muestra antes de generar otra
+SAMPLE_INTERVAL_SECONDS = float(os.getenv("DASHBOARD_SAMPLE_INTERVAL", "1.0"))
+aggregate_cache = TTLCache(maxsize=256, ttl=300)
+# Respuestas ya codificadas/comprimidas por versión de muestra
+payload_cache = PayloadCache()
 
 # Simulación de sensores
 SENSORS = [
@@ -34,10 +54,7 @@ SENSORS = [
     {"id": "PRES001", "name": "Presencia", "min": 0, "max": 1, "unit": "presente"},
 ]
 
-sensor_data = {}
-
 def generate_sensor_data():
-    global sensor_data
     sensor_data = {}
     for s in SENSORS:
         if s["id"].startswith("TEMP"):
@@ -64,65 +81,76 @@ def generate_sensor_data():
             "max": s["max"],
             "status": status
         }
+    return sensor_data
 
 # Rutas de autenticación
-@app.post("/token")
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = authenticate_user(fake_users_db, form_data.username, form_data.password)
+@router.post("/token")
+async def login_for_access_token(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = login_throttle.check(form_data.username, client_ip)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Demasiados intentos de inicio de sesión",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+    try:
+        user = await authenticate_user_async(user_db, form_data.username, form_data.password)
+    except LoginBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado, intente de nuevo",
+            headers={"Retry-After": "1"},
+        )
     if not user:
+        login_throttle.record_failure(form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuario o contraseña incorrectos",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    login_throttle.record_success(form_data.username)
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.username}, expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
-@app.get("/", response_class=HTMLResponse)
+@router.get("/", response_class=HTMLResponse)
 async def login_page(request: Request):
-    return templates.TemplateResponse("login.html", {"request": request})
+    return get_templates().TemplateResponse("login.html", {"request": request})
 
-@app.get("/dashboard", response_class=HTMLResponse)
+@router.get("/dashboard", response_class=HTMLResponse)
 async def dashboard(request: Request):
-    return templates.TemplateResponse("dashboard.html", {"request": request})
+    return get_templates().TemplateResponse("dashboard.html", {"request": request})
 
 # Rutas protegidas para la API
-@app.get("/api/sensors")
-async def get_sensors(current_user = Depends(get_current_active_user)):
-    generate_sensor_data()
-    # Guardar cada lectura en memoria
-    now = datetime.datetime.utcnow()
-    docs = []
-    for s in sensor_data.values():
-        doc = s.copy()
-        doc["timestamp"] = now
-        docs.append(doc)
-    if docs:
-        lecturas_historicas.extend(docs)
-    return list(sensor_data.values())
-
-@app.get("/api/sensors/{sensor_id}")
+@router.get("/api/sensors")
+async def get_sensors(request: Request, current_user = Depends(get_current_active_user)):
+    # Una muestra nueva (guardada también en el historial) como mucho por intervalo
+    version = state_store.sample_if_stale(generate_sensor_data, SAMPLE_INTERVAL_SECONDS)
+    return payload_cache.response(
+        request, "sensors", version, lambda: list(state_store.snapshot().values())
+    )
+
+@router.get("/api/sensors/{sensor_id}")
 async def get_sensor(sensor_id: str, current_user = Depends(get_current_active_user)):
+    sensor_data = state_store.snapshot()
     if sensor_id in sensor_data:
         return sensor_data[sensor_id]
     else:
         raise HTTPException(status_code=404, detail="Sensor no encontrado")
 
-@app.get("/api/history")
-async def get_history(current_user = Depends(get_current_active_user)):
-    # Obtener las últimas 10 lecturas del historial en memoria
-    return list(lecturas_historicas)[-10:]
+@router.get("/api/history")
+async def get_history(request: Request, current_user = Depends(get_current_active_user)):
+    # Obtener las últimas 10 lecturas del historial
+    return payload_cache.response(
+        request, "history", state_store.version(), lambda: state_store.history(10)
+    )
 
-@app.get("/api/export")
+@router.get("/api/export")
 async def export_data(current_user = Depends(require_role("admin"))):
-    import csv
-    from fastapi.responses import StreamingResponse
-    import io
-
-    # Usar las lecturas históricas en memoria
+    lecturas_historicas = state_store.history()
     if not lecturas_historicas:
         raise HTTPException(status_code=404, detail="No hay datos para exportar")
 
@@ -147,35 +175,41 @@ async def export_data(current_user = Depends(require_role("admin"))):
         headers={"Content-Disposition": "attachment; filename=sensor_data.csv"}
     )
 
-@app.get("/api/tabla_fake")
-def get_tabla_fake():
-    # Simula una tabla de registros históricos (para pruebas)
-    tabla = []
-    for i in range(10):
-        row = {}
-        for s in SENSORS:
-            if s["id"].startswith("TEMP"):
-                value = round(random.uniform(16, 28), 2)
-            elif s["id"].startswith("HUM"):
-                value = round(random.uniform(35, 65), 2)
-            elif s["id"].startswith("STOCK"):
-                value = random.randint(0, 120)
-            elif s["id"].startswith("PRES"):
-                value = random.choice([0, 1])
-            else:
-                value = 0
-            row[s["id"]] = value
-        tabla.append(row)
-    return tabla
-
-@app.get("/", response_class=HTMLResponse)
-def dashboard():
-    # Obtener el directorio actual del script
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    # Construir la ruta al archivo HTML
-    html_path = os.path.join(current_dir, "dashboard.html")
-    with open(html_path) as f:
-        return f.read()
-
-# Montar archivos estáticos
-app.mount("/static", StaticFiles(directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")), name="static") 
\ No newline at end of file
+@router.get("/api/aggregate")
+async def get_aggregate(window: Optional[float] = Query(None, ge=0), sensors: Optional[str] = None,
+                        current_user = Depends(get_current_active_user)):
+    # Estadísticas por sensor; `window` en segundos y `sensors` separados por comas
+    selected = SENSORS
+    if sensors:
+        wanted = set(sensors.split(","))
+        selected = [s for s in SENSORS if s["id"] in wanted]
+        if not selected:
+            raise HTTPException(status_code=404, detail="Sensor no encontrado")
+    # La versión de la muestra forma parte de la clave: los datos nuevos invalidan
+    key = (state_store.version(), window, tuple(s["id"] for s in selected))
+    result = aggregate_cache.get(key)
+    if result is None:
+        from aggregation import aggregate_readings
+        result = aggregate_readings(state_store.history(), selected, window)
+        aggregate_cache.set(key, result)
+    return result
+
+@asynccontextmanager
+async def _lifespan(application: FastAPI):
+    if os.getenv("DASHBOARD_PREWARM", "1") == "1":
+        # Cargar jose/bcrypt fuera de la ruta crítica de la primera petición
+        threading.Thread(target=prewarm, name="prewarm", daemon=True).start()
+    yield
+
+def create_app() -> FastAPI:
+    """Construye la aplicación (también usable con `uvicorn --factory main:create_app`)."""
+    application = FastAPI(lifespan=_lifespan)
+    application.include_router(router)
+    application.mount(
+        "/static",
+        StaticFiles(directory=os.path.join(current_dir, "static"), check_dir=False),
+        name="static",
+    )
+    return application
+
+app = create_app()
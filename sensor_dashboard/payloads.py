@@ -0,0 +1,91 @@
+import gzip
+import json
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él sólo se ofrece gzip
+    brotli = None
+
+# Por debajo de este tamaño comprimir no compensa
+MIN_COMPRESS_SIZE = 512
+
+
+def encode_json(content: Any) -> bytes:
+    """Codifica igual que JSONResponse de FastAPI."""
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False,
+        indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _compress(encoding: str, body: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+def _negotiate(accept_encoding: str) -> str:
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        # "gzip;q=0" significa que el cliente NO la acepta
+        if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(coding.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return "identity"
+
+
+class PayloadCache:
+    """Respuestas JSON pre-codificadas por nombre y versión de la muestra.
+
+    El cuerpo se serializa una vez por versión y cada variante comprimida
+    se calcula una vez bajo demanda; el resto de clientes recibe los mismos
+    bytes. La ETag incluye versión y codificación para responder 304.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[int, Dict[str, bytes]]] = {}
+        self._lock = threading.Lock()
+
+    def _body(self, name: str, version: int, encoding: str,
+              build: Callable[[], Any]) -> bytes:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry[0] != version:
+                entry = (version, {"identity": encode_json(build())})
+                self._entries[name] = entry
+            bodies = entry[1]
+            if encoding not in bodies:
+                bodies[encoding] = _compress(encoding, bodies["identity"])
+            return bodies[encoding]
+
+    def response(self, request: Request, name: str, version: int,
+                 build: Callable[[], Any]) -> Response:
+        encoding = _negotiate(request.headers.get("accept-encoding", ""))
+        identity = self._body(name, version, "identity", build)
+        if len(identity) < MIN_COMPRESS_SIZE:
+            encoding = "identity"
+        etag = f'"{name}-{version}-{encoding}"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": "private, no-cache",
+            "Vary": "Accept-Encoding, Authorization",
+        }
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=headers)
+        body = identity if encoding == "identity" else self._body(name, version, encoding, build)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
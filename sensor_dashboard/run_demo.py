@@ -1,4 +1,23 @@
+import argparse
+import os
 import uvicorn
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="localhost", port=8000, reload=False) 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Servidor del dashboard de sensores")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--audit-startup", action="store_true",
+                        help="resumen de -X importtime y tiempo hasta la primera petición")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("DASHBOARD_WORKERS", "1")),
+                        help="procesos uvicorn; con más de uno el estado se comparte en SQLite")
+    args = parser.parse_args()
+
+    if args.audit_startup:
+        import startup_audit
+        startup_audit.audit()
+        raise SystemExit(0)
+
+    if args.workers > 1:
+        # Cada worker es un proceso: el estado en memoria no se compartiría
+        os.environ.setdefault("DASHBOARD_STATE", "sqlite")
+    uvicorn.run("main:app", host=args.host, port=args.port, reload=False, workers=args.workers)
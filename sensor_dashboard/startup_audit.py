@@ -0,0 +1,95 @@
+"""Auditoría del arranque del dashboard.
+
+- Resumen de `python -X importtime -c "import main"`: módulos más costosos
+  por tiempo acumulado y propio.
+- Tiempo hasta la primera petición: desde lanzar uvicorn hasta recibir la
+  primera respuesta 200 en `/`.
+
+Uso: python startup_audit.py [--top 15] [--runs 3]   (o run_demo.py --audit-startup)
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def importtime_summary(module: str = "main", top: int = 15) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=CURRENT_DIR, capture_output=True, text=True, check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    total = next((cum for name, _, cum in entries if name.strip() == module), 0)
+    by_cumulative = sorted(entries, key=lambda e: e[2], reverse=True)[:top]
+    by_self = sorted(entries, key=lambda e: e[1], reverse=True)[:top]
+    return {
+        "module": module,
+        "total_ms": total / 1000,
+        "modules": len(entries),
+        "top_cumulative": [(n.strip(), c / 1000) for n, _, c in by_cumulative],
+        "top_self": [(n.strip(), s / 1000) for n, s, _ in by_self],
+    }
+
+
+def time_to_first_request(path: str = "/", timeout: float = 30.0) -> float:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=CURRENT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=1) as r:
+                    if r.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                if proc.poll() is not None:
+                    raise RuntimeError("uvicorn terminó durante el arranque")
+                time.sleep(0.01)
+        raise RuntimeError("el servidor no respondió a tiempo")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def audit(top: int = 15, runs: int = 3):
+    summary = importtime_summary(top=top)
+    print(f"import main: {summary['total_ms']:.1f} ms ({summary['modules']} módulos)")
+    print(f"\nTop {top} por tiempo acumulado (ms):")
+    for name, ms in summary["top_cumulative"]:
+        print(f"  {ms:9.1f}  {name}")
+    print(f"\nTop {top} por tiempo propio (ms):")
+    for name, ms in summary["top_self"]:
+        print(f"  {ms:9.1f}  {name}")
+    times = [time_to_first_request() for _ in range(runs)]
+    print(f"\nTiempo hasta la primera petición (GET /, {runs} arranques): "
+          f"mediana {statistics.median(times) * 1000:.0f} ms, "
+          f"mín {min(times) * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    audit(args.top, args.runs)
+
+
+if __name__ == "__main__":
+    main()
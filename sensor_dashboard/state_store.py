@@ -0,0 +1,232 @@
+import datetime
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+HISTORY_MAXLEN = 100  # Lecturas individuales conservadas en el historial
+
+DEFAULT_STATE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "dashboard_state.db"
+)
+
+Generator = Callable[[], Dict[str, dict]]
+
+
+class SensorStateStore(ABC):
+    """Estado de los sensores: última muestra e historial de lecturas.
+
+    Cada muestra recibe un número de versión creciente. `sample_if_stale`
+    genera una muestra nueva sólo si la última tiene más de `interval`
+    segundos, de modo que muchos clientes consultando a la vez comparten
+    la misma muestra.
+
+    Guarda también épocas con nombre: contadores que cualquier worker puede
+    incrementar (p. ej. "users", para invalidar las cachés de auth). `shared`
+    indica si el estado lo ven otros procesos.
+    """
+
+    shared = False
+
+    @abstractmethod
+    def sample_if_stale(self, generate: Generator, interval: float) -> int:
+        """Versión de la muestra vigente, generando una nueva si caducó."""
+
+    @abstractmethod
+    def snapshot(self) -> Dict[str, dict]:
+        """Última muestra: id de sensor -> lectura."""
+
+    @abstractmethod
+    def history(self, limit: Optional[int] = None) -> List[dict]:
+        """Lecturas individuales, de la más antigua a la más reciente."""
+
+    @abstractmethod
+    def version(self) -> int:
+        """Versión de la última muestra (0 si no hay ninguna)."""
+
+    @abstractmethod
+    def epoch(self, name: str) -> int:
+        """Valor actual de la época `name` (0 si nunca se incrementó)."""
+
+    @abstractmethod
+    def bump_epoch(self, name: str) -> int:
+        """Incrementa la época `name` y retorna el nuevo valor."""
+
+
+class MemoryStateStore(SensorStateStore):
+    """Estado en memoria del proceso (un solo worker)."""
+
+    def __init__(self, maxlen: int = HISTORY_MAXLEN):
+        self._snapshot: Dict[str, dict] = {}
+        self._history = deque(maxlen=maxlen)
+        self._version = 0
+        self._sampled_at = 0.0
+        self._epochs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def sample_if_stale(self, generate: Generator, interval: float) -> int:
+        with self._lock:
+            now = time.time()
+            if self._version and now - self._sampled_at < interval:
+                return self._version
+            snapshot = generate()
+            timestamp = datetime.datetime.utcfromtimestamp(now)
+            self._history.extend(dict(s, timestamp=timestamp) for s in snapshot.values())
+            self._snapshot = snapshot
+            self._sampled_at = now
+            self._version += 1
+            return self._version
+
+    def snapshot(self) -> Dict[str, dict]:
+        return self._snapshot
+
+    def history(self, limit: Optional[int] = None) -> List[dict]:
+        items = list(self._history)
+        return items[-limit:] if limit else items
+
+    def version(self) -> int:
+        return self._version
+
+    def epoch(self, name: str) -> int:
+        return self._epochs.get(name, 0)
+
+    def bump_epoch(self, name: str) -> int:
+        with self._lock:
+            self._epochs[name] = self._epochs.get(name, 0) + 1
+            return self._epochs[name]
+
+
+class SQLiteStateStore(SensorStateStore):
+    """Estado compartido entre workers en un fichero SQLite en modo WAL.
+
+    Todos los procesos ven la misma muestra: la comprobación de antigüedad
+    y la inserción ocurren dentro de una transacción `BEGIN IMMEDIATE`, por
+    lo que sólo un worker genera cada muestra.
+    """
+
+    COLUMNS = ("id", "name", "value", "unit", "min", "max", "status")
+    shared = True
+
+    def __init__(self, path: str = DEFAULT_STATE_PATH, maxlen: int = HISTORY_MAXLEN):
+        self.path = path
+        self.maxlen = maxlen
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS lecturas (
+                rowid_ INTEGER PRIMARY KEY AUTOINCREMENT,
+                sample INTEGER NOT NULL,
+                ts REAL NOT NULL,
+                sensor_id TEXT NOT NULL,
+                name TEXT,
+                value,
+                unit TEXT,
+                min_value,
+                max_value,
+                status TEXT
+            )"""
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_lecturas_sample ON lecturas(sample)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS epocas (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _latest(self, conn):
+        return conn.execute(
+            "SELECT sample, ts FROM lecturas ORDER BY rowid_ DESC LIMIT 1"
+        ).fetchone()
+
+    def sample_if_stale(self, generate: Generator, interval: float) -> int:
+        conn = self._conn()
+        latest = self._latest(conn)
+        if latest and time.time() - latest[1] < interval:
+            return latest[0]
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            latest = self._latest(conn)
+            now = time.time()
+            if latest and now - latest[1] < interval:
+                conn.execute("COMMIT")
+                return latest[0]
+            sample = (latest[0] if latest else 0) + 1
+            conn.executemany(
+                "INSERT INTO lecturas (sample, ts, sensor_id, name, value, unit, "
+                "min_value, max_value, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(sample, now) + tuple(s[c] for c in self.COLUMNS)
+                 for s in generate().values()]
+            )
+            conn.execute(
+                "DELETE FROM lecturas WHERE rowid_ <= "
+                "(SELECT MAX(rowid_) FROM lecturas) - ?", (self.maxlen,)
+            )
+            conn.execute("COMMIT")
+            return sample
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _rows(self, sql: str, params=()) -> List[dict]:
+        rows = []
+        for row in self._conn().execute(sql, params):
+            doc = dict(zip(self.COLUMNS, row[1:]))
+            doc["timestamp"] = datetime.datetime.utcfromtimestamp(row[0])
+            rows.append(doc)
+        return rows
+
+    def snapshot(self) -> Dict[str, dict]:
+        rows = self._rows(
+            "SELECT ts, sensor_id, name, value, unit, min_value, max_value, status "
+            "FROM lecturas WHERE sample = (SELECT MAX(sample) FROM lecturas) "
+            "ORDER BY rowid_"
+        )
+        snapshot = {}
+        for doc in rows:
+            del doc["timestamp"]
+            snapshot[doc["id"]] = doc
+        return snapshot
+
+    def history(self, limit: Optional[int] = None) -> List[dict]:
+        rows = self._rows(
+            "SELECT ts, sensor_id, name, value, unit, min_value, max_value, status "
+            "FROM lecturas ORDER BY rowid_ DESC LIMIT ?", (limit or self.maxlen,)
+        )
+        rows.reverse()
+        return rows
+
+    def version(self) -> int:
+        row = self._conn().execute("SELECT MAX(sample) FROM lecturas").fetchone()
+        return row[0] or 0
+
+    def epoch(self, name: str) -> int:
+        row = self._conn().execute("SELECT value FROM epocas WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    def bump_epoch(self, name: str) -> int:
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO epocas (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,)
+        )
+        return self.epoch(name)
+
+
+def create_state_store() -> SensorStateStore:
+    """Crea el almacén configurado en DASHBOARD_STATE (`memory` o `sqlite`)."""
+    kind = os.getenv("DASHBOARD_STATE", "memory")
+    if kind == "sqlite":
+        return SQLiteStateStore(os.getenv("DASHBOARD_STATE_PATH", DEFAULT_STATE_PATH))
+    if kind == "memory":
+        return MemoryStateStore()
+    raise ValueError(f"DASHBOARD_STATE desconocido: {kind}")
@@ -0,0 +1,124 @@
+"""Pruebas de aggregation.py y /api/aggregate frente a un cálculo en Python puro.
+
+Ejecutar: python -m pytest test_aggregation.py
+"""
+import datetime
+import math
+import random
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import auth
+import main
+from aggregation import PERCENTILES, aggregate_readings
+from state_store import MemoryStateStore
+
+SENSORS = [
+    {"id": "A", "name": "Sensor A", "unit": "u", "min": 10, "max": 20},
+    {"id": "B", "name": "Sensor B", "unit": "u", "min": 0, "max": 1},
+    {"id": "C", "name": "Sensor C", "unit": "u", "min": 0, "max": 5},  # sin lecturas
+]
+
+
+def percentile(values, pct):
+    """Interpolación lineal entre rangos, como numpy.percentile."""
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * pct / 100
+    lo, hi = math.floor(pos), math.ceil(pos)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def reference(readings, sensors, window=None):
+    if window is not None and readings:
+        newest = max(r["timestamp"] for r in readings)
+        readings = [r for r in readings if (newest - r["timestamp"]).total_seconds() <= window]
+    result = []
+    for s in sensors:
+        values = [r["value"] for r in readings if r["id"] == s["id"]]
+        entry = {"id": s["id"], "count": len(values)}
+        if values:
+            entry["mean"] = round(sum(values) / len(values), 2)
+            entry["min"], entry["max"] = min(values), max(values)
+            for pct in PERCENTILES:
+                entry[f"p{pct}"] = round(percentile(values, pct), 2)
+            entry["below_min"] = sum(v < s["min"] for v in values)
+            entry["above_max"] = sum(v > s["max"] for v in values)
+        result.append(entry)
+    return result
+
+
+def make_readings(n, seed=3):
+    rnd = random.Random(seed)
+    start = datetime.datetime(2024, 1, 1)
+    return [{"id": rnd.choice("AB"), "value": round(rnd.uniform(5, 25), 2),
+             "timestamp": start + datetime.timedelta(seconds=i)} for i in range(n)]
+
+
+class AggregateReadingsTest(unittest.TestCase):
+    def assertMatchesReference(self, readings, window=None):
+        result = aggregate_readings(readings, SENSORS, window)
+        for got, expected in zip(result, reference(readings, SENSORS, window)):
+            for key, value in expected.items():
+                self.assertAlmostEqual(got[key], value, places=6, msg=(got["id"], key))
+
+    def test_matches_plain_python(self):
+        self.assertMatchesReference(make_readings(500))
+
+    def test_window_counts_back_from_newest_reading(self):
+        readings = make_readings(500)
+        self.assertMatchesReference(readings, window=60)
+        result = aggregate_readings(readings, SENSORS, window=60)
+        self.assertEqual(sum(entry["count"] for entry in result), 61)
+
+    def test_single_reading(self):
+        self.assertMatchesReference(make_readings(1))
+
+    def test_sensors_without_readings_have_the_same_keys(self):
+        result = aggregate_readings(make_readings(50), SENSORS)
+        self.assertEqual(set(result[2]), set(result[0]))
+        self.assertEqual(result[2]["count"], 0)
+        self.assertIsNone(result[2]["mean"])
+        self.assertIsNone(result[2]["p99"])
+        self.assertEqual(aggregate_readings([], SENSORS)[0].keys(), result[0].keys())
+
+
+class AggregateEndpointTest(unittest.TestCase):
+    def setUp(self):
+        store = MemoryStateStore()
+        for _ in range(20):
+            store.sample_if_stale(main.generate_sensor_data, 0)
+        patcher = mock.patch.object(main, "state_store", store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.store = store
+        main.aggregate_cache.clear()
+        main.app.dependency_overrides[auth.get_current_active_user] = (
+            lambda: auth.User(username="test"))
+        self.addCleanup(main.app.dependency_overrides.clear)
+        self.client = TestClient(main.app)
+
+    def test_endpoint_matches_reference(self):
+        response = self.client.get("/api/aggregate", params={"sensors": "TEMP001,HUM001"})
+        self.assertEqual(response.status_code, 200)
+        selected = [s for s in main.SENSORS if s["id"] in ("TEMP001", "HUM001")]
+        expected = reference(self.store.history(), selected)
+        for got, want in zip(response.json(), expected):
+            for key, value in want.items():
+                self.assertAlmostEqual(got[key], value, places=6)
+
+    def test_negative_window_is_rejected(self):
+        self.assertEqual(self.client.get("/api/aggregate", params={"window": -1}).status_code, 422)
+        self.assertEqual(self.client.get("/api/aggregate", params={"window": 0}).status_code, 200)
+
+    def test_unknown_sensor(self):
+        self.assertEqual(self.client.get("/api/aggregate", params={"sensors": "X"}).status_code, 404)
+
+    def test_requires_authentication(self):
+        main.app.dependency_overrides.clear()
+        self.assertEqual(self.client.get("/api/aggregate").status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Pruebas de create_app: rutas únicas, montaje estático, lifespan e imports diferidos.
+
+Ejecutar: python -m pytest test_app.py
+"""
+import os
+import subprocess
+import sys
+import threading
+import unittest
+from collections import Counter
+from unittest import mock
+
+from fastapi.routing import Mount
+from fastapi.testclient import TestClient
+
+import main
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+HEAVY_MODULES = ("jose", "passlib", "numpy", "jinja2")
+
+
+class CreateAppTest(unittest.TestCase):
+    def test_routes_are_not_duplicated(self):
+        app = main.create_app()
+        paths = Counter(route.path for route in app.routes)
+        self.assertEqual([path for path, n in paths.items() if n > 1], [])
+        self.assertIn("/", paths)
+        mounts = [route for route in app.routes if isinstance(route, Mount)]
+        self.assertEqual([mount.path for mount in mounts], ["/static"])
+
+    def test_each_app_is_independent(self):
+        first, second = main.create_app(), main.create_app()
+        self.assertEqual(len(first.routes), len(second.routes))
+        self.assertEqual(len(main.create_app().routes), len(main.app.routes))
+
+    def test_lifespan_prewarms_auth(self):
+        with mock.patch.object(main, "prewarm") as prewarm:
+            with mock.patch.dict(os.environ, {"DASHBOARD_PREWARM": "1"}):
+                with TestClient(main.create_app()):
+                    pass
+            with mock.patch.dict(os.environ, {"DASHBOARD_PREWARM": "0"}):
+                with TestClient(main.create_app()):
+                    pass
+        # El hilo puede no haber terminado al salir del bloque: se espera
+        for thread in threading.enumerate():
+            if thread.name == "prewarm":
+                thread.join(5)
+        self.assertEqual(prewarm.call_count, 1)
+
+
+class LazyImportTest(unittest.TestCase):
+    def test_import_main_does_not_load_heavy_modules(self):
+        code = ("import sys, main; "
+                f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+        result = subprocess.run([sys.executable, "-c", code], cwd=CURRENT_DIR,
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), "")
+
+    def test_heavy_modules_load_on_first_use(self):
+        code = ("import sys, main; from fastapi.testclient import TestClient; "
+                "TestClient(main.app).get('/'); print('jinja2' in sys.modules)")
+        result = subprocess.run([sys.executable, "-c", code], cwd=CURRENT_DIR,
+                                capture_output=True, text=True, check=True,
+                                env=dict(os.environ, DASHBOARD_PREWARM="0"))
+        self.assertEqual(result.stdout.strip().splitlines()[-1], "True")
+
+
+if __name__ == "__main__":
+    unittest.main()
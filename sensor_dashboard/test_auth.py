@@ -0,0 +1,71 @@
+"""Pruebas de las cachés de autenticación de auth.py.
+
+Ejecutar: python -m pytest test_auth.py
+"""
+import asyncio
+import copy
+import unittest
+from datetime import timedelta
+from unittest import mock
+
+from fastapi import HTTPException
+
+import auth
+from user_store import InMemoryUserStore
+
+
+class AuthCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.store = InMemoryUserStore(copy.deepcopy(auth.fake_users_db))
+        patcher = mock.patch.object(auth, "user_db", self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        auth.token_cache.clear()
+        auth.user_cache.clear()
+        self.addCleanup(auth.token_cache.clear)
+        self.addCleanup(auth.user_cache.clear)
+        self.token = auth.create_access_token({"sub": "user"}, timedelta(minutes=5))
+
+    def current_user(self):
+        async def resolve():
+            user = await auth.get_current_user(self.token)
+            return await auth.get_current_active_user(user)
+        return asyncio.run(resolve())
+
+    def test_token_and_user_are_cached(self):
+        user = self.current_user()
+        self.assertIs(auth.token_cache.get(self.token), user)
+        # Cambios en el almacén sin pasar por update_user no se ven hasta que expire
+        self.store.users["user"]["role"] = "admin"
+        self.assertEqual(self.current_user().role, "user")
+
+    def test_disable_user_invalidates_cached_token(self):
+        self.assertFalse(self.current_user().disabled)
+        auth.disable_user("user")
+        self.assertIsNone(auth.token_cache.get(self.token))
+        with self.assertRaises(HTTPException) as ctx:
+            self.current_user()
+        self.assertEqual(ctx.exception.status_code, 400)
+
+    def test_role_change_is_seen_on_next_request(self):
+        self.assertEqual(self.current_user().role, "user")
+        auth.set_user_role("user", "admin")
+        self.assertEqual(self.current_user().role, "admin")
+
+    def test_other_users_stay_cached(self):
+        admin_token = auth.create_access_token({"sub": "admin"}, timedelta(minutes=5))
+        admin = asyncio.run(auth.get_current_user(admin_token))
+        self.current_user()
+        auth.disable_user("user")
+        self.assertIs(auth.token_cache.get(admin_token), admin)
+
+    def test_verify_password_does_not_print(self):
+        hashed = auth.get_password_hash("secreto")
+        with mock.patch("builtins.print") as printed:
+            self.assertTrue(auth.verify_password("secreto", hashed))
+            self.assertFalse(auth.verify_password("otra", hashed))
+        printed.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Pruebas de /token: límites de intentos (429) y cola de bcrypt llena (503).
+
+Ejecutar: python -m pytest test_login.py
+"""
+import copy
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import auth
+import main
+from user_store import InMemoryUserStore
+
+
+class LoginThrottleTest(unittest.TestCase):
+    def setUp(self):
+        users = copy.deepcopy(auth.fake_users_db)
+        users["user"]["hashed_password"] = auth.get_password_hash("secreto")
+        self.throttle = auth.LoginThrottle()
+        for target, name, value in ((main, "user_db", InMemoryUserStore(users)),
+                                    (main, "login_throttle", self.throttle)):
+            patcher = mock.patch.object(target, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        auth.user_cache.clear()
+        self.addCleanup(auth.user_cache.clear)
+        self.client = TestClient(main.app)
+
+    def login(self, password, username="user"):
+        return self.client.post("/token", data={"username": username, "password": password})
+
+    def test_failed_logins_are_throttled_per_user(self):
+        for _ in range(auth.USER_MAX_FAILED_LOGINS):
+            self.assertEqual(self.login("mala").status_code, 401)
+        response = self.login("secreto")
+        self.assertEqual(response.status_code, 429)
+        retry_after = int(response.headers["Retry-After"])
+        self.assertTrue(0 < retry_after <= auth.USER_FAILED_WINDOW_SECONDS)
+        # Otro usuario desde la misma IP no queda bloqueado
+        self.assertEqual(self.login("mala", username="admin").status_code, 401)
+
+    def test_success_resets_failures(self):
+        for _ in range(auth.USER_MAX_FAILED_LOGINS - 1):
+            self.login("mala")
+        self.assertEqual(self.login("secreto").status_code, 200)
+        self.assertEqual(self.login("mala").status_code, 401)
+        self.assertEqual(self.login("secreto").status_code, 200)
+
+    def test_attempts_are_limited_per_ip(self):
+        self.throttle.ips = auth.AttemptLimiter(max_attempts=3, window=60)
+        for _ in range(3):
+            self.assertEqual(self.login("secreto").status_code, 200)
+        response = self.login("secreto")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response.headers)
+
+    def test_full_bcrypt_queue_returns_503(self):
+        with mock.patch.object(auth, "MAX_PENDING_LOGINS", 0):
+            response = self.login("secreto")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["Retry-After"], "1")
+        # Un login rechazado por carga no cuenta como fallo del usuario
+        self.assertEqual(self.throttle.users.retry_after("user"), 0.0)
+        self.assertEqual(self.login("secreto").status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""Pruebas de payloads.py: ETag/304 y negociación de gzip en /api/sensors y /api/history.
+
+Ejecutar: python -m pytest test_payloads.py
+"""
+import gzip
+import json
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import auth
+import main
+import payloads
+from payloads import PayloadCache
+from state_store import MemoryStateStore
+
+
+class NegotiateTest(unittest.TestCase):
+    def test_accept_encoding(self):
+        self.assertEqual(payloads._negotiate(""), "identity")
+        self.assertEqual(payloads._negotiate("gzip, deflate"), "gzip")
+        self.assertEqual(payloads._negotiate("deflate, GZIP;q=0.5"), "gzip")
+        self.assertEqual(payloads._negotiate("gzip;q=0"), "identity")
+        self.assertEqual(payloads._negotiate("deflate"), "identity")
+
+
+class PayloadEndpointTest(unittest.TestCase):
+    def setUp(self):
+        self.store = MemoryStateStore()
+        for _ in range(10):
+            self.store.sample_if_stale(main.generate_sensor_data, 0)
+        for name, value in (("state_store", self.store), ("payload_cache", PayloadCache()),
+                            ("SAMPLE_INTERVAL_SECONDS", 3600)):
+            patcher = mock.patch.object(main, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        main.app.dependency_overrides[auth.get_current_active_user] = (
+            lambda: auth.User(username="test"))
+        self.addCleanup(main.app.dependency_overrides.clear)
+        self.client = TestClient(main.app)
+
+    def get(self, path, **headers):
+        # httpx descomprime por su cuenta: se pide la codificación explícitamente
+        return self.client.get(path, headers={"Accept-Encoding": "identity", **headers})
+
+    def test_gzip_body_matches_identity(self):
+        plain = self.get("/api/history")
+        self.assertNotIn("content-encoding", plain.headers)
+        self.assertGreaterEqual(len(plain.content), payloads.MIN_COMPRESS_SIZE)
+        with self.client.stream("GET", "/api/history", headers={"Accept-Encoding": "gzip"}) as raw:
+            self.assertEqual(raw.headers["content-encoding"], "gzip")
+            self.assertIn("Accept-Encoding", raw.headers["vary"])
+            compressed = b"".join(raw.iter_raw())
+        self.assertLess(len(compressed), len(plain.content))
+        self.assertEqual(json.loads(gzip.decompress(compressed)), plain.json())
+        self.assertNotEqual(raw.headers["etag"], plain.headers["etag"])
+
+    def test_small_payloads_are_not_compressed(self):
+        with mock.patch.object(payloads, "MIN_COMPRESS_SIZE", 10 ** 6):
+            response = self.get("/api/history", **{"Accept-Encoding": "gzip"})
+        self.assertNotIn("content-encoding", response.headers)
+        self.assertTrue(response.headers["etag"].endswith('-identity"'))
+
+    def test_etag_returns_304_until_new_sample(self):
+        first = self.get("/api/sensors")
+        etag = first.headers["etag"]
+        again = self.get("/api/sensors", **{"If-None-Match": etag})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b"")
+        self.assertEqual(again.headers["etag"], etag)
+        # La ETag de otro recurso no vale
+        self.assertEqual(self.get("/api/history", **{"If-None-Match": etag}).status_code, 200)
+
+        self.store.sample_if_stale(main.generate_sensor_data, 0)
+        with mock.patch.object(main, "SAMPLE_INTERVAL_SECONDS", 0):
+            changed = self.get("/api/sensors", **{"If-None-Match": etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers["etag"], etag)
+        self.assertEqual(changed.json(), list(self.store.snapshot().values()))
+
+    def test_history_etag_follows_version(self):
+        etag = self.get("/api/history").headers["etag"]
+        self.assertEqual(self.get("/api/history", **{"If-None-Match": etag}).status_code, 304)
+        self.store.sample_if_stale(main.generate_sensor_data, 0)
+        self.assertEqual(self.get("/api/history", **{"If-None-Match": etag}).status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
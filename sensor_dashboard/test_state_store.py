@@ -0,0 +1,136 @@
+"""Pruebas de state_store.py, incluido el modo SQLite entre procesos.
+
+Ejecutar: python -m pytest test_state_store.py
+"""
+import asyncio
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import timedelta
+from unittest import mock
+
+from fastapi import HTTPException
+
+import auth
+from state_store import MemoryStateStore, SensorStateStore, SQLiteStateStore
+from user_store import SQLiteUserStore
+
+
+def make_sample(tag):
+    return {
+        "TEMP001": {"id": "TEMP001", "name": "Temperatura", "value": tag, "unit": "°C",
+                    "min": 18, "max": 26, "status": "normal"},
+    }
+
+
+def _sample_worker(path, tag, barrier, results):
+    store = SQLiteStateStore(path)
+    barrier.wait()
+    results.put((tag, store.sample_if_stale(lambda: make_sample(tag), interval=60)))
+
+
+def _disable_worker(state_path, users_path, username):
+    store = SQLiteStateStore(state_path)
+    auth.share_invalidations(lambda: store.epoch("users"), lambda: store.bump_epoch("users"))
+    auth.disable_user(username, db=SQLiteUserStore(users_path))
+
+
+class StateStoreContractTest(unittest.TestCase):
+    def stores(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        return [MemoryStateStore(maxlen=3), SQLiteStateStore(os.path.join(tmpdir.name, "s.db"), maxlen=3)]
+
+    def test_interface_is_abstract(self):
+        with self.assertRaises(TypeError):
+            SensorStateStore()
+
+    def test_sampling_and_history(self):
+        for store in self.stores():
+            with self.subTest(store=type(store).__name__):
+                self.assertEqual(store.version(), 0)
+                self.assertEqual(store.sample_if_stale(lambda: make_sample(1), 60), 1)
+                # Muestra reciente: no se genera otra
+                self.assertEqual(store.sample_if_stale(lambda: make_sample(2), 60), 1)
+                for tag in (3, 4, 5):
+                    store.sample_if_stale(lambda: make_sample(tag), 0)
+                self.assertEqual(store.version(), 4)
+                self.assertEqual(store.snapshot()["TEMP001"]["value"], 5)
+                self.assertEqual([row["value"] for row in store.history()], [3, 4, 5])
+                self.assertEqual([row["value"] for row in store.history(2)], [4, 5])
+
+    def test_epochs(self):
+        for store in self.stores():
+            with self.subTest(store=type(store).__name__):
+                self.assertEqual(store.epoch("users"), 0)
+                self.assertEqual(store.bump_epoch("users"), 1)
+                self.assertEqual(store.bump_epoch("users"), 2)
+                self.assertEqual(store.epoch("otra"), 0)
+
+
+class SQLiteAcrossProcessesTest(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.dir = tmpdir.name
+        self.path = os.path.join(self.dir, "state.db")
+        self.ctx = multiprocessing.get_context("spawn")
+
+    def run_process(self, target, *args):
+        proc = self.ctx.Process(target=target, args=args)
+        proc.start()
+        proc.join(30)
+        self.assertEqual(proc.exitcode, 0)
+
+    def test_concurrent_workers_share_one_sample(self):
+        SQLiteStateStore(self.path)
+        barrier, results = self.ctx.Barrier(2), self.ctx.Queue()
+        procs = [self.ctx.Process(target=_sample_worker, args=(self.path, tag, barrier, results))
+                 for tag in (1, 2)]
+        for proc in procs:
+            proc.start()
+        versions = [results.get(timeout=30) for _ in procs]
+        for proc in procs:
+            proc.join(30)
+        self.assertEqual({version for _, version in versions}, {1})
+        store = SQLiteStateStore(self.path)
+        self.assertEqual(store.version(), 1)
+        self.assertIn(store.snapshot()["TEMP001"]["value"], (1, 2))
+
+    def test_disable_in_another_worker_invalidates_cached_token(self):
+        users_path = os.path.join(self.dir, "users.db")
+        conn = sqlite3.connect(users_path)
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT UNIQUE NOT NULL, "
+                     "email TEXT UNIQUE NOT NULL, password TEXT NOT NULL, role TEXT DEFAULT 'user')")
+        conn.execute("INSERT INTO users (username, email, password) VALUES ('ana', 'a@x', 'x')")
+        conn.commit()
+        conn.close()
+        users = SQLiteUserStore(users_path)
+        users.migrate()
+        store = SQLiteStateStore(self.path)
+
+        auth.token_cache.clear()
+        auth.user_cache.clear()
+        self.addCleanup(auth.token_cache.clear)
+        self.addCleanup(auth.user_cache.clear)
+        for name, value in (("user_db", users), ("_epoch_source", None), ("_seen_epoch", None)):
+            patcher = mock.patch.object(auth, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        auth.share_invalidations(lambda: store.epoch("users"), lambda: store.bump_epoch("users"))
+        token = auth.create_access_token({"sub": "ana"}, timedelta(minutes=5))
+
+        async def active_user():
+            return await auth.get_current_active_user(await auth.get_current_user(token))
+
+        self.assertFalse(asyncio.run(active_user()).disabled)
+        self.run_process(_disable_worker, self.path, users_path, "ana")
+        with self.assertRaises(HTTPException) as ctx:
+            asyncio.run(active_user())
+        self.assertEqual(ctx.exception.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
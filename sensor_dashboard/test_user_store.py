@@ -0,0 +1,100 @@
+"""Pruebas de user_store.py con bases SQLite temporales.
+
+Ejecutar: python -m pytest test_user_store.py
+"""
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import auth
+from user_store import InMemoryUserStore, SQLiteUserStore, UserStore
+
+SCHEMA = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT UNIQUE NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    password TEXT NOT NULL,
+    role TEXT DEFAULT 'user'
+);
+CREATE TABLE usuarios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT NOT NULL,
+    email TEXT NOT NULL,
+    "contraseña" TEXT NOT NULL,
+    rol TEXT DEFAULT 'user'
+);
+INSERT INTO users (username, email, password, role) VALUES ('ana', 'ana@example.com', 'x', 'admin');
+INSERT INTO usuarios (nombre, email, "contraseña", rol) VALUES ('Luis', 'luis@example.com', 'y', NULL);
+"""
+
+
+class SQLiteUserStoreTest(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = os.path.join(tmpdir.name, "users.db")
+        conn = sqlite3.connect(self.path)
+        conn.executescript(SCHEMA)
+        conn.close()
+        self.store = SQLiteUserStore(self.path, pool_size=2)
+        self.addCleanup(self.store.pool.close)
+        auth.user_cache.clear()
+        self.addCleanup(auth.user_cache.clear)
+
+    def schema(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            return sorted(conn.execute("SELECT type, name, sql FROM sqlite_master").fetchall(),
+                          key=repr)
+        finally:
+            conn.close()
+
+    def test_constructor_does_not_modify_the_database(self):
+        before = self.schema()
+        SQLiteUserStore(self.path).pool.close()
+        self.assertEqual(self.schema(), before)
+
+    def test_reads_both_tables(self):
+        self.assertEqual(self.store.get("ana")["role"], "admin")
+        luis = self.store.get("luis@example.com")
+        self.assertEqual((luis["full_name"], luis["role"], luis["disabled"]), ("Luis", "user", False))
+        self.assertIsNone(self.store.get("nadie"))
+
+    def test_disable_needs_migration(self):
+        with self.assertRaisesRegex(ValueError, "migrate"):
+            self.store.update("ana", disabled=True)
+        self.store.migrate()
+        self.store.migrate()  # idempotente
+        names = {name for _, name, _ in self.schema()}
+        self.assertIn("idx_usuarios_email", names)
+        auth.disable_user("ana", db=self.store)
+        auth.disable_user("luis@example.com", db=self.store)
+        self.assertTrue(self.store.get("ana")["disabled"])
+        self.assertTrue(auth.get_user(self.store, "luis@example.com").disabled)
+
+    def test_update_role_and_unknown_user(self):
+        auth.set_user_role("luis@example.com", "admin", db=self.store)
+        self.assertEqual(self.store.get("luis@example.com")["role"], "admin")
+        with self.assertRaises(KeyError):
+            self.store.update("nadie", role="admin")
+        with self.assertRaises(ValueError):
+            self.store.update("ana", full_name="Ana")  # `users` no tiene nombre
+
+
+class UserStoreInterfaceTest(unittest.TestCase):
+    def test_interface_is_abstract(self):
+        with self.assertRaises(TypeError):
+            UserStore()
+
+    def test_in_memory_update(self):
+        store = InMemoryUserStore({"a": {"username": "a", "disabled": False}})
+        store.update("a", disabled=True)
+        self.assertTrue(store.get("a")["disabled"])
+        with self.assertRaises(KeyError):
+            store.update("b", disabled=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,231 @@
+import argparse
+import os
+import queue
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Base de datos del backend (tablas `users` y `usuarios`)
+DEFAULT_DB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "backend", "basedeDatos", "replikstore.db"
+)
+
+
+class UserStore(ABC):
+    """Interfaz de almacenamiento de usuarios.
+
+    `get` retorna un dict con los campos de `UserInDB` o None. La caché de
+    lectura vive en `auth.get_user`, que es la única vía de consulta.
+    """
+
+    @abstractmethod
+    def get(self, username: str) -> Optional[Dict]:
+        """Datos del usuario o None."""
+
+    @abstractmethod
+    def update(self, username: str, **changes):
+        """Modifica campos del usuario; KeyError si no existe."""
+
+
+class InMemoryUserStore(UserStore):
+    """Usuarios en un dict en memoria (p. ej. `fake_users_db`)."""
+
+    def __init__(self, users: Dict[str, Dict]):
+        self.users = users
+
+    def get(self, username: str) -> Optional[Dict]:
+        return self.users.get(username)
+
+    def update(self, username: str, **changes):
+        if username not in self.users:
+            raise KeyError(username)
+        self.users[username].update(changes)
+
+
+class ConnectionPool:
+    """Pool acotado de conexiones SQLite reutilizables entre hilos."""
+
+    def __init__(self, db_path: str, size: int = 4):
+        self.db_path = db_path
+        self.size = size
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5.0)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            conn = self._connect() if can_create else self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        self._created = 0
+
+
+class SQLiteUserStore(UserStore):
+    """Usuarios en las tablas `users` (backend Node) y `usuarios` de replikstore.db.
+
+    `users` se consulta por `username`; `usuarios`, que no tiene ese campo,
+    por `email`. Ambas búsquedas usan índice (tras `migrate` si `usuarios`
+    no declara `email` UNIQUE).
+
+    El constructor sólo lee el esquema. `disabled` necesita la columna del
+    mismo nombre, que ninguna de las dos tablas trae de origen: la añade
+    `migrate()` (python user_store.py migrate). Sin ella los usuarios se
+    leen como activos y `update(disabled=...)` falla con ValueError.
+    """
+
+    # Columnas que `update` puede modificar, por tabla
+    UPDATABLE = {
+        "users": {"role": "role", "email": "email", "hashed_password": "password",
+                  "disabled": "disabled"},
+        "usuarios": {"role": "rol", "full_name": "nombre", "hashed_password": "contraseña",
+                     "disabled": "disabled"},
+    }
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, pool_size: int = 4):
+        self.pool = ConnectionPool(db_path, pool_size)
+        self._load_schema()
+
+    def _load_schema(self):
+        with self.pool.connection() as conn:
+            self.tables = {
+                row["name"] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type='table' "
+                    "AND name IN ('users', 'usuarios')"
+                )
+            }
+            self.columns = {
+                table: {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+                for table in self.tables
+            }
+
+    def migrate(self):
+        """Añade la columna `disabled` y el índice de `usuarios.email` si faltan.
+
+        Modifica la base: se ejecuta a mano o en el despliegue, nunca al importar.
+        """
+        with self.pool.connection() as conn:
+            for table in self.tables:
+                if "disabled" not in self.columns[table]:
+                    conn.execute(
+                        f"ALTER TABLE {table} ADD COLUMN disabled INTEGER NOT NULL DEFAULT 0"
+                    )
+            # `users.username` ya es UNIQUE (índice implícito)
+            if "usuarios" in self.tables:
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_usuarios_email ON usuarios(email)")
+            conn.commit()
+        self._load_schema()
+
+    def _disabled_sql(self, table: str) -> str:
+        return "disabled" if "disabled" in self.columns[table] else "0 AS disabled"
+
+    def get(self, username: str) -> Optional[Dict]:
+        with self.pool.connection() as conn:
+            if "users" in self.tables:
+                row = conn.execute(
+                    f"SELECT username, email, password, role, {self._disabled_sql('users')} "
+                    "FROM users WHERE username = ?",
+                    (username,)
+                ).fetchone()
+                if row is not None:
+                    return {
+                        "username": row["username"],
+                        "email": row["email"],
+                        "full_name": None,
+                        "hashed_password": row["password"],
+                        "disabled": bool(row["disabled"]),
+                        "role": row["role"] or "user",
+                    }
+            if "usuarios" in self.tables:
+                row = conn.execute(
+                    f"SELECT nombre, email, contraseña, rol, {self._disabled_sql('usuarios')} "
+                    "FROM usuarios WHERE email = ?",
+                    (username,)
+                ).fetchone()
+                if row is not None:
+                    return {
+                        "username": row["email"],
+                        "email": row["email"],
+                        "full_name": row["nombre"],
+                        "hashed_password": row["contraseña"],
+                        "disabled": bool(row["disabled"]),
+                        "role": row["rol"] or "user",
+                    }
+        return None
+
+    def update(self, username: str, **changes):
+        unsupported = False
+        with self.pool.connection() as conn:
+            for table, key in (("users", "username"), ("usuarios", "email")):
+                if table not in self.tables:
+                    continue
+                columns = {field: column for field, column in self.UPDATABLE[table].items()
+                           if column in self.columns[table]}
+                if set(changes) - set(columns):
+                    unsupported = True
+                    continue
+                if not changes:
+                    return
+                assignments = ", ".join(f"{columns[field]} = ?" for field in changes)
+                cursor = conn.execute(
+                    f"UPDATE {table} SET {assignments} WHERE {key} = ?",
+                    (*changes.values(), username)
+                )
+                conn.commit()
+                if cursor.rowcount:
+                    return
+        if unsupported:
+            hint = " (falta la columna: python user_store.py migrate)" if "disabled" in changes else ""
+            raise ValueError(f"Campos no soportados: {sorted(changes)}{hint}")
+        raise KeyError(username)
+
+
+def create_user_store(default_users: Dict[str, Dict]) -> UserStore:
+    """Crea el almacén configurado en USER_STORE (`memory` o `sqlite`)."""
+    kind = os.getenv("USER_STORE", "memory")
+    if kind == "sqlite":
+        return SQLiteUserStore(
+            os.getenv("USER_DB_PATH", DEFAULT_DB_PATH),
+            pool_size=int(os.getenv("USER_DB_POOL_SIZE", "4")),
+        )
+    if kind == "memory":
+        return InMemoryUserStore(default_users)
+    raise ValueError(f"USER_STORE desconocido: {kind}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mantenimiento del almacén SQLite de usuarios")
+    parser.add_argument("command", choices=["migrate"])
+    parser.add_argument("--db", default=os.getenv("USER_DB_PATH", DEFAULT_DB_PATH))
+    args = parser.parse_args()
+    store = SQLiteUserStore(args.db, pool_size=1)
+    store.migrate()
+    print(f"{args.db}: {', '.join(sorted(store.tables)) or 'sin tablas de usuarios'} al día")
+    store.pool.close()
+
+
+if __name__ == "__main__":
+    main()
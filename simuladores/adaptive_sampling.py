@@ -0,0 +1,140 @@
+"""Frecuencia de envío adaptativa por sensor.
+
+Todos los simuladores generan una lectura por tick, cambie o no su valor.
+`AdaptiveSampler` decide qué lecturas se envían por WebSocket (SQLite,
+alertas y estadísticas siguen recibiendo todas):
+
+- si los campos vigilados no se salen de la banda muerta (`deadband`)
+  respecto a la última lectura enviada, el sensor sólo manda un latido
+  cada `interval` segundos, y el intervalo se alarga (`growth`) hasta
+  `max_interval`;
+- si se salen, se envía en cuanto pasen `min_interval` segundos desde el
+  último envío y el intervalo vuelve a `min_interval`;
+- si se cruza un umbral (`thresholds`) o cambia un campo discreto
+  (`triggers`: status, presence, needs_restock...) se envía en el acto.
+
+Las políticas son por tipo de simulador (DEFAULT_POLICIES) y se pueden
+sustituir al crear el muestreador. El tiempo es el del reloj de cada
+simulador, así funciona igual en tiempo acelerado.
+"""
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Bandas muertas del orden del ruido de cada simulador (noise_level)
+DEFAULT_POLICIES: Dict[str, Dict[str, Any]] = {
+    "TemperatureSimulator": {"fields": ("temperature",), "deadband": 0.5,
+                             "thresholds": (2.0, 8.0), "triggers": ("status", "door_open"),
+                             "min_interval": 1.0, "max_interval": 30.0},
+    "HumiditySimulator": {"fields": ("humidity",), "deadband": 2.0,
+                          "triggers": ("status",), "min_interval": 1.0, "max_interval": 30.0},
+    "PresenceSimulator": {"fields": ("count",), "deadband": 0,
+                          "triggers": ("presence",), "min_interval": 1.0, "max_interval": 30.0},
+    "MovementSimulator": {"fields": ("position.x", "position.y"), "deadband": 0.25,
+                          "min_interval": 1.0, "max_interval": 10.0},
+    "StockSimulator": {"fields": ("current_stock",), "deadband": 0,
+                       "triggers": ("needs_restock", "status"),
+                       "min_interval": 1.0, "max_interval": 60.0},
+}
+DEFAULT_POLICY = {"fields": (), "deadband": 0, "min_interval": 1.0, "max_interval": 1.0}
+GROWTH = 2.0
+
+
+def field_value(data: Dict[str, Any], path: str) -> Optional[float]:
+    """Valor numérico de un campo ("position.x" entra en diccionarios anidados)."""
+    value: Any = data
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value if isinstance(value, (int, float)) else None
+
+
+class Policy:
+    __slots__ = ("fields", "deadband", "thresholds", "triggers",
+                 "min_interval", "max_interval", "growth")
+
+    def __init__(self, fields: Iterable[str] = (), deadband: float = 0,
+                 thresholds: Iterable[float] = (), triggers: Iterable[str] = (),
+                 min_interval: float = 1.0, max_interval: float = 30.0,
+                 growth: float = GROWTH):
+        self.fields = tuple(fields)
+        self.deadband = deadband
+        self.thresholds = tuple(thresholds)
+        self.triggers = tuple(triggers)
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.growth = growth
+
+
+class _SensorState:
+    __slots__ = ("values", "marks", "last_emit", "interval")
+
+    def __init__(self, values, marks, last_emit, interval):
+        self.values = values
+        self.marks = marks
+        self.last_emit = last_emit
+        self.interval = interval
+
+
+class AdaptiveSampler:
+    def __init__(self, policies: Optional[Dict[str, Dict[str, Any]]] = None):
+        merged = dict(DEFAULT_POLICIES)
+        merged.update(policies or {})
+        self.policies = {name: Policy(**spec) for name, spec in merged.items()}
+        self.default = Policy(**DEFAULT_POLICY)
+        self.state: Dict[str, _SensorState] = {}
+        self.stats = {"emitted": 0, "suppressed": 0, "urgent": 0}
+
+    def _snapshot(self, policy: Policy, data: Dict[str, Any]) -> Tuple[tuple, tuple]:
+        values = tuple(field_value(data, name) for name in policy.fields)
+        marks = tuple(data.get(name) for name in policy.triggers)
+        return values, marks
+
+    def should_emit(self, sensor_id: str, sensor_type: str, data: Dict[str, Any],
+                    now: float) -> bool:
+        """¿Se envía esta lectura? `now` en segundos del reloj del simulador."""
+        policy = self.policies.get(sensor_type, self.default)
+        values, marks = self._snapshot(policy, data)
+        state = self.state.get(sensor_id)
+        if state is None:
+            self.state[sensor_id] = _SensorState(values, marks, now, policy.min_interval)
+            self.stats["emitted"] += 1
+            return True
+
+        elapsed = now - state.last_emit
+        urgent = marks != state.marks or self._crossed(policy, state.values, values)
+        changed = urgent or any(
+            (old is None) != (new is None) or (old is not None and abs(new - old) > policy.deadband)
+            for old, new in zip(state.values, values))
+
+        if urgent:
+            self.stats["urgent"] += 1
+            state.interval = policy.min_interval
+        elif changed:
+            if elapsed < policy.min_interval:
+                self.stats["suppressed"] += 1
+                return False
+            state.interval = policy.min_interval
+        else:
+            if elapsed < state.interval:
+                self.stats["suppressed"] += 1
+                return False
+            # Latido: el valor sigue estable, se espacia el siguiente
+            state.interval = min(state.interval * policy.growth, policy.max_interval)
+
+        state.values = values
+        state.marks = marks
+        state.last_emit = now
+        self.stats["emitted"] += 1
+        return True
+
+    @staticmethod
+    def _crossed(policy: Policy, old: tuple, new: tuple) -> bool:
+        if not policy.thresholds or not old or old[0] is None or new[0] is None:
+            return False
+        # Los umbrales se aplican al primer campo vigilado
+        return any((old[0] < t) != (new[0] < t) for t in policy.thresholds)
+
+    def interval(self, sensor_id: str) -> Optional[float]:
+        """Intervalo actual del sensor (None si aún no ha emitido)."""
+        state = self.state.get(sensor_id)
+        return state.interval if state is not None else None
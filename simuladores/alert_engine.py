@@ -0,0 +1,269 @@
+"""Motor de reglas de alerta sobre la salida de los simuladores.
+
+Sustituye las comprobaciones sueltas (estado "warning" de temperatura,
+low/high de humedad, needs_restock de stock) por reglas declarativas:
+
+    {"name": "nevera_caliente", "sensor_type": "TemperatureSimulator",
+     "field": "temperature", "op": ">", "threshold": 8.0,
+     "clear_threshold": 7.5, "duration": 300, "tipo": "temperatura",
+     "nivel": "alta", "message": "{sensor_id}: {value} °C durante 5 min"}
+
+- Las reglas se compilan una vez y se indexan por sensor_id y por tipo de
+  simulador; cada lectura sólo evalúa las reglas que le aplican.
+- `duration`: la condición debe mantenerse ese número de segundos
+  seguidos antes de disparar ("por encima de 8 °C durante 5 minutos").
+- Histéresis: una alerta activa sólo se rearma cuando el valor cruza
+  `clear_threshold` (por defecto, cuando deja de cumplirse la condición).
+- Deduplicación: se emite una alerta al activarse, no en cada lectura, y
+  no se repite para el mismo sensor antes de `cooldown` segundos.
+
+El estado sólo se guarda para los pares (regla, sensor) con la condición
+cumplida, así que el coste en memoria depende de los sensores en alerta y
+no del total (100k sensores x decenas de reglas). La hora de la última
+alerta de cada par se olvida cuando la condición se ha despejado y ha
+pasado su `cooldown`.
+"""
+import argparse
+import operator
+import random
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    ">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le,
+    "==": operator.eq, "!=": operator.ne,
+    "in": lambda value, options: value in options,
+    "not in": lambda value, options: value not in options,
+}
+
+PRUNE_MIN = 1024  # tamaño de _last_emitted a partir del cual se limpia
+
+# Las comprobaciones que antes hacía cada simulador por su cuenta
+DEFAULT_RULES: List[Dict[str, Any]] = [
+    {"name": "temperatura_fuera_de_rango", "sensor_type": "TemperatureSimulator",
+     "field": "status", "op": "==", "threshold": "warning", "duration": 60,
+     "tipo": "temperatura", "nivel": "alta",
+     "message": "Temperatura fuera de rango en {sensor_id}: {value}"},
+    {"name": "humedad_fuera_de_rango", "sensor_type": "HumiditySimulator",
+     "field": "status", "op": "in", "threshold": ["low", "high"], "duration": 60,
+     "tipo": "humedad", "nivel": "media",
+     "message": "Humedad {value} en {sensor_id}"},
+    {"name": "stock_bajo", "sensor_type": "StockSimulator",
+     "field": "needs_restock", "op": "==", "threshold": True, "cooldown": 3600,
+     "tipo": "stock", "nivel": "baja",
+     "message": "Stock bajo en {sensor_id}"},
+]
+
+
+class Rule:
+    """Regla compilada."""
+
+    __slots__ = ("index", "name", "field", "compare", "threshold", "clear_threshold",
+                 "duration", "cooldown", "tipo", "nivel", "message", "sensor_type", "sensor_ids")
+
+    def __init__(self, index: int, name: str, field: str, op: str, threshold: Any,
+                 clear_threshold: Any = None, duration: float = 0.0, cooldown: float = 0.0,
+                 sensor_type: Optional[str] = None, sensor_ids: Optional[Iterable[str]] = None,
+                 tipo: str = "sensor", nivel: str = "media", message: str = "{name}: {sensor_id}"):
+        if op not in OPERATORS:
+            raise ValueError(f"Operador no soportado: {op}")
+        if op in ("in", "not in"):
+            threshold = frozenset(threshold)
+        self.index = index
+        self.name = name
+        self.field = field
+        # Dispara si compare(valor, threshold); se rearma cuando deja de
+        # cumplirse compare(valor, clear_threshold)
+        self.compare = OPERATORS[op]
+        self.threshold = threshold
+        self.clear_threshold = threshold if clear_threshold is None else clear_threshold
+        self.duration = float(duration)
+        self.cooldown = float(cooldown)
+        self.sensor_type = sensor_type
+        self.sensor_ids = frozenset(sensor_ids) if sensor_ids else None
+        self.tipo = tipo
+        self.nivel = nivel
+        self.message = message
+
+
+class Alert:
+    __slots__ = ("rule", "sensor_id", "value", "timestamp")
+
+    def __init__(self, rule: Rule, sensor_id: str, value: Any, timestamp: float):
+        self.rule = rule
+        self.sensor_id = sensor_id
+        self.value = value
+        self.timestamp = timestamp
+
+    @property
+    def descripcion(self) -> str:
+        return self.rule.message.format(name=self.rule.name, sensor_id=self.sensor_id,
+                                        value=self.value, threshold=self.rule.threshold)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"rule": self.rule.name, "sensor_id": self.sensor_id, "value": self.value,
+                "tipo": self.rule.tipo, "nivel": self.rule.nivel,
+                "descripcion": self.descripcion, "timestamp": self.timestamp}
+
+
+class AlertEngine:
+    """Evalúa las reglas lectura a lectura y emite alertas deduplicadas.
+
+    `sink` (opcional) es un SQLiteSink: cada alerta se escribe en alertas.
+    `on_alert` recibe además cada Alert emitida.
+    """
+
+    def __init__(self, rules: Iterable[Union[Rule, Dict[str, Any]]] = DEFAULT_RULES,
+                 sink=None, on_alert: Optional[Callable[[Alert], None]] = None):
+        self.rules: List[Rule] = []
+        self._by_id: Dict[str, List[Rule]] = {}
+        self._by_type: Dict[str, List[Rule]] = {}
+        self._generic: List[Rule] = []
+        self._resolved: Dict[Tuple[str, str], Tuple[Rule, ...]] = {}
+        # (regla, sensor) -> [inicio de la condición, activa]; sólo si se cumple
+        self._state: Dict[Tuple[int, str], list] = {}
+        # (regla, sensor) -> hora de la última alerta, mientras dure su cooldown
+        self._last_emitted: Dict[Tuple[int, str], float] = {}
+        self._prune_at = PRUNE_MIN
+        self.sink = sink
+        self.on_alert = on_alert
+        self.stats = {"evaluated": 0, "emitted": 0, "suppressed": 0}
+        for rule in rules:
+            self.add_rule(rule)
+
+    def add_rule(self, rule: Union[Rule, Dict[str, Any]]) -> Rule:
+        if isinstance(rule, dict):
+            rule = Rule(len(self.rules), **rule)
+        self.rules.append(rule)
+        if rule.sensor_ids:
+            for sensor_id in rule.sensor_ids:
+                self._by_id.setdefault(sensor_id, []).append(rule)
+        elif rule.sensor_type:
+            self._by_type.setdefault(rule.sensor_type, []).append(rule)
+        else:
+            self._generic.append(rule)
+        self._resolved.clear()
+        return rule
+
+    def rules_for(self, sensor_id: str, sensor_type: str) -> Tuple[Rule, ...]:
+        key = (sensor_id, sensor_type)
+        rules = self._resolved.get(key)
+        if rules is None:
+            by_id = [r for r in self._by_id.get(sensor_id, ())
+                     if r.sensor_type is None or r.sensor_type == sensor_type]
+            rules = tuple(by_id + self._by_type.get(sensor_type, []) + self._generic)
+            self._resolved[key] = rules
+        return rules
+
+    def evaluate(self, sensor_id: str, sensor_type: str, data: Dict[str, Any],
+                 timestamp: Union[datetime, float, None] = None) -> List[Alert]:
+        """Procesa una lectura y devuelve las alertas que dispara."""
+        rules = self.rules_for(sensor_id, sensor_type)
+        if not rules:
+            return []
+        if timestamp is None:
+            ts = time.time()
+        elif isinstance(timestamp, datetime):
+            ts = timestamp.timestamp()
+        else:
+            ts = timestamp
+        self.stats["evaluated"] += 1
+        alerts = []
+        state = self._state
+        for rule in rules:
+            value = data.get(rule.field)
+            if value is None:
+                continue
+            key = (rule.index, sensor_id)
+            current = state.get(key)
+            if current is not None and current[1]:
+                if not rule.compare(value, rule.clear_threshold):
+                    del state[key]
+                    self._release(key, rule, ts)
+                continue
+            if not rule.compare(value, rule.threshold):
+                if current is not None:
+                    del state[key]  # la condición se rompió antes de `duration`
+                    self._release(key, rule, ts)
+                continue
+            if current is None:
+                current = state[key] = [ts, False]
+            if ts - current[0] >= rule.duration:
+                current[1] = True
+                alert = self._emit(rule, sensor_id, value, ts)
+                if alert is not None:
+                    alerts.append(alert)
+        return alerts
+
+    def _emit(self, rule: Rule, sensor_id: str, value: Any, ts: float) -> Optional[Alert]:
+        key = (rule.index, sensor_id)
+        last = self._last_emitted.get(key)
+        if last is not None and ts - last < rule.cooldown:
+            self.stats["suppressed"] += 1
+            return None
+        self._last_emitted[key] = ts
+        if len(self._last_emitted) > self._prune_at:
+            self._prune(ts)
+        self.stats["emitted"] += 1
+        alert = Alert(rule, sensor_id, value, ts)
+        # on_alert primero: un fallo de la persistencia no retiene la alerta
+        if self.on_alert is not None:
+            self.on_alert(alert)
+        if self.sink is not None:
+            self.sink.alert(rule.tipo, alert.descripcion, rule.nivel,
+                            datetime.fromtimestamp(ts), sensor_id=sensor_id)
+        return alert
+
+    def _release(self, key: Tuple[int, str], rule: Rule, ts: float):
+        """Condición despejada: olvida la última alerta si ya pasó el cooldown."""
+        last = self._last_emitted.get(key)
+        if last is not None and ts - last >= rule.cooldown:
+            del self._last_emitted[key]
+
+    def _prune(self, ts: float):
+        """Olvida las alertas de pares despejados cuyo cooldown ya terminó.
+
+        Cubre los pares que se despejaron durante el cooldown y no han vuelto
+        a evaluarse en alerta. Se llama cuando el diccionario dobla su tamaño
+        tras la última limpieza, así que el coste queda amortizado.
+        """
+        rules, state = self.rules, self._state
+        self._last_emitted = {key: last for key, last in self._last_emitted.items()
+                              if key in state or ts - last < rules[key[0]].cooldown}
+        self._prune_at = max(PRUNE_MIN, 2 * len(self._last_emitted))
+
+    def active(self) -> List[Tuple[str, str]]:
+        """Pares (regla, sensor) con alerta activa."""
+        return [(self.rules[index].name, sensor_id)
+                for (index, sensor_id), (_, is_active) in self._state.items() if is_active]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de AlertEngine")
+    parser.add_argument("--sensors", type=int, default=100_000)
+    parser.add_argument("--rules", type=int, default=24)
+    parser.add_argument("--readings", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rules = [{"name": f"umbral_{i}", "sensor_type": "TemperatureSimulator",
+              "field": "temperature", "op": ">", "threshold": 6.0 + i * 0.1,
+              "clear_threshold": 5.5 + i * 0.1, "duration": 300}
+             for i in range(args.rules)]
+    engine = AlertEngine(rules)
+    sensor_ids = [f"TEMP{i:06d}" for i in range(args.sensors)]
+    values = [random.gauss(5.0, 1.5) for _ in range(1000)]
+    started = time.perf_counter()
+    ts = 0.0
+    for i in range(args.readings):
+        ts += 0.01
+        engine.evaluate(sensor_ids[i % args.sensors], "TemperatureSimulator",
+                        {"temperature": values[i % 1000]}, ts)
+    elapsed = time.perf_counter() - started
+    print(f"{args.readings / elapsed:,.0f} lecturas/s, "
+          f"{args.readings * args.rules / elapsed:,.0f} evaluaciones de regla/s; "
+          f"{engine.stats['emitted']} alertas, {len(engine._state)} estados en memoria")
+
+
+if __name__ == "__main__":
+    main()
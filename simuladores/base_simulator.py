@@ -2,17 +2,23 @@ import time
 import random
 import json
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable
 import logging
 
 class BaseSimulator:
     def __init__(self, sensor_id: str, location: str):
         self.sensor_id = sensor_id
         self.location = location
+        # Reloj del simulador; se sustituye para simular en tiempo acelerado
+        self.clock: Callable[[], datetime] = datetime.now
         self.last_update = datetime.now()
         self.is_running = False
         self.logger = logging.getLogger(f"Simulator_{sensor_id}")
         
+    def now(self) -> datetime:
+        """Hora actual según el reloj del simulador."""
+        return self.clock()
+        
     def generate_data(self) -> Dict[str, Any]:
         """Método base para generar datos. Debe ser implementado por las clases hijas."""
         raise NotImplementedError
@@ -0,0 +1,8 @@
+# Scripts manuales (necesitan servidor WebSocket o Unreal en marcha); no son
+# pruebas de pytest aunque se llamen test_*.py
+collect_ignore = [
+    "test_integration.py",
+    "test_simulators.py",
+    "test_system.py",
+    "test_unreal_integration.py",
+]
@@ -0,0 +1,96 @@
+"""Esquema de la base de la tienda (bd_replikstore.db).
+
+Mismas tablas y columnas que la base que usa el backend (ver
+resultados.txt), con las claves foráneas declaradas. `create_schema` es
+idempotente: sobre una base existente sólo crea lo que falte.
+"""
+import os
+import sqlite3
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STORE_DB = os.path.join(ROOT, "backend", "basedeDatos", "bd_replikstore.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS usuarios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    "contraseña" TEXT NOT NULL,
+    rol TEXT DEFAULT 'user'
+);
+CREATE TABLE IF NOT EXISTS categorias (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS proveedores (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT NOT NULL,
+    contacto TEXT
+);
+CREATE TABLE IF NOT EXISTS productos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT NOT NULL,
+    descripcion TEXT,
+    precio REAL NOT NULL,
+    categoria_id INTEGER REFERENCES categorias(id)
+);
+CREATE TABLE IF NOT EXISTS ingresos_stock (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    producto_id INTEGER NOT NULL REFERENCES productos(id),
+    proveedor_id INTEGER REFERENCES proveedores(id),
+    cantidad INTEGER NOT NULL,
+    fecha_ingreso TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ventas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    usuario_id INTEGER REFERENCES usuarios(id),
+    total REAL NOT NULL,
+    fecha TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS detalle_venta (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    venta_id INTEGER NOT NULL REFERENCES ventas(id),
+    producto_id INTEGER NOT NULL REFERENCES productos(id),
+    cantidad INTEGER NOT NULL,
+    precio REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS neveras (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT NOT NULL,
+    ubicacion TEXT,
+    estado TEXT DEFAULT 'activa'
+);
+CREATE TABLE IF NOT EXISTS sensores_temperatura (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nevera_id INTEGER REFERENCES neveras(id),
+    descripcion TEXT
+);
+CREATE TABLE IF NOT EXISTS registro_temperaturas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sensor_id INTEGER NOT NULL REFERENCES sensores_temperatura(id),
+    temperatura REAL NOT NULL,
+    fecha_hora INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS alertas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tipo TEXT NOT NULL,
+    descripcion TEXT,
+    nivel TEXT,
+    fecha_hora TEXT,
+    sensores_id INTEGER REFERENCES sensores_temperatura(id),
+    neveras_id INTEGER REFERENCES neveras(id)
+);
+"""
+
+
+def create_schema(conn: sqlite3.Connection):
+    """Crea las tablas que falten."""
+    conn.executescript(SCHEMA)
+
+
+def connect(path: str = STORE_DB) -> sqlite3.Connection:
+    """Conexión de escritura con claves foráneas activas y el esquema creado."""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    create_schema(conn)
+    return conn
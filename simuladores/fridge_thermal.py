@@ -0,0 +1,198 @@
+"""Modelo térmico de neveras, vectorizado para flotas.
+
+TemperatureSimulator es un paseo aleatorio acotado: no tiene aperturas de
+puerta ni ciclos de compresor, justo lo que generan las anomalías de
+neveras / registro_temperaturas que vigilan las alertas. `FridgeFleet`
+simula todas las neveras a la vez:
+
+- dinámica de primer orden: el interior intercambia calor con la sala
+  (constante de tiempo `tau_closed`, mucho menor con la puerta abierta,
+  `tau_open`) y el compresor encendido lo lleva hacia `evaporator`
+  (constante `tau_cool`):
+
+      dT/dt = (ambient - T) / tau_leak + on * (evaporator - T) / tau_cool
+
+  Con los coeficientes constantes en un subpaso la solución es exacta
+  (T tiende exponencialmente a su equilibrio), así que se integra con
+  pasos largos sin inestabilidad; `max_substep` sólo limita cuánto tarda
+  en reaccionar el termostato;
+- termostato con histéresis: enciende por encima de setpoint + hysteresis
+  y apaga por debajo de setpoint - hysteresis;
+- aperturas de puerta como proceso de Poisson: `door_rate` aperturas por
+  hora y nevera, más `door_rate_per_shopper` por cada cliente a menos de
+  `reach` metros. Los clientes llegan en `presence` o, si la flota tiene
+  `positions` y `crowd` (spatial_index.ShopperCrowd, que avanza
+  PresenceField), se cuentan con una SpatialGrid de las neveras;
+- averías: `fail_compressor` deja compresores sin enfriar.
+
+TemperatureSimulator con `thermal=` sólo lee su nevera de una flota
+compartida; SimulatorManager avanza la flota una vez por tick (`add_model`),
+después de PresenceField si comparten la multitud.
+
+Uso rápido (benchmark): python fridge_thermal.py --fridges 1000 --hours 24
+"""
+import argparse
+import math
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from spatial_index import ShopperCrowd, SpatialGrid
+
+AMBIENT = 22.0
+SETPOINT = 4.0
+HYSTERESIS = 1.0
+EVAPORATOR = -10.0
+TAU_CLOSED = 4 * 3600.0   # s, fugas con la puerta cerrada
+TAU_OPEN = 600.0          # s, con la puerta abierta
+TAU_COOL = 1800.0         # s, compresor
+DOOR_RATE = 6.0           # aperturas por hora y nevera
+DOOR_RATE_PER_SHOPPER = 12.0
+DOOR_DURATION = 20.0      # s, media (exponencial)
+MAX_SUBSTEP = 10.0        # s
+MIN_TEMP = 2.0
+MAX_TEMP = 8.0
+
+
+class FridgeFleet:
+    def __init__(self, fridges: int, ambient=AMBIENT, setpoint=SETPOINT,
+                 hysteresis: float = HYSTERESIS, evaporator=EVAPORATOR,
+                 tau_closed=TAU_CLOSED, tau_open=TAU_OPEN, tau_cool=TAU_COOL,
+                 door_rate: float = DOOR_RATE,
+                 door_rate_per_shopper: float = DOOR_RATE_PER_SHOPPER,
+                 door_duration: float = DOOR_DURATION,
+                 max_substep: float = MAX_SUBSTEP,
+                 min_temp: float = MIN_TEMP, max_temp: float = MAX_TEMP,
+                 noise_level: float = 0.1, seed: Optional[int] = None,
+                 positions=None, crowd: Optional[ShopperCrowd] = None, reach: float = 1.5):
+        def per_fridge(value):
+            return np.broadcast_to(np.asarray(value, dtype=np.float64), (fridges,)).copy()
+
+        self.ambient = per_fridge(ambient)
+        self.setpoint = per_fridge(setpoint)
+        self.hysteresis = hysteresis
+        self.evaporator = per_fridge(evaporator)
+        self.k_closed = 1.0 / per_fridge(tau_closed)
+        self.k_open = 1.0 / per_fridge(tau_open)
+        self.k_cool = 1.0 / per_fridge(tau_cool)
+        self.door_rate = door_rate
+        self.door_rate_per_shopper = door_rate_per_shopper
+        self.door_duration = door_duration
+        self.max_substep = max_substep
+        self.min_temp = min_temp
+        self.max_temp = max_temp
+        self.noise_level = noise_level
+        self.rng = np.random.default_rng(seed)
+
+        self.temperature = self.setpoint + self.rng.uniform(-hysteresis, hysteresis, fridges)
+        self.compressor_on = self.temperature > self.setpoint
+        self.compressor_ok = np.ones(fridges, dtype=bool)
+        self.door_remaining = np.zeros(fridges)  # segundos que le quedan abierta
+        self.door_openings = np.zeros(fridges, dtype=np.int64)
+        self._last_time: Optional[datetime] = None
+        self.crowd = crowd
+        self.grid = (SpatialGrid(positions, reach, crowd.bounds)
+                     if crowd is not None and positions is not None else None)
+
+    def __len__(self) -> int:
+        return len(self.temperature)
+
+    @property
+    def door_open(self) -> np.ndarray:
+        return self.door_remaining > 0
+
+    def open_door(self, indices, duration: float = DOOR_DURATION):
+        """Abre puertas a mano (p. ej. una puerta que se queda abierta)."""
+        self.door_remaining[indices] = np.maximum(self.door_remaining[indices], duration)
+        self.door_openings[indices] += 1
+
+    def fail_compressor(self, indices, failed: bool = True):
+        self.compressor_ok[indices] = not failed
+
+    def step(self, dt: float, presence: Optional[Sequence[float]] = None):
+        """Avanza `dt` segundos; `presence`: clientes cerca de cada nevera."""
+        substeps = max(1, math.ceil(dt / self.max_substep))
+        h = dt / substeps
+        rate = self.door_rate / 3600.0
+        if presence is not None:
+            rate = rate + np.asarray(presence, dtype=np.float64) * (self.door_rate_per_shopper / 3600.0)
+        p_open = -np.expm1(-rate * h)  # probabilidad de apertura en el subpaso
+        n = len(self)
+        for _ in range(substeps):
+            opened = (self.rng.random(n) < p_open) & (self.door_remaining <= 0)
+            if opened.any():
+                self.door_remaining[opened] = self.rng.exponential(self.door_duration, int(opened.sum()))
+                self.door_openings += opened
+
+            door = self.door_remaining > 0
+            running = self.compressor_on & self.compressor_ok
+            k_leak = np.where(door, self.k_open, self.k_closed)
+            k_cool = self.k_cool * running
+            k = k_leak + k_cool
+            equilibrium = (k_leak * self.ambient + k_cool * self.evaporator) / k
+            self.temperature = equilibrium + (self.temperature - equilibrium) * np.exp(-k * h)
+
+            # Termostato con histéresis
+            self.compressor_on |= self.temperature > self.setpoint + self.hysteresis
+            self.compressor_on &= self.temperature >= self.setpoint - self.hysteresis
+            np.subtract(self.door_remaining, h, out=self.door_remaining)
+            np.maximum(self.door_remaining, 0.0, out=self.door_remaining)
+
+    def advance(self, now: datetime, presence: Optional[Sequence[float]] = None):
+        """Avanza hasta `now` (la primera llamada sólo fija el instante)."""
+        if self._last_time is not None and now > self._last_time:
+            if presence is None and self.grid is not None:
+                presence = self.grid.counts(self.crowd.positions)
+            self.step((now - self._last_time).total_seconds(), presence)
+        if self._last_time is None or now > self._last_time:
+            self._last_time = now
+
+    def measured(self) -> np.ndarray:
+        """Lectura de las sondas: temperatura con ruido."""
+        return self.temperature + self.rng.uniform(-self.noise_level, self.noise_level, len(self))
+
+    def reading(self, index: int, value: Optional[float] = None) -> Dict[str, Any]:
+        """Lectura de una nevera con el formato de TemperatureSimulator."""
+        if value is None:
+            value = float(self.temperature[index]) + float(
+                self.rng.uniform(-self.noise_level, self.noise_level))
+        return {
+            "temperature": round(value, 2),
+            "unit": "celsius",
+            "status": "normal" if self.min_temp <= value <= self.max_temp else "warning",
+            "compressor": bool(self.compressor_on[index] and self.compressor_ok[index]),
+            "door_open": bool(self.door_remaining[index] > 0),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del modelo térmico de neveras")
+    parser.add_argument("--fridges", type=int, default=1000)
+    parser.add_argument("--hours", type=float, default=24.0)
+    parser.add_argument("--interval", type=float, default=60.0, help="segundos entre lecturas")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    fleet = FridgeFleet(args.fridges, seed=args.seed)
+    fleet.fail_compressor(np.arange(0, args.fridges, 100))  # 1 % averiadas
+    steps = int(args.hours * 3600 / args.interval)
+    warnings = 0
+    on_time = 0.0
+    started = time.perf_counter()
+    for _ in range(steps):
+        fleet.step(args.interval)
+        values = fleet.measured()
+        warnings += int(((values < fleet.min_temp) | (values > fleet.max_temp)).sum())
+        on_time += float(fleet.compressor_on.mean())
+    elapsed = time.perf_counter() - started
+    simulated = args.hours * 3600 * args.fridges
+    print(f"{args.fridges} neveras x {args.hours:g} h en {elapsed:.2f} s "
+          f"({simulated / elapsed:,.0f} segundos-nevera por segundo); "
+          f"compresor encendido {on_time / steps:.0%} del tiempo, "
+          f"{fleet.door_openings.sum():,} aperturas, {warnings:,} lecturas fuera de rango")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""Generador de datos sintéticos para bd_replikstore.db.
+
+Los scripts de insertar_*.sql sólo siembran unas pocas filas; para medir
+consultas e índices (Asesor_Indices.py --bench-db) hace falta una base del
+tamaño de producción. Este script genera esos datos en tiempo acelerado.
+
+No instancia StockSimulator ni TemperatureSimulator (uno por producto o
+sensor sería demasiado lento para millones de filas), sino sus versiones
+vectorizadas, que simulan todos los elementos en un solo paso:
+
+- una StockFleet (stock_fleet.py) con todos los productos genera ventas y
+  reposiciones (ventas, detalle_venta, ingresos_stock) con la misma curva
+  de demanda y la misma lógica de reposición que StockSimulator;
+- una FridgeFleet (fridge_thermal.py) con todas las neveras genera
+  registro_temperaturas con un modelo térmico (ciclos de compresor,
+  aperturas de puerta más frecuentes en horas pico, alguna avería de
+  compresor) en lugar del paseo aleatorio de TemperatureSimulator.
+
+El reloj de los simuladores avanza por ticks, no en tiempo real. Las filas
+se insertan con `executemany` en lotes y se confirman en transacciones
+grandes. Los ids de ventas se asignan aquí, así que cada detalle_venta
+apunta a una venta del mismo lote (o de uno anterior) y las claves
+foráneas se cumplen con `PRAGMA foreign_keys = ON`.
+
+Uso:
+    python generador_datos.py --days 90 --products 200 --fridges 20
+    python generador_datos.py --db /tmp/tienda.db --days 365 --seed 1
+"""
+import argparse
+import logging
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from esquema_tienda import STORE_DB, connect
+from stock_fleet import PEAK_HOURS, StockFleet
+from fridge_thermal import FridgeFleet
+
+BATCH_SIZE = 50_000        # filas por executemany
+COMMIT_ROWS = 500_000      # filas por transacción
+
+INSERTS = {
+    "ventas": "INSERT INTO ventas (id, usuario_id, total, fecha) VALUES (?, ?, ?, ?)",
+    "detalle_venta": "INSERT INTO detalle_venta (venta_id, producto_id, cantidad, precio) "
+                     "VALUES (?, ?, ?, ?)",
+    "ingresos_stock": "INSERT INTO ingresos_stock (producto_id, proveedor_id, cantidad, fecha_ingreso) "
+                      "VALUES (?, ?, ?, ?)",
+    "registro_temperaturas": "INSERT INTO registro_temperaturas (sensor_id, temperatura, fecha_hora) "
+                             "VALUES (?, ?, ?)",
+}
+
+BASE_CATEGORIES = ["Electrónica", "Alimentos", "Bebidas"]
+BASE_SUPPLIERS = [("Proveedor Uno", "contacto1@proveedor.com"),
+                  ("Proveedor Dos", "contacto2@proveedor.com"),
+                  ("Proveedor Tres", "contacto3@proveedor.com")]
+
+
+class SimClock:
+    """Reloj simulado compartido por los simuladores."""
+
+    def __init__(self, start: datetime):
+        self.current = start
+
+    def now(self) -> datetime:
+        return self.current
+
+    def advance(self, delta: timedelta):
+        self.current += delta
+
+
+class BulkWriter:
+    """Acumula filas por tabla y las inserta con executemany.
+
+    Al vaciar se escribe siempre en el orden de INSERTS (ventas antes que
+    detalle_venta), así que las claves foráneas se cumplen dentro de la
+    transacción. Se confirma cada `commit_rows` filas.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, batch_size: int = BATCH_SIZE,
+                 commit_rows: int = COMMIT_ROWS):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.commit_rows = commit_rows
+        self.buffers: Dict[str, List[tuple]] = {table: [] for table in INSERTS}
+        self.counts: Dict[str, int] = {table: 0 for table in INSERTS}
+        self.pending = 0
+        self.uncommitted = 0
+
+    def add(self, table: str, row: tuple):
+        self.buffers[table].append(row)
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        for table, rows in self.buffers.items():
+            if rows:
+                self.conn.executemany(INSERTS[table], rows)
+                self.counts[table] += len(rows)
+                self.uncommitted += len(rows)
+                rows.clear()
+        self.pending = 0
+        if self.uncommitted >= self.commit_rows:
+            self.conn.commit()
+            self.uncommitted = 0
+
+    def close(self):
+        self.flush()
+        self.conn.commit()
+
+
+def _ids(conn: sqlite3.Connection, table: str) -> List[int]:
+    return [row[0] for row in conn.execute(f"SELECT id FROM {table} ORDER BY id")]
+
+
+def ensure_catalog(conn: sqlite3.Connection, products: int, users: int, fridges: int,
+                   rng: random.Random) -> dict:
+    """Completa categorías, proveedores, productos, clientes y neveras hasta los tamaños pedidos."""
+    if not _ids(conn, "categorias"):
+        conn.executemany("INSERT INTO categorias (nombre) VALUES (?)",
+                         [(name,) for name in BASE_CATEGORIES])
+    if not _ids(conn, "proveedores"):
+        conn.executemany("INSERT INTO proveedores (nombre, contacto) VALUES (?, ?)", BASE_SUPPLIERS)
+    categories = _ids(conn, "categorias")
+
+    missing = products - len(_ids(conn, "productos"))
+    if missing > 0:
+        conn.executemany(
+            "INSERT INTO productos (nombre, descripcion, precio, categoria_id) VALUES (?, ?, ?, ?)",
+            [(f"Producto sintético {i}", "Generado por generador_datos.py",
+              round(rng.lognormvariate(1.5, 1.0), 2), rng.choice(categories))
+             for i in range(missing)]
+        )
+
+    existing_users = len(_ids(conn, "usuarios"))
+    if users > existing_users:
+        offset = conn.execute("SELECT COALESCE(MAX(id), 0) FROM usuarios").fetchone()[0]
+        conn.executemany(
+            'INSERT INTO usuarios (nombre, email, "contraseña", rol) VALUES (?, ?, ?, ?)',
+            [(f"Cliente {offset + i}", f"cliente{offset + i}@replikstore.sim", "sintetico", "user")
+             for i in range(1, users - existing_users + 1)]
+        )
+
+    existing_fridges = len(_ids(conn, "neveras"))
+    for n in range(existing_fridges + 1, fridges + 1):
+        cursor = conn.execute("INSERT INTO neveras (nombre, ubicacion, estado) VALUES (?, ?, 'activa')",
+                              (f"Nevera {n}", f"Zona {rng.choice('ABCD')}"))
+        conn.execute("INSERT INTO sensores_temperatura (nevera_id, descripcion) VALUES (?, ?)",
+                     (cursor.lastrowid, "Sensor principal"))
+    conn.commit()
+
+    return {
+        "products": conn.execute("SELECT id, precio FROM productos ORDER BY id").fetchall(),
+        "users": _ids(conn, "usuarios"),
+        "suppliers": _ids(conn, "proveedores"),
+        "sensors": _ids(conn, "sensores_temperatura"),
+    }
+
+
+def generate_sales(writer: BulkWriter, conn: sqlite3.Connection, catalog: dict,
+                   start: datetime, end: datetime, tick: timedelta, rng: random.Random):
+    """Ventas y reposiciones: todos los productos en una StockFleet, un paso por tick."""
+    clock = SimClock(start)
+    product_ids = [product_id for product_id, _ in catalog["products"]]
+    prices = [price for _, price in catalog["products"]]
+    max_stock = [rng.randint(50, 200) for _ in product_ids]
+    # Binomial hasta 3 unidades: misma media y rango que StockSimulator
+    fleet = StockFleet(max_stock,
+                       current_stock=[rng.randint(m // 2, m) for m in max_stock],
+                       restock_threshold=[m // 5 for m in max_stock],
+                       sampling="binomial", max_units=3, seed=rng.randrange(2 ** 32))
+
+    next_sale = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM ventas").fetchone()[0]
+    while clock.current < end:
+        fecha = clock.current.strftime("%Y-%m-%d")
+        result = fleet.step(clock.current)
+        sales, restock_amount = result["sales"], result["restock_amount"]
+        sold = [(product_ids[i], int(sales[i]), prices[i]) for i in sales.nonzero()[0]]
+        for i in restock_amount.nonzero()[0]:
+            writer.add("ingresos_stock", (product_ids[i], rng.choice(catalog["suppliers"]),
+                                          int(restock_amount[i]), fecha))
+
+        # Las unidades vendidas en el tick se agrupan en tickets de 1 a 4 líneas
+        rng.shuffle(sold)
+        i = 0
+        while i < len(sold):
+            lines = sold[i:i + rng.randint(1, 4)]
+            i += len(lines)
+            total = round(sum(quantity * price for _, quantity, price in lines), 2)
+            writer.add("ventas", (next_sale, rng.choice(catalog["users"]), total, fecha))
+            for product_id, quantity, price in lines:
+                writer.add("detalle_venta", (next_sale, product_id, quantity, price))
+            next_sale += 1
+        clock.advance(tick)
+
+
+def generate_temperatures(writer: BulkWriter, catalog: dict, start: datetime, end: datetime,
+                          interval: timedelta, rng: random.Random, failures: float = 0.05):
+    """Lecturas de temperatura: modelo térmico de todas las neveras a la vez.
+
+    `failures`: fracción de neveras con el compresor averiado durante unas
+    horas en algún momento del periodo.
+    """
+    sensor_ids = catalog["sensors"]
+    fleet = FridgeFleet(len(sensor_ids), seed=rng.randrange(2 ** 32))
+    step = int(interval.total_seconds())
+    timestamps = range(int(start.timestamp()), int(end.timestamp()), step)
+    failing = {}
+    for i in range(len(sensor_ids)):
+        if rng.random() < failures:
+            begin = rng.randrange(len(timestamps))
+            failing.setdefault(begin, []).append((i, True))
+            failing.setdefault(begin + rng.randint(2, 8) * 3600 // step, []).append((i, False))
+
+    for n, timestamp in enumerate(timestamps):
+        for i, failed in failing.get(n, ()):
+            fleet.fail_compressor(i, failed)
+        hour = datetime.fromtimestamp(timestamp).hour
+        fleet.door_rate = 20.0 if hour in PEAK_HOURS else 4.0
+        fleet.step(step)
+        for sensor_id, value in zip(sensor_ids, fleet.measured().round(2).tolist()):
+            writer.add("registro_temperaturas", (sensor_id, value, timestamp))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=STORE_DB)
+    parser.add_argument("--days", type=float, default=90, help="días simulados hasta --end")
+    parser.add_argument("--end", help="fin de la simulación (YYYY-MM-DD), por defecto ahora")
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--fridges", type=int, default=20)
+    parser.add_argument("--stock-tick", type=float, default=15, help="minutos por tick de stock")
+    parser.add_argument("--temp-interval", type=float, default=60, help="segundos entre lecturas")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--commit-rows", type=int, default=COMMIT_ROWS)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    # Los simuladores usan el módulo random; con --seed la carga es reproducible
+    random.seed(args.seed)
+    rng = random.Random(args.seed)
+    end = datetime.fromisoformat(args.end) if args.end else datetime.now().replace(microsecond=0)
+    start = end - timedelta(days=args.days)
+
+    conn = connect(args.db)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    try:
+        catalog = ensure_catalog(conn, args.products, args.users, args.fridges, rng)
+        writer = BulkWriter(conn, args.batch_size, args.commit_rows)
+        started = time.perf_counter()
+        generate_sales(writer, conn, catalog, start, end, timedelta(minutes=args.stock_tick), rng)
+        generate_temperatures(writer, catalog, start, end, timedelta(seconds=args.temp_interval), rng)
+        writer.close()
+        elapsed = time.perf_counter() - started
+    finally:
+        conn.close()
+
+    total = sum(writer.counts.values())
+    print(f"{args.db}: {start:%Y-%m-%d} -> {end:%Y-%m-%d}, "
+          f"{len(catalog['products'])} productos, {len(catalog['sensors'])} sensores")
+    for table, count in writer.counts.items():
+        print(f"  {table}: {count} filas")
+    print(f"{total} filas en {elapsed:.1f} s ({total / elapsed:,.0f} filas/s)")
+
+
+if __name__ == "__main__":
+    main()
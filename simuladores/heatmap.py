@@ -0,0 +1,141 @@
+"""Mapa de calor de ocupación a partir de las posiciones de movimiento.
+
+En lugar de que Unreal reciba cada posición de MovementSimulator y
+construya la ocupación por su cuenta, `HeatmapStage` acumula las
+posiciones en una rejilla 2-D sobre la planta (x, y ∈ [-10, 10], los
+límites de MovementSimulator._update_position):
+
+- las posiciones de un tick se guardan y se vuelcan de una vez con
+  `np.bincount` (`flush`);
+- la ocupación decae exponencialmente con semivida `half_life` segundos,
+  así el mapa refleja el tráfico reciente;
+- `frame()` produce un mensaje compacto {"type": "heatmap"} con la rejilla
+  cuantizada a uint8 en base64; SimulatorManager lo envía cada
+  `publish_interval` segundos.
+
+Con `forward_points=False` el gestor deja de enviar las tramas individuales
+de MovementSimulator por WebSocket (siguen llegando a SQLite, alertas y
+estadísticas).
+
+Uso rápido (benchmark): python heatmap.py --points 5000 --ticks 1000
+"""
+import argparse
+import base64
+import json
+import math
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from spatial_index import FLOOR
+
+BINS = (20, 20)
+HALF_LIFE = 60.0
+PUBLISH_INTERVAL = 1.0
+
+
+class HeatmapStage:
+    def __init__(self, bins: Tuple[int, int] = BINS,
+                 bounds: Tuple[float, float, float, float] = FLOOR,
+                 half_life: float = HALF_LIFE,
+                 publish_interval: float = PUBLISH_INTERVAL,
+                 forward_points: bool = True):
+        self.nx, self.ny = bins
+        self.bounds = bounds
+        self.half_life = half_life
+        self.publish_interval = publish_interval
+        self.forward_points = forward_points
+        self.grid = np.zeros(self.nx * self.ny, dtype=np.float64)
+        self._pending: list = []  # posiciones sueltas (x, y)
+        self._chunks: list = []   # arrays N x 2 de add_points
+        self._last_flush: Optional[float] = None
+        x_min, x_max, y_min, y_max = bounds
+        self._sx = self.nx / (x_max - x_min)
+        self._sy = self.ny / (y_max - y_min)
+
+    def update(self, data: Dict[str, Any]):
+        """Guarda la posición de una lectura de MovementSimulator."""
+        position = data.get("position")
+        if position is not None:
+            self._pending.append((position["x"], position["y"]))
+
+    def add_points(self, points):
+        """Añade muchas posiciones (array N x 2), p. ej. ShopperCrowd.positions."""
+        self._chunks.append(np.asarray(points, dtype=np.float64).reshape(-1, 2))
+
+    def flush(self, now: Optional[float] = None):
+        """Aplica el decaimiento desde el último volcado y suma las posiciones pendientes."""
+        now = time.monotonic() if now is None else now
+        if self._last_flush is not None and self.half_life:
+            dt = now - self._last_flush
+            if dt > 0:
+                self.grid *= math.exp(-math.log(2) * dt / self.half_life)
+        self._last_flush = now
+        if self._pending:
+            self._chunks.append(np.array(self._pending, dtype=np.float64))
+            self._pending.clear()
+        if not self._chunks:
+            return
+        points = np.concatenate(self._chunks) if len(self._chunks) > 1 else self._chunks[0]
+        self._chunks.clear()
+        x_min, _, y_min, _ = self.bounds
+        cx = ((points[:, 0] - x_min) * self._sx).astype(np.intp)
+        cy = ((points[:, 1] - y_min) * self._sy).astype(np.intp)
+        np.clip(cx, 0, self.nx - 1, out=cx)
+        np.clip(cy, 0, self.ny - 1, out=cy)
+        self.grid += np.bincount(cx * self.ny + cy, minlength=self.grid.size)
+
+    def occupancy(self) -> np.ndarray:
+        """Rejilla (nx, ny) con la ocupación decaída; índice [x, y]."""
+        return self.grid.reshape(self.nx, self.ny)
+
+    def frame(self) -> Dict[str, Any]:
+        """Mensaje compacto: rejilla cuantizada 0-255 respecto al máximo."""
+        peak = float(self.grid.max()) if self.grid.size else 0.0
+        if peak > 0:
+            cells = np.rint(self.grid * (255.0 / peak)).astype(np.uint8)
+        else:
+            cells = np.zeros(self.grid.size, dtype=np.uint8)
+        return {
+            "type": "heatmap",
+            "timestamp": datetime.now().isoformat(),
+            "bounds": list(self.bounds),
+            "shape": [self.nx, self.ny],
+            "max": round(peak, 3),
+            "encoding": "u8-base64",  # fila x, columna y; valor * max / 255
+            "cells": base64.b64encode(cells.tobytes()).decode("ascii"),
+        }
+
+
+def decode_frame(frame: Dict[str, Any]) -> np.ndarray:
+    """Inverso de frame() (aprox.): ocupación (nx, ny) en unidades originales."""
+    cells = np.frombuffer(base64.b64decode(frame["cells"]), dtype=np.uint8)
+    return cells.reshape(frame["shape"]) * (frame["max"] / 255.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del mapa de calor")
+    parser.add_argument("--points", type=int, default=5000, help="posiciones por tick")
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument("--bins", type=int, default=20)
+    args = parser.parse_args()
+
+    stage = HeatmapStage(bins=(args.bins, args.bins))
+    rng = np.random.default_rng(1)
+    points = rng.uniform(-10, 10, (args.points, 2))
+    started = time.perf_counter()
+    for tick in range(args.ticks):
+        stage.add_points(points)
+        stage.flush(float(tick))
+    elapsed = time.perf_counter() - started
+    frame = json.dumps(stage.frame())
+    point_message = json.dumps({"position": {"x": 1.23, "y": -4.56, "z": 0.0}})
+    print(f"{args.ticks / elapsed:,.0f} ticks/s con {args.points} posiciones por tick; "
+          f"trama de {len(frame)} bytes frente a {len(point_message) * args.points:,} "
+          f"bytes de posiciones sueltas por tick")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Carriles de prioridad para los envíos de SimulatorManager.
+
+Con carga, una alerta (temperatura en "warning", needs_restock) esperaba
+en el mismo bucle secuencial que miles de lecturas rutinarias. Con un
+`PriorityOutbox` el bucle de simulación sólo encola y una tarea aparte
+envía por el WebSocket:
+
+- cada trama va a un carril: "alert" (alertas de AlertEngine y lecturas
+  anómalas), "state" (cambios de estado discreto: presencia, puerta,
+  reposición...) o "routine" (el resto, estadísticas y mapas de calor);
+- el carril "alert" tiene prioridad estricta: una alerta espera como mucho
+  a que termine el envío en curso;
+- "state" y "routine" se reparten el resto por turno ponderado suave
+  (`weights`), así las rutinarias no se quedan sin salir;
+- los carriles están acotados (`limits`): si se acumulan (p. ej. sin
+  conexión), se descarta lo más antiguo de ese carril;
+- la latencia (encolado -> enviado) se mide por carril (`latency()`);
+- `drain(stamp=...)` numera cada trama justo antes de enviarla (ver
+  resumable_stream.py).
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Optional, Tuple
+
+LANES = ("alert", "state", "routine")
+WEIGHTS = {"state": 4, "routine": 1}
+LIMITS = {"alert": 1000, "state": 5000, "routine": 10_000}
+LATENCY_SAMPLES = 1000
+
+ALERT_STATUSES = frozenset(("warning", "low", "high"))
+STATE_FIELDS = ("status", "presence", "needs_restock", "door_open", "compressor")
+
+
+class LaneClassifier:
+    """Asigna carril a cada lectura; recuerda el último estado discreto por sensor."""
+
+    def __init__(self, state_fields: Iterable[str] = STATE_FIELDS):
+        self.state_fields = tuple(state_fields)
+        self._marks: Dict[str, tuple] = {}
+
+    def lane(self, sensor_id: str, data: Dict[str, Any]) -> str:
+        marks = tuple(data.get(name) for name in self.state_fields)
+        previous = self._marks.get(sensor_id)
+        self._marks[sensor_id] = marks
+        if data.get("status") in ALERT_STATUSES or data.get("needs_restock"):
+            return "alert"
+        if previous is not None and marks != previous:
+            return "state"
+        return "routine"
+
+
+class PriorityOutbox:
+    def __init__(self, weights: Optional[Dict[str, int]] = None,
+                 limits: Optional[Dict[str, int]] = None, samples: int = LATENCY_SAMPLES):
+        self.weights = dict(WEIGHTS if weights is None else weights)
+        self.lanes: Dict[str, Deque[Tuple[Dict[str, Any], float]]] = {lane: deque() for lane in LANES}
+        self.limits = dict(LIMITS, **(limits or {}))
+        self._credit = {lane: 0 for lane in self.weights}
+        self._latency: Dict[str, Deque[float]] = {lane: deque(maxlen=samples) for lane in LANES}
+        self.stats = {lane: {"queued": 0, "sent": 0, "dropped": 0} for lane in LANES}
+        self._ready = asyncio.Event()
+
+    def put(self, frame: Dict[str, Any], lane: str = "routine"):
+        """Encola sin bloquear; lo puede llamar código síncrono del bucle."""
+        queue = self.lanes[lane]
+        if len(queue) >= self.limits[lane]:
+            queue.popleft()
+            self.stats[lane]["dropped"] += 1
+        queue.append((frame, time.perf_counter()))
+        self.stats[lane]["queued"] += 1
+        self._ready.set()
+
+    def clear(self, lane: str, keep: Optional[Callable[[Dict[str, Any]], bool]] = None) -> int:
+        """Vacía un carril (o deja sólo las tramas con keep(frame)); devuelve las descartadas."""
+        queue = self.lanes[lane]
+        kept = deque(item for item in queue if keep is not None and keep(item[0]))
+        dropped = len(queue) - len(kept)
+        self.lanes[lane] = kept
+        self.stats[lane]["dropped"] += dropped
+        return dropped
+
+    def pending(self) -> int:
+        return sum(len(queue) for queue in self.lanes.values())
+
+    def next_lane(self) -> Optional[str]:
+        """Carril del siguiente envío: "alert" primero, luego turno ponderado suave."""
+        if self.lanes["alert"]:
+            return "alert"
+        candidates = [lane for lane in self.weights if self.lanes[lane]]
+        if not candidates:
+            return None
+        total = 0
+        for lane in candidates:
+            self._credit[lane] += self.weights[lane]
+            total += self.weights[lane]
+        chosen = max(candidates, key=self._credit.__getitem__)
+        self._credit[chosen] -= total
+        return chosen
+
+    async def drain(self, websocket,
+                    stamp: Optional[Callable[[Dict[str, Any], str], Dict[str, Any]]] = None):
+        """Envía mientras haya tramas; pensado para correr como tarea aparte.
+
+        Un error de envío sale de aquí (el gestor reconecta); la trama que
+        fallaba vuelve al principio de su carril, ya numerada si hay `stamp`.
+        """
+        while True:
+            lane = self.next_lane()
+            if lane is None:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            frame, queued_at = self.lanes[lane].popleft()
+            if stamp is not None and "seq" not in frame:
+                frame = stamp(frame, lane)
+            try:
+                await websocket.send(json.dumps(frame))
+            except Exception:
+                self.lanes[lane].appendleft((frame, queued_at))
+                raise
+            self._latency[lane].append(time.perf_counter() - queued_at)
+            self.stats[lane]["sent"] += 1
+
+    def latency(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Latencia de encolado a envío por carril (ms) sobre las últimas muestras."""
+        result = {}
+        for lane, samples in self._latency.items():
+            if not samples:
+                result[lane] = {"n": 0, "mean_ms": None, "p99_ms": None, "max_ms": None}
+                continue
+            ordered = sorted(samples)
+            result[lane] = {
+                "n": len(ordered),
+                "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+                "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 3),
+                "max_ms": round(ordered[-1] * 1000, 3),
+            }
+        return result
@@ -0,0 +1,127 @@
+"""Reconexiones reanudables entre SimulatorManager y Unreal.
+
+Antes, al caerse el WebSocket, el gestor esperaba 5 s y reconectaba a
+ciegas: Unreal no recibía un estado base y lo emitido durante el corte se
+perdía. `ResumableStream` añade:
+
+- número de secuencia `seq` en cada trama, asignado en el orden de envío
+  y continuo entre conexiones del mismo flujo (`stream`, aleatorio por
+  proceso), para que el cliente sepa qué le falta;
+- reintentos con espera exponencial y jitter (`backoff`): entre
+  base/2·2^n y base·2^n segundos, hasta `backoff_max`. La cuenta n sólo
+  vuelve a 0 si la conexión anterior duró `stable_after` segundos, así un
+  servidor que acepta y corta enseguida no provoca reintentos en ráfaga;
+- un búfer acotado con las últimas tramas enviadas (`replay_size`).
+
+Protocolo al (re)conectar:
+
+1. el cliente puede enviar en `resume_timeout` segundos
+   {"type": "resume", "stream": "...", "last_seq": N};
+2. si pidió reanudar este mismo flujo, se reenvían del búfer las tramas
+   de alerta y cambio de estado con seq > N, con su seq original (las
+   rutinarias no hacen falta, el snapshot las supera);
+3. el gestor envía {"type": "snapshot", ...} con la última lectura de
+   cada simulador (estado completo y compacto). Si el búfer ya no llegaba
+   hasta N, lleva "gap": true. El snapshot no consume secuencia ni entra
+   en el búfer: su "seq" es la de la última trama ya numerada, y el
+   cliente sigue desde ahí sin ver huecos;
+4. siguen los deltas normales.
+
+SimulatorManager sólo lo usa si se le pasa `stream=` (SIMULATOR_RESUME=on
+en simulator_manager.main); sin él las tramas no llevan seq.
+"""
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+REPLAY_SIZE = 5000
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+STABLE_AFTER = 30.0
+RESUME_TIMEOUT = 0.5
+REPLAY_LANES = ("alert", "state")
+
+
+class ResumableStream:
+    def __init__(self, replay_size: int = REPLAY_SIZE, backoff_base: float = BACKOFF_BASE,
+                 backoff_max: float = BACKOFF_MAX, resume_timeout: float = RESUME_TIMEOUT,
+                 stable_after: float = STABLE_AFTER, rng: Optional[random.Random] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.stream_id = uuid.uuid4().hex[:12]
+        self.seq = 0
+        self.connection = 0
+        self.attempt = 0
+        self.connected_at: Optional[float] = None
+        self.buffer: Deque[Tuple[int, str, Dict[str, Any]]] = deque(maxlen=replay_size)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.resume_timeout = resume_timeout
+        self.stable_after = stable_after
+        self.rng = rng or random.Random()
+        self.clock = clock
+
+    def stamp(self, frame: Dict[str, Any], lane: str = "routine") -> Dict[str, Any]:
+        """Asigna la siguiente secuencia y guarda la trama para reenviarla."""
+        self.seq += 1
+        frame = dict(frame, seq=self.seq)
+        self.buffer.append((self.seq, lane, frame))
+        return frame
+
+    def connected(self):
+        self.connection += 1
+        self.connected_at = self.clock()
+
+    def backoff(self) -> float:
+        """Segundos hasta el siguiente intento (exponencial con jitter).
+
+        Si la conexión que se acaba de perder duró al menos `stable_after`
+        segundos, la espera vuelve a empezar desde `backoff_base`.
+        """
+        if self.connected_at is not None and self.clock() - self.connected_at >= self.stable_after:
+            self.attempt = 0
+        self.connected_at = None
+        delay = min(self.backoff_max, self.backoff_base * (2 ** self.attempt))
+        self.attempt += 1
+        return self.rng.uniform(delay / 2, delay)
+
+    async def read_resume(self, websocket) -> Optional[int]:
+        """last_seq si el cliente pide reanudar este flujo; None si no dice nada."""
+        if not self.resume_timeout:
+            return None
+        try:
+            message = await asyncio.wait_for(websocket.recv(), self.resume_timeout)
+            request = json.loads(message)
+        except (asyncio.TimeoutError, ValueError, TypeError):
+            return None
+        if (isinstance(request, dict) and request.get("type") == "resume"
+                and request.get("stream") == self.stream_id
+                and isinstance(request.get("last_seq"), int)):
+            return request["last_seq"]
+        return None
+
+    def replay_after(self, last_seq: int,
+                     lanes: Iterable[str] = REPLAY_LANES) -> Tuple[List[Dict[str, Any]], bool]:
+        """Tramas de `lanes` con seq > last_seq y si el búfer cubre todo el hueco."""
+        lanes = frozenset(lanes)
+        complete = not self.buffer or self.buffer[0][0] <= last_seq + 1
+        frames = [frame for seq, lane, frame in self.buffer if seq > last_seq and lane in lanes]
+        return frames, complete
+
+    def snapshot(self, sensors: Dict[str, Dict[str, Any]], timestamp: str,
+                 gap: bool = False) -> Dict[str, Any]:
+        """Trama de estado completo; lleva la última seq enviada y no se guarda."""
+        frame = {
+            "type": "snapshot",
+            "seq": self.seq,
+            "stream": self.stream_id,
+            "connection": self.connection,
+            "timestamp": timestamp,
+            "sensors": sensors,
+        }
+        if gap:
+            frame["gap"] = True
+        return frame
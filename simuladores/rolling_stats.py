@@ -0,0 +1,164 @@
+"""Estadísticas móviles por sensor con actualización O(1).
+
+Para cada campo numérico de cada sensor se mantiene, sobre las últimas
+`window` lecturas:
+
+- media y varianza con Welford (se añade la lectura nueva y se retira la
+  que sale de la ventana, sin recorrerla);
+- mínimo y máximo con deques monótonas;
+- EWMA con factor `alpha` y su tendencia (sube/baja/estable).
+
+`StatsStage` es la etapa opcional de SimulatorManager: resume cada lectura
+y el gestor adjunta el resumen a la trama o lo publica en un canal más
+lento, de modo que los dashboards no tienen que recalcular nada sobre el
+histórico.
+"""
+import math
+from collections import deque
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+WINDOW = 60
+ALPHA = 0.1
+TREND_EPSILON = 1e-3
+
+
+class RollingStats:
+    __slots__ = ("window", "alpha", "values", "mins", "maxs",
+                 "mean", "m2", "ewma", "prev_ewma", "index")
+
+    def __init__(self, window: int = WINDOW, alpha: float = ALPHA):
+        self.window = window
+        self.alpha = alpha
+        self.values: deque = deque()
+        # (índice, valor); las deques sólo guardan candidatos a mínimo/máximo
+        self.mins: deque = deque()
+        self.maxs: deque = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.ewma: Optional[float] = None
+        self.prev_ewma: Optional[float] = None
+        self.index = 0
+
+    def add(self, x: float):
+        # Welford: entra x
+        self.values.append(x)
+        n = len(self.values)
+        delta = x - self.mean
+        self.mean += delta / n
+        self.m2 += delta * (x - self.mean)
+        # ... y sale la lectura más antigua si la ventana está llena
+        if n > self.window:
+            old = self.values.popleft()
+            n -= 1
+            delta = old - self.mean
+            self.mean -= delta / n
+            self.m2 -= delta * (old - self.mean)
+            self.m2 = max(self.m2, 0.0)  # errores de redondeo
+
+        i = self.index
+        self.index += 1
+        while self.mins and self.mins[-1][1] >= x:
+            self.mins.pop()
+        self.mins.append((i, x))
+        while self.maxs and self.maxs[-1][1] <= x:
+            self.maxs.pop()
+        self.maxs.append((i, x))
+        oldest = i - self.window + 1
+        if self.mins[0][0] < oldest:
+            self.mins.popleft()
+        if self.maxs[0][0] < oldest:
+            self.maxs.popleft()
+
+        self.prev_ewma = self.ewma
+        self.ewma = x if self.ewma is None else self.ewma + self.alpha * (x - self.ewma)
+
+    @property
+    def count(self) -> int:
+        return len(self.values)
+
+    @property
+    def variance(self) -> float:
+        n = len(self.values)
+        return self.m2 / (n - 1) if n > 1 else 0.0
+
+    @property
+    def minimum(self) -> Optional[float]:
+        return self.mins[0][1] if self.mins else None
+
+    @property
+    def maximum(self) -> Optional[float]:
+        return self.maxs[0][1] if self.maxs else None
+
+    @property
+    def trend(self) -> str:
+        if self.prev_ewma is None:
+            return "stable"
+        change = self.ewma - self.prev_ewma
+        if change > TREND_EPSILON:
+            return "increasing"
+        if change < -TREND_EPSILON:
+            return "decreasing"
+        return "stable"
+
+    def summary(self, digits: int = 3) -> Dict[str, Any]:
+        return {
+            "n": len(self.values),
+            "mean": round(self.mean, digits),
+            "std": round(math.sqrt(self.variance), digits),
+            "min": self.minimum,
+            "max": self.maximum,
+            "ewma": round(self.ewma, digits) if self.ewma is not None else None,
+            "trend": self.trend,
+        }
+
+
+def numeric_fields(data: Dict[str, Any]) -> Iterable[Tuple[str, float]]:
+    for name, value in data.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, value
+
+
+class StatsStage:
+    """Etapa de estadísticas móviles de SimulatorManager.
+
+    - `attach=True`: el resumen del sensor se añade a su trama en "stats".
+    - `publish_interval` (segundos): el gestor envía además todos los
+      resúmenes en un mensaje {"type": "stats"} con esa periodicidad.
+    - `fields`: campos por tipo de simulador; por defecto, todos los
+      numéricos de primer nivel de la lectura.
+    """
+
+    def __init__(self, window: int = WINDOW, alpha: float = ALPHA, attach: bool = True,
+                 publish_interval: Optional[float] = None,
+                 fields: Optional[Dict[str, Iterable[str]]] = None):
+        self.window = window
+        self.alpha = alpha
+        self.attach = attach
+        self.publish_interval = publish_interval
+        self.fields = {k: tuple(v) for k, v in (fields or {}).items()}
+        self.stats: Dict[str, Dict[str, RollingStats]] = {}
+
+    def update(self, sensor_id: str, sensor_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Añade la lectura y devuelve el resumen del sensor (vacío si no se adjunta)."""
+        per_sensor = self.stats.get(sensor_id)
+        if per_sensor is None:
+            per_sensor = self.stats[sensor_id] = {}
+        selected = self.fields.get(sensor_type)
+        if selected is None:
+            values = numeric_fields(data)
+        else:
+            values = ((name, data[name]) for name in selected if name in data)
+        summary = {}
+        for name, value in values:
+            rolling = per_sensor.get(name)
+            if rolling is None:
+                rolling = per_sensor[name] = RollingStats(self.window, self.alpha)
+            rolling.add(float(value))
+            if self.attach:
+                summary[name] = rolling.summary()
+        return summary
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Resúmenes de todos los sensores, para el canal lento."""
+        return {sensor_id: {name: rolling.summary() for name, rolling in fields.items()}
+                for sensor_id, fields in self.stats.items()}
@@ -0,0 +1,403 @@
+"""Transporte local por memoria compartida hacia un cliente Unreal en la misma máquina.
+
+En los nodos de render el simulador y Unreal comparten máquina; en vez de
+WebSocket por loopback + JSON, `ShmWriter` escribe cada lectura como un
+registro binario de tamaño fijo en un segmento de
+`multiprocessing.shared_memory` (o en un fichero mapeado con mmap).
+El consumidor lo mapea y lee sin copiar ni parsear.
+
+Formato (little-endian, todos los campos alineados a su tamaño)
+---------------------------------------------------------------
+
+Cabecera, HEADER_SIZE = 64 bytes:
+
+    off  tipo      campo
+    0    char[8]   magic         b"RPLKSHM1"
+    8    uint32    version       1
+    12   uint32    capacity      registros del anillo
+    16   uint32    record_size   128
+    20   uint32    slots         entradas de la tabla de estado
+    24   uint64    write_seq     último registro completo del anillo (0 = ninguno)
+    32   uint32    sensor_count  entradas ocupadas de la tabla de estado
+    36   uint32    header_size   64
+    40   uint64    state_offset  inicio de la tabla de estado
+    48   uint32    owner_pid     proceso escritor (0 = desconocido)
+    52   12 bytes  reservado
+
+Anillo: `capacity` registros a partir de HEADER_SIZE; el registro con
+secuencia `s` (s >= 1) está en HEADER_SIZE + ((s - 1) % capacity) * 128.
+
+Tabla de estado: `slots` registros a partir de `state_offset`, uno por
+sensor (en orden de aparición) con su última lectura. Es lo que lee un
+consumidor a ritmo de frame.
+
+Registro, RECORD_SIZE = 128 bytes:
+
+    off  tipo        campo
+    0    uint64      seq        0 mientras se escribe
+    8    float64     timestamp  segundos epoch
+    16   char[16]    sensor_id  ASCII, relleno con NUL
+    32   uint8       kind       KINDS (1 temperatura ... 5 stock, 0 otro)
+    33   uint8       status     STATUSES del tipo (0 = normal)
+    34   uint16      flags      bit 0: presence; bit 1: needs_restock
+    36   uint32      count      valores usados
+    40   float64[11] values     ver FIELDS
+
+Consistencia (seqlock, un único escritor): el escritor pone seq=0, escribe
+el cuerpo, escribe seq y por último actualiza write_seq. El lector copia
+el registro y comprueba que seq vale lo esperado antes y después de la
+copia; si no, el registro se estaba reescribiendo y se descarta (anillo) o
+se reintenta (tabla de estado). En x86 el orden de las escrituras se
+conserva; en otras arquitecturas el consumidor debe leer con barreras de
+adquisición.
+
+Un segmento con el mismo nombre cuyo escritor sigue vivo no se toca:
+`ShmWriter` lanza FileExistsError salvo con `replace=True`. Si el
+escritor anterior murió sin cerrar, el segmento se borra y se crea otro.
+
+Uso rápido (benchmark): python shm_transport.py --records 200000
+"""
+import argparse
+import mmap
+import os
+import struct
+import time
+from datetime import datetime
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b"RPLKSHM1"
+VERSION = 1
+HEADER_SIZE = 64
+RECORD_SIZE = 128
+MAX_VALUES = 11
+CAPACITY = 4096
+SLOTS = 1024
+
+HEADER = struct.Struct("<8sIIIIQIIQI12x")
+RECORD = struct.Struct("<Qd16sBBHI11d")
+SEQ = struct.Struct("<Q")
+WRITE_SEQ_OFFSET = 24
+SENSOR_COUNT_OFFSET = 32
+
+KINDS = {
+    "TemperatureSimulator": 1,
+    "PresenceSimulator": 2,
+    "MovementSimulator": 3,
+    "HumiditySimulator": 4,
+    "StockSimulator": 5,
+}
+KIND_NAMES = {code: name for name, code in KINDS.items()}
+
+# Qué campo de la lectura va en cada posición de `values`
+FIELDS = {
+    "TemperatureSimulator": ("temperature",),
+    "PresenceSimulator": ("presence", "confidence"),
+    "MovementSimulator": ("position.x", "position.y", "position.z",
+                          "velocity.x", "velocity.y", "velocity.z", "intensity", "speed"),
+    "HumiditySimulator": ("humidity",),
+    "StockSimulator": ("current_stock", "stock_level", "sales", "restock_amount"),
+}
+
+STATUSES = {
+    "TemperatureSimulator": ("normal", "warning"),
+    "HumiditySimulator": ("normal", "low", "high"),
+    "StockSimulator": ("normal", "restocking"),
+}
+
+FLAG_PRESENCE = 1
+FLAG_NEEDS_RESTOCK = 2
+
+assert HEADER.size == HEADER_SIZE and RECORD.size == RECORD_SIZE
+
+
+def _field(data: Dict[str, Any], path: str) -> float:
+    value: Any = data
+    for part in path.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return float(value) if isinstance(value, (int, float)) else 0.0
+
+
+def encode_values(sensor_type: str, data: Dict[str, Any]) -> List[float]:
+    """Valores numéricos de la lectura en el orden de FIELDS."""
+    fields = FIELDS.get(sensor_type)
+    if fields is not None:
+        return [_field(data, name) for name in fields]
+    # Tipo desconocido: numéricos de primer nivel en su orden
+    return [float(v) for v in data.values()
+            if isinstance(v, (int, float))][:MAX_VALUES]
+
+
+def region_size(capacity: int, slots: int) -> int:
+    return HEADER_SIZE + (capacity + slots) * RECORD_SIZE
+
+
+class _Region:
+    """Memoria compartida por nombre o fichero mapeado; expone `buf`."""
+
+    def __init__(self, name: Optional[str], path: Optional[str], size: int, create: bool):
+        self.shm = None
+        self.mmap = None
+        if path is not None:
+            if create:
+                with open(path, "wb") as f:
+                    f.truncate(size)
+            with open(path, "r+b") as f:
+                self.mmap = mmap.mmap(f.fileno(), 0)
+            self.buf = memoryview(self.mmap)
+            self.name = path
+        else:
+            if create:
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+                _CREATED.add(self.shm._name)
+            else:
+                self.shm = _attach(name)
+            self.buf = self.shm.buf
+            self.name = self.shm.name
+
+    def close(self):
+        self.buf = None
+        if self.shm is not None:
+            self.shm.close()
+        if self.mmap is not None:
+            self.mmap.close()
+
+
+# Segmentos creados por este proceso (los sigue su resource_tracker)
+_CREATED = set()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # Sin seguimiento: el resource_tracker borraría el segmento al salir el lector
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        shm = shared_memory.SharedMemory(name=name)
+        if shm._name not in _CREATED:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class ShmWriter:
+    """Escritor único del anillo y de la tabla de estado.
+
+    `publish` tiene la misma firma que `SQLiteSink.submit`, de modo que
+    SimulatorManager lo usa como un destino más (`local_transport`).
+    """
+
+    def __init__(self, name: Optional[str] = "replikstore_sensors", path: Optional[str] = None,
+                 capacity: int = CAPACITY, slots: int = SLOTS, replace: bool = False):
+        if name is not None and path is None:
+            _unlink_stale(name, replace)
+        self.capacity = capacity
+        self.slots = slots
+        self.state_offset = HEADER_SIZE + capacity * RECORD_SIZE
+        self.region = _Region(name, path, region_size(capacity, slots), create=True)
+        self.name = self.region.name
+        self.seq = 0
+        self.slot_of: Dict[str, int] = {}
+        self.stats = {"written": 0, "dropped_slots": 0}
+        HEADER.pack_into(self.region.buf, 0, MAGIC, VERSION, capacity, RECORD_SIZE, slots,
+                         0, 0, HEADER_SIZE, self.state_offset, os.getpid())
+
+    def publish(self, sensor_id: str, sensor_type: str, data: Dict[str, Any],
+                timestamp: Optional[datetime] = None) -> int:
+        """Escribe la lectura en el anillo y en la tabla de estado; devuelve su secuencia."""
+        values = encode_values(sensor_type, data)
+        flags = 0
+        if data.get("presence"):
+            flags |= FLAG_PRESENCE
+        if data.get("needs_restock"):
+            flags |= FLAG_NEEDS_RESTOCK
+        statuses = STATUSES.get(sensor_type, ())
+        status = data.get("status")
+        status_code = statuses.index(status) if status in statuses else 0
+        ts = (timestamp or datetime.now()).timestamp()
+        body = (ts, sensor_id.encode("ascii", "replace")[:16], KINDS.get(sensor_type, 0),
+                status_code, flags, len(values), *values, *([0.0] * (MAX_VALUES - len(values))))
+
+        self.seq += 1
+        seq = self.seq
+        buf = self.region.buf
+        self._write_record(HEADER_SIZE + ((seq - 1) % self.capacity) * RECORD_SIZE, seq, body)
+        SEQ.pack_into(buf, WRITE_SEQ_OFFSET, seq)
+
+        slot = self.slot_of.get(sensor_id)
+        if slot is None:
+            if len(self.slot_of) >= self.slots:
+                self.stats["dropped_slots"] += 1
+            else:
+                slot = self.slot_of[sensor_id] = len(self.slot_of)
+                struct.pack_into("<I", buf, SENSOR_COUNT_OFFSET, len(self.slot_of))
+        if slot is not None:
+            self._write_record(self.state_offset + slot * RECORD_SIZE, seq, body)
+        self.stats["written"] += 1
+        return seq
+
+    def _write_record(self, offset: int, seq: int, body: Tuple) -> None:
+        buf = self.region.buf
+        SEQ.pack_into(buf, offset, 0)
+        RECORD.pack_into(buf, offset, 0, *body)
+        SEQ.pack_into(buf, offset, seq)
+
+    def close(self, unlink: bool = True):
+        shm = self.region.shm
+        self.region.close()
+        if unlink and shm is not None:
+            shm.unlink()
+            _CREATED.discard(shm._name)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # existe, aunque sea de otro usuario
+    return True
+
+
+def _unlink_stale(name: str, replace: bool = False):
+    """Borra un segmento que dejó un proceso anterior que no terminó bien.
+
+    Si su escritor sigue vivo (o no se sabe cuál es) lanza FileExistsError,
+    salvo con `replace=True`.
+    """
+    try:
+        stale = _attach(name)
+    except FileNotFoundError:
+        return
+    try:
+        owner = 0
+        if stale.size >= HEADER_SIZE and bytes(stale.buf[:8]) == MAGIC:
+            owner = HEADER.unpack_from(stale.buf, 0)[9]
+        if not replace and (owner == 0 or _pid_alive(owner)):
+            who = f"el proceso {owner}" if owner else "un escritor desconocido"
+            raise FileExistsError(
+                f"El segmento {name} está en uso por {who}; usa otro nombre o "
+                f"ShmWriter(..., replace=True) para sustituirlo")
+    finally:
+        stale.close()
+    stale.unlink()
+
+
+class ShmReader:
+    """Lector de referencia (pruebas y herramientas); no modifica el segmento."""
+
+    def __init__(self, name: Optional[str] = "replikstore_sensors", path: Optional[str] = None):
+        region = _Region(name, path, 0, create=False)
+        magic, version, capacity, record_size, slots, _, _, header_size, state_offset, _ = \
+            HEADER.unpack_from(region.buf, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+            region.close()
+            raise ValueError(f"Segmento {name or path} con formato desconocido")
+        self.region = region
+        self.capacity = capacity
+        self.slots = slots
+        self.header_size = header_size
+        self.state_offset = state_offset
+        self.last_seq = 0
+        self.stats = {"read": 0, "overrun": 0, "torn": 0}
+
+    @property
+    def write_seq(self) -> int:
+        return SEQ.unpack_from(self.region.buf, WRITE_SEQ_OFFSET)[0]
+
+    def _record(self, offset: int, expected: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        buf = self.region.buf
+        raw = bytes(buf[offset:offset + RECORD_SIZE])
+        seq = SEQ.unpack_from(raw, 0)[0]
+        if seq == 0 or (expected is not None and seq != expected):
+            return None
+        if SEQ.unpack_from(buf, offset)[0] != seq:
+            return None
+        return decode(raw)
+
+    def poll(self) -> Iterator[Dict[str, Any]]:
+        """Registros nuevos del anillo desde la última llamada, en orden.
+
+        Si el escritor dio la vuelta al anillo se salta a los que siguen
+        disponibles y se cuenta en `stats["overrun"]`.
+        """
+        head = self.write_seq
+        start = self.last_seq + 1
+        if head - start + 1 > self.capacity:
+            self.stats["overrun"] += head - self.capacity - start + 1
+            start = head - self.capacity + 1
+        for seq in range(start, head + 1):
+            record = self._record(self.header_size + ((seq - 1) % self.capacity) * RECORD_SIZE, seq)
+            if record is None:
+                self.stats["torn"] += 1  # sobrescrito mientras se leía
+                continue
+            self.stats["read"] += 1
+            yield record
+        self.last_seq = max(self.last_seq, head)
+
+    def latest(self, retries: int = 3) -> Dict[str, Dict[str, Any]]:
+        """Última lectura de cada sensor, desde la tabla de estado."""
+        count = struct.unpack_from("<I", self.region.buf, SENSOR_COUNT_OFFSET)[0]
+        state = {}
+        for slot in range(min(count, self.slots)):
+            offset = self.state_offset + slot * RECORD_SIZE
+            for _ in range(retries):
+                record = self._record(offset)
+                if record is not None:
+                    state[record["sensor_id"]] = record
+                    break
+        return state
+
+    def close(self):
+        self.region.close()
+
+
+def decode(raw: bytes) -> Dict[str, Any]:
+    seq, ts, sensor_id, kind, status, flags, count, *values = RECORD.unpack(raw)
+    sensor_type = KIND_NAMES.get(kind)
+    statuses = STATUSES.get(sensor_type, ())
+    return {
+        "seq": seq,
+        "timestamp": ts,
+        "sensor_id": sensor_id.rstrip(b"\0").decode("ascii"),
+        "sensor_type": sensor_type,
+        "status": statuses[status] if status < len(statuses) else None,
+        "presence": bool(flags & FLAG_PRESENCE),
+        "needs_restock": bool(flags & FLAG_NEEDS_RESTOCK),
+        "values": values[:count],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del transporte por memoria compartida")
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--sensors", type=int, default=500)
+    parser.add_argument("--file", help="usar un fichero mapeado en vez de shared_memory")
+    args = parser.parse_args()
+
+    writer = ShmWriter(name=f"replikstore_bench_{os.getpid()}", path=args.file)
+    reader = ShmReader(name=writer.name if args.file is None else None, path=args.file)
+    sample = {"temperature": 4.2, "unit": "celsius", "status": "normal"}
+    sensor_ids = [f"TEMP{i:05d}" for i in range(args.sensors)]
+    read = 0
+    started = time.perf_counter()
+    for i in range(args.records):
+        writer.publish(sensor_ids[i % args.sensors], "TemperatureSimulator", sample)
+        if i % 1000 == 999:
+            read += sum(1 for _ in reader.poll())
+    read += sum(1 for _ in reader.poll())
+    elapsed = time.perf_counter() - started
+    started = time.perf_counter()
+    state = reader.latest()
+    latest_ms = (time.perf_counter() - started) * 1000
+    print(f"{args.records / elapsed:,.0f} registros/s escritos y leídos ({read} leídos, "
+          f"{reader.stats['overrun']} perdidos por vuelta); "
+          f"estado de {len(state)} sensores en {latest_ms:.2f} ms")
+    reader.close()
+    writer.close()
+    if args.file:
+        os.remove(args.file)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,34 @@
 from base_simulator import BaseSimulator
 import random
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 
 class PresenceSimulator(BaseSimulator):
     def __init__(self, sensor_id: str, location: str,
                  detection_radius: float = 5.0,
-                 false_positive_rate: float = 0.01):
+                 false_positive_rate: float = 0.01,
+                 field=None,
+                 position: Optional[Tuple[float, float]] = None):
         super().__init__(sensor_id, location)
         self.detection_radius = detection_radius
         self.false_positive_rate = false_positive_rate
         self.last_detection = None
         self.presence_duration = timedelta(minutes=random.randint(1, 10))
+        # Modelo espacial opcional (spatial_index.PresenceField): la presencia
+        # sale de los clientes simulados dentro de detection_radius; el campo
+        # lo avanza SimulatorManager una vez por tick (add_model)
+        self.field = field
+        self.position = position
+        if field is not None:
+            if position is None:
+                raise ValueError(f"{sensor_id}: el modelo espacial necesita la posición del sensor")
+            field.add_sensor(sensor_id, position, detection_radius)
         
     def generate_data(self) -> Dict[str, Any]:
         """Genera datos de presencia simulados."""
-        current_time = datetime.now()
+        current_time = self.now()
+        if self.field is not None:
+            return self._detect(current_time)
         
         # Simular falsos positivos
         if random.random() < self.false_positive_rate:
@@ -46,12 +59,33 @@ class PresenceSimulator(BaseSimulator):
             "type": "none" if self.last_detection is None else "real"
         }
         
+    def _detect(self, current_time: datetime) -> Dict[str, Any]:
+        """Presencia a partir de los clientes dentro del radio de detección."""
+        count = self.field.count(self.sensor_id)
+        if count:
+            self.last_detection = current_time
+            return {
+                "presence": True,
+                "confidence": random.uniform(0.8, 1.0),
+                "type": "real",
+                "count": count
+            }
+        if random.random() < self.false_positive_rate:
+            return {
+                "presence": True,
+                "confidence": random.uniform(0.6, 0.8),
+                "type": "false_positive",
+                "count": 0
+            }
+        return {"presence": False, "confidence": 1.0, "type": "none", "count": 0}
+        
     def get_metadata(self) -> Dict[str, Any]:
         """Obtiene metadatos específicos del sensor de presencia."""
         metadata = super().get_metadata()
         metadata.update({
             "detection_radius": self.detection_radius,
             "false_positive_rate": self.false_positive_rate,
+            "position": self.position,
             "last_detection": self.last_detection.isoformat() if self.last_detection else None
         })
         return metadata 
\ No newline at end of file
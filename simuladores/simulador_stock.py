@@ -16,14 +16,14 @@ class StockSimulator(BaseSimulator):
         self.min_stock = min_stock
         self.current_stock = current_stock
         self.restock_threshold = restock_threshold
-        self.last_restock = datetime.now()
+        self.last_restock = self.now()
         self.restock_duration = timedelta(hours=2)
         self.is_restocking = False
         
     def _simulate_sales(self) -> int:
         """Simula ventas aleatorias."""
         # Probabilidad de venta basada en la hora del día
-        hour = datetime.now().hour
+        hour = self.now().hour
         if 10 <= hour <= 14 or 17 <= hour <= 20:  # Horas pico
             sale_probability = 0.3
         else:
@@ -37,14 +37,14 @@ class StockSimulator(BaseSimulator):
         """Verifica si es necesario reabastecer."""
         if self.current_stock <= self.restock_threshold and not self.is_restocking:
             self.is_restocking = True
-            self.last_restock = datetime.now()
+            self.last_restock = self.now()
             return True
         return False
         
     def _process_restock(self) -> int:
         """Procesa el reabastecimiento."""
         if self.is_restocking:
-            if datetime.now() - self.last_restock >= self.restock_duration:
+            if self.now() - self.last_restock >= self.restock_duration:
                 restock_amount = self.max_stock - self.current_stock
                 self.current_stock = self.max_stock
                 self.is_restocking = False
@@ -7,16 +7,28 @@ class TemperatureSimulator(BaseSimulator):
                  base_temp: float = 22.0,
                  min_temp: float = 18.0,
                  max_temp: float = 26.0,
-                 noise_level: float = 0.5):
+                 noise_level: float = 0.5,
+                 thermal=None,
+                 fridge_index: int = 0):
         super().__init__(sensor_id, location)
         self.base_temp = base_temp
         self.min_temp = min_temp
         self.max_temp = max_temp
         self.noise_level = noise_level
         self.current_temp = base_temp
+        # Modo térmico opcional (fridge_thermal.FridgeFleet): la temperatura
+        # sale del modelo físico de la nevera `fridge_index`; la flota la
+        # avanza SimulatorManager una vez por tick (add_model)
+        self.thermal = thermal
+        self.fridge_index = fridge_index
         
     def generate_data(self) -> Dict[str, Any]:
         """Genera datos de temperatura simulados."""
+        if self.thermal is not None:
+            data = self.thermal.reading(self.fridge_index)
+            self.current_temp = data["temperature"]
+            return data
+            
         # Simular variación natural de temperatura
         variation = random.uniform(-0.2, 0.2)
         self.current_temp += variation
@@ -1,20 +1,58 @@
 import asyncio
 import json
+import os
 import websockets
 import logging
-from typing import Dict, List, Any
+from typing import TYPE_CHECKING, Callable, Dict, List, Any, Optional
 from datetime import datetime
 from base_simulator import BaseSimulator
+from sqlite_sink import SinkError, SQLiteSink
+from alert_engine import AlertEngine
+from rolling_stats import StatsStage
+from shm_transport import ShmWriter
+from adaptive_sampling import AdaptiveSampler
+from priority_lanes import LaneClassifier, PriorityOutbox
+from resumable_stream import REPLAY_LANES, ResumableStream
 from simulador_temperatura import TemperatureSimulator
 from simulador_presencia import PresenceSimulator
 from simulador_movimiento import MovementSimulator
 from simulador_humedad import HumiditySimulator
 from simulador_stock import StockSimulator
 
+if TYPE_CHECKING:  # heatmap necesita numpy: se importa sólo si se activa
+    from heatmap import HeatmapStage
+
 class SimulatorManager:
-    def __init__(self, websocket_url: str = "ws://localhost:8080"):
-        self.websocket_url = websocket_url
+    def __init__(self, websocket_url: str = "ws://localhost:8080",
+                 sink: Optional[SQLiteSink] = None,
+                 alert_engine: Optional[AlertEngine] = None,
+                 stats_stage: Optional[StatsStage] = None,
+                 local_transport: Optional[ShmWriter] = None,
+                 heatmap_stage: Optional["HeatmapStage"] = None,
+                 sampler: Optional[AdaptiveSampler] = None,
+                 outbox: Optional[PriorityOutbox] = None,
+                 stream: Optional[ResumableStream] = None):
+        self.websocket_url = websocket_url  # None: sólo transporte local
+        self.sink = sink  # Persistencia opcional en SQLite
+        self.alert_engine = alert_engine  # Reglas de alerta sobre cada lectura
+        self.stats_stage = stats_stage  # Estadísticas móviles por sensor
+        self.local_transport = local_transport  # Memoria compartida para Unreal en la misma máquina
+        self.heatmap_stage = heatmap_stage  # Mapa de calor de las posiciones de movimiento
+        self.sampler = sampler  # Envío adaptativo: sólo cambios, cruces de umbral y latidos
+        # Carriles de prioridad: el bucle encola y una tarea aparte envía
+        self.outbox = outbox
+        self.classifier = LaneClassifier() if outbox is not None else None
+        if outbox is not None and alert_engine is not None and alert_engine.on_alert is None:
+            alert_engine.on_alert = self._queue_alert
+        # Secuencias, búfer de reenvío y esperas entre reconexiones (opcional)
+        self.stream = stream
+        self.last_readings: Dict[str, Dict[str, Any]] = {}  # base del snapshot al reconectar
+        self._last_stats_publish = 0.0
+        self._last_heatmap_publish = 0.0
         self.simulators: Dict[str, BaseSimulator] = {}
+        # Modelos compartidos (PresenceField, FridgeFleet...): avanzan una vez por tick
+        self.models: List[Any] = []
+        self.clock: Callable[[], datetime] = datetime.now
         self.is_running = False
         self.logger = logging.getLogger("SimulatorManager")
         
@@ -23,6 +61,14 @@ class SimulatorManager:
         self.simulators[simulator.sensor_id] = simulator
         self.logger.info(f"Simulador {simulator.sensor_id} añadido")
         
+    def add_model(self, model):
+        """Añade un modelo compartido por varios simuladores.
+
+        El gestor llama a `model.advance(instante)` al principio de cada tick,
+        en el orden en que se añadieron, y los simuladores sólo leen su estado.
+        """
+        self.models.append(model)
+        
     def remove_simulator(self, sensor_id: str):
         """Elimina un simulador del gestor."""
         if sensor_id in self.simulators:
@@ -34,32 +80,184 @@ class SimulatorManager:
         """Envía datos a través del WebSocket."""
         try:
             await websocket.send(json.dumps(data))
+        except websockets.ConnectionClosed:
+            raise  # conexión caída: handle_connection reconecta
         except Exception as e:
             self.logger.error(f"Error al enviar datos: {e}")
             
+    def _delivering(self, websocket) -> bool:
+        """¿Hay a quién entregar tramas? Con carriles se encolan aunque no haya conexión."""
+        return websocket is not None or (self.outbox is not None and self.websocket_url is not None)
+        
+    async def emit(self, websocket, frame: Dict[str, Any], lane: str = "routine"):
+        """Entrega una trama: al carril que toca o, sin carriles, directamente."""
+        if self.outbox is not None:
+            if self.websocket_url is not None:
+                self.outbox.put(frame, lane)
+        elif websocket is not None:
+            if self.stream is not None:
+                frame = self.stream.stamp(frame, lane)
+            await self.send_data(websocket, frame)
+            
+    def _queue_alert(self, alert):
+        """on_alert de AlertEngine: las alertas van al carril prioritario."""
+        if self.websocket_url is not None:
+            self.outbox.put(dict(alert.to_dict(), type="alert"), "alert")
+            
+    def _restart_sink(self, error: SinkError):
+        """El hilo de SQLite murió: se registra y se arranca otro (la cola se conserva)."""
+        self.logger.error(f"{error}; reiniciando la persistencia "
+                          f"({self.sink.stats['lost']} filas perdidas en total)")
+        self.sink.restart()
+        
+    async def tick(self, websocket=None):
+        """Genera una lectura de cada simulador y la entrega a todos los destinos."""
+        delivering = self._delivering(websocket)
+        now = self.clock()
+        for model in self.models:
+            model.advance(now)
+        for simulator in self.simulators.values():
+            data = simulator.generate_data()
+            sensor_type = simulator.__class__.__name__
+            self.last_readings[simulator.sensor_id] = {
+                "type": sensor_type, "location": simulator.location, "data": data}
+            lane = "routine"
+            if self.classifier is not None:
+                lane = self.classifier.lane(simulator.sensor_id, data)
+            if self.sink is not None:
+                try:
+                    self.sink.submit(simulator.sensor_id, sensor_type,
+                                     data, simulator.now())
+                except SinkError as e:
+                    self._restart_sink(e)
+                    self.sink.submit(simulator.sensor_id, sensor_type,
+                                     data, simulator.now())
+            if self.alert_engine is not None:
+                try:
+                    self.alert_engine.evaluate(simulator.sensor_id, sensor_type,
+                                               data, simulator.now())
+                except SinkError as e:
+                    self._restart_sink(e)  # la alerta ya salió por on_alert
+            if self.local_transport is not None:
+                self.local_transport.publish(simulator.sensor_id, sensor_type,
+                                             data, simulator.now())
+            if self.stats_stage is not None:
+                summary = self.stats_stage.update(simulator.sensor_id, sensor_type, data)
+                if self.stats_stage.attach:
+                    data = dict(data, stats=summary)
+            if self.heatmap_stage is not None and sensor_type == "MovementSimulator":
+                self.heatmap_stage.update(data)
+                if not self.heatmap_stage.forward_points:
+                    continue  # la posición sólo llega agregada en el mapa de calor
+            if self.sampler is not None and not self.sampler.should_emit(
+                    simulator.sensor_id, sensor_type, data, simulator.now().timestamp()):
+                continue
+            if delivering:
+                formatted_data = simulator.format_data(data)
+                await self.emit(websocket, json.loads(formatted_data), lane)
+                if self.outbox is not None and self.outbox.lanes["alert"]:
+                    await asyncio.sleep(0)  # el envío de alertas no espera al resto del tick
+                
+        if self.heatmap_stage is not None:
+            self.heatmap_stage.flush(asyncio.get_running_loop().time())
+        if delivering:
+            await self.publish_stats(websocket)
+            await self.publish_heatmap(websocket)
+            
     async def handle_connection(self):
         """Maneja la conexión WebSocket con Unreal Engine."""
+        if self.websocket_url is None:
+            # Sólo transporte local: no hay conexión que mantener
+            while self.is_running:
+                await self.tick()
+                await asyncio.sleep(1)  # Intervalo de actualización
+            return
+            
         while self.is_running:
             try:
                 async with websockets.connect(self.websocket_url) as websocket:
                     self.logger.info("Conectado a Unreal Engine")
+                    stamp = None
+                    if self.stream is not None:
+                        self.stream.connected()
+                        await self.resume(websocket)
+                        stamp = self.stream.stamp
+                    sender = None
+                    if self.outbox is not None:
+                        sender = asyncio.create_task(self.outbox.drain(websocket, stamp=stamp))
                     
-                    while self.is_running:
-                        # Generar y enviar datos de todos los simuladores
-                        for simulator in self.simulators.values():
-                            data = simulator.generate_data()
-                            formatted_data = simulator.format_data(data)
-                            await self.send_data(websocket, json.loads(formatted_data))
-                            
-                        await asyncio.sleep(1)  # Intervalo de actualización
+                    try:
+                        while self.is_running:
+                            # Generar y enviar datos de todos los simuladores
+                            await self.tick(websocket)
+                            if sender is not None and sender.done():
+                                sender.result()  # error de envío: reconectar
+                            await asyncio.sleep(1)  # Intervalo de actualización
+                    finally:
+                        if sender is not None:
+                            sender.cancel()
                         
             except Exception as e:
-                self.logger.error(f"Error de conexión: {e}")
-                await asyncio.sleep(5)  # Esperar antes de reconectar
+                # Con stream: espera exponencial con jitter; sin él, 5 s fijos
+                delay = self.stream.backoff() if self.stream is not None else 5
+                self.logger.error(f"Error de conexión: {e}; reintento en {delay:.1f} s")
+                await asyncio.sleep(delay)
+                
+    async def resume(self, websocket):
+        """Al conectar: reenvía lo que le faltaba al cliente y manda el snapshot.
+
+        Las tramas reenviadas conservan su seq y el snapshot lleva la última
+        asignada sin consumir otra, así el cliente ve las secuencias en orden
+        y el snapshot queda como estado vigente antes de los deltas.
+        """
+        last_seq = await self.stream.read_resume(websocket)
+        replay, complete = [], True
+        if last_seq is not None:
+            replay, complete = self.stream.replay_after(last_seq)
+        if self.outbox is not None:
+            self.outbox.clear("routine")  # el snapshot ya las supera
+            # Las ya numeradas (un envío fallido) irían tras el snapshot con
+            # una seq menor: van en el reenvío o, si el cliente no lo pide,
+            # el snapshot las supera
+            for lane in REPLAY_LANES:
+                self.outbox.clear(lane, keep=lambda frame: "seq" not in frame)
+        for frame in replay:
+            await self.send_data(websocket, frame)
+        await self.send_data(websocket, self.stream.snapshot(
+            dict(self.last_readings), self.clock().isoformat(), gap=not complete))
                 
+    async def publish_stats(self, websocket):
+        """Envía los resúmenes de todos los sensores cada publish_interval segundos."""
+        stage = self.stats_stage
+        if stage is None or not stage.publish_interval:
+            return
+        now = asyncio.get_running_loop().time()
+        if now - self._last_stats_publish >= stage.publish_interval:
+            self._last_stats_publish = now
+            frame = {
+                "type": "stats",
+                "timestamp": datetime.now().isoformat(),
+                "sensors": stage.snapshot()
+            }
+            if self.outbox is not None:
+                frame["lanes"] = self.outbox.latency()  # latencia de envío por carril
+            await self.emit(websocket, frame)
+            
+    async def publish_heatmap(self, websocket):
+        """Envía el mapa de calor cada publish_interval segundos."""
+        stage = self.heatmap_stage
+        if stage is None:
+            return
+        now = asyncio.get_running_loop().time()
+        if now - self._last_heatmap_publish >= stage.publish_interval:
+            self._last_heatmap_publish = now
+            await self.emit(websocket, stage.frame())
+            
     def start(self):
         """Inicia el gestor de simuladores."""
         self.is_running = True
+        if self.sink is not None:
+            self.sink.start()
         for simulator in self.simulators.values():
             simulator.start()
         self.logger.info("Gestor de simuladores iniciado")
@@ -69,6 +267,13 @@ class SimulatorManager:
         self.is_running = False
         for simulator in self.simulators.values():
             simulator.stop()
+        if self.sink is not None:
+            try:
+                self.sink.stop()
+            except SinkError as e:
+                self.logger.error(f"{e}; {self.sink.stats['lost']} filas sin guardar")
+        if self.local_transport is not None:
+            self.local_transport.close()
         self.logger.info("Gestor de simuladores detenido")
         
     async def run(self):
@@ -91,6 +296,10 @@ def create_default_simulators() -> List[BaseSimulator]:
         StockSimulator("STOCK002", "Almacén B", "PROD002")
     ]
 
+def _enabled(name: str) -> bool:
+    """Etapa opcional activada con <name>=on; por defecto el formato de envío no cambia."""
+    return os.environ.get(name, "off").lower() in ("on", "1", "true")
+
 async def main():
     # Configurar logging
     logging.basicConfig(
@@ -98,8 +307,35 @@ async def main():
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
-    # Crear y configurar el gestor
-    manager = SimulatorManager()
+    # Crear y configurar el gestor; SIMULATOR_DB activa la persistencia en SQLite
+    db_path = os.environ.get("SIMULATOR_DB")
+    sink = SQLiteSink(db_path) if db_path else None
+    # SIMULATOR_SHM=<nombre> publica además en memoria compartida (ver shm_transport.py);
+    # con SIMULATOR_WS=off no se abre el WebSocket
+    shm_name = os.environ.get("SIMULATOR_SHM")
+    local_transport = ShmWriter(name=shm_name) if shm_name else None
+    websocket_url = None if os.environ.get("SIMULATOR_WS") == "off" else "ws://localhost:8080"
+    # SIMULATOR_ALERTS=on evalúa las reglas de alert_engine.py sobre cada lectura
+    alert_engine = AlertEngine(sink=sink) if _enabled("SIMULATOR_ALERTS") else None
+    # SIMULATOR_STATS=on adjunta estadísticas móviles y publica {"type": "stats"}
+    stats_stage = StatsStage(publish_interval=10) if _enabled("SIMULATOR_STATS") else None
+    # SIMULATOR_HEATMAP=on publica {"type": "heatmap"} con las posiciones de movimiento
+    heatmap_stage = None
+    if _enabled("SIMULATOR_HEATMAP"):
+        from heatmap import HeatmapStage
+        heatmap_stage = HeatmapStage()
+    # SIMULATOR_ADAPTIVE=on sólo envía cambios, cruces de umbral y latidos
+    sampler = AdaptiveSampler() if _enabled("SIMULATOR_ADAPTIVE") else None
+    # SIMULATOR_LANES=on envía desde una tarea aparte con carriles de prioridad
+    outbox = PriorityOutbox() if _enabled("SIMULATOR_LANES") else None
+    # SIMULATOR_RESUME=on numera las tramas, permite reanudar y manda un snapshot al conectar
+    stream = ResumableStream() if _enabled("SIMULATOR_RESUME") else None
+    manager = SimulatorManager(websocket_url, sink=sink, alert_engine=alert_engine,
+                               stats_stage=stats_stage,
+                               local_transport=local_transport,
+                               heatmap_stage=heatmap_stage,
+                               sampler=sampler,
+                               outbox=outbox, stream=stream)
     
     # Añadir simuladores predeterminados
     for simulator in create_default_simulators():
@@ -0,0 +1,224 @@
+"""Modelo espacial de la tienda: clientes simulados y sensores de presencia.
+
+La planta es el rectángulo FLOOR (x, y ∈ [-10, 10], los mismos límites que
+MovementSimulator._update_position). `ShopperCrowd` mueve a todos los
+clientes a la vez con arrays; `SpatialGrid` indexa los sensores en una
+rejilla uniforme para responder "qué sensores ven a qué clientes" en
+O(clientes + aciertos) por tick, en vez de comparar cada cliente con cada
+sensor:
+
+- cada sensor se guarda en todas las celdas que toca su disco de detección
+  (índice CSR: `cell_start` + `cell_sensors`);
+- cada cliente sólo mira los sensores de su celda y se confirma la
+  distancia de esos candidatos, todo vectorizado.
+
+`PresenceField` une ambos: PresenceSimulator con `field=` deja de tirar
+dados y detecta a los clientes que realmente pasan por su radio.
+SimulatorManager avanza el campo una vez por tick (`add_model`) y los
+simuladores sólo consultan el recuento.
+
+Uso rápido (benchmark): python spatial_index.py --shoppers 5000 --sensors 300
+"""
+import argparse
+import random
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+FLOOR = (-10.0, 10.0, -10.0, 10.0)  # x_min, x_max, y_min, y_max
+
+
+class SpatialGrid:
+    """Rejilla uniforme de discos (sensores) sobre la planta."""
+
+    def __init__(self, positions, radii, bounds: Tuple[float, float, float, float] = FLOOR,
+                 cell_size: Optional[float] = None):
+        self.positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        n = len(self.positions)
+        self.radii = np.broadcast_to(np.asarray(radii, dtype=np.float64), (n,)).copy()
+        self.bounds = bounds
+        x_min, x_max, y_min, y_max = bounds
+        if cell_size is None:
+            # Medio radio: cada disco ocupa unas 5x5 celdas y se descartan
+            # menos candidatos que con celdas del tamaño del radio. Sin
+            # sensores o con todos los radios a 0, una sola celda
+            cell_size = float(self.radii.max()) / 2 if n else 0.0
+            if cell_size <= 0:
+                cell_size = max(x_max - x_min, y_max - y_min)
+        if not cell_size > 0:
+            raise ValueError(f"cell_size debe ser positivo: {cell_size}")
+        self.cell_size = cell_size
+        self.nx = max(1, int(np.ceil((x_max - x_min) / cell_size)))
+        self.ny = max(1, int(np.ceil((y_max - y_min) / cell_size)))
+
+        cells, owners = [], []
+        lo_x, lo_y = self._cell_xy(self.positions - self.radii[:, None])
+        hi_x, hi_y = self._cell_xy(self.positions + self.radii[:, None])
+        for i in range(n):
+            xs = np.arange(lo_x[i], hi_x[i] + 1)
+            ys = np.arange(lo_y[i], hi_y[i] + 1)
+            block = (xs[:, None] * self.ny + ys[None, :]).ravel()
+            cells.append(block)
+            owners.append(np.full(len(block), i, dtype=np.intp))
+        cells = np.concatenate(cells) if cells else np.empty(0, dtype=np.intp)
+        owners = np.concatenate(owners) if owners else np.empty(0, dtype=np.intp)
+        order = np.argsort(cells, kind="stable")
+        self.cell_sensors = owners[order]
+        counts = np.bincount(cells, minlength=self.nx * self.ny)
+        self.cell_start = np.concatenate(([0], np.cumsum(counts))).astype(np.intp)
+
+    def _cell_xy(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        x_min, _, y_min, _ = self.bounds
+        cx = np.clip(((points[:, 0] - x_min) // self.cell_size).astype(np.intp), 0, self.nx - 1)
+        cy = np.clip(((points[:, 1] - y_min) // self.cell_size).astype(np.intp), 0, self.ny - 1)
+        return cx, cy
+
+    def query(self, points) -> Tuple[np.ndarray, np.ndarray]:
+        """Pares (índice de punto, índice de sensor) con el punto dentro del radio."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        cx, cy = self._cell_xy(points)
+        cells = cx * self.ny + cy
+        starts = self.cell_start[cells]
+        counts = self.cell_start[cells + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        # Candidatos de todas las celdas en un solo array, sin bucles
+        point_idx = np.repeat(np.arange(len(points)), counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        sensor_idx = self.cell_sensors[np.repeat(starts, counts) + offsets]
+        delta = points[point_idx] - self.positions[sensor_idx]
+        inside = np.einsum("ij,ij->i", delta, delta) <= self.radii[sensor_idx] ** 2
+        return point_idx[inside], sensor_idx[inside]
+
+    def counts(self, points) -> np.ndarray:
+        """Puntos dentro del radio de cada sensor."""
+        _, sensor_idx = self.query(points)
+        return np.bincount(sensor_idx, minlength=len(self.positions))
+
+
+class ShopperCrowd:
+    """Clientes que se mueven por la planta; mismo modelo que MovementSimulator en 2-D.
+
+    `turn_probability` es la probabilidad de cambiar de rumbo por segundo,
+    de modo que el recorrido no depende de cada cuánto se llame a `step`.
+    """
+
+    def __init__(self, shoppers: int, bounds: Tuple[float, float, float, float] = FLOOR,
+                 max_speed: float = 2.0, turn_probability: float = 0.2,
+                 seed: Optional[int] = None):
+        self.bounds = bounds
+        self.max_speed = max_speed
+        self.turn_probability = turn_probability
+        self.rng = np.random.default_rng(seed)
+        x_min, x_max, y_min, y_max = bounds
+        self.positions = np.column_stack((self.rng.uniform(x_min, x_max, shoppers),
+                                          self.rng.uniform(y_min, y_max, shoppers)))
+        self.velocities = np.zeros((shoppers, 2))
+
+    def step(self, dt: float = 1.0):
+        n = len(self.positions)
+        p_turn = 1.0 - (1.0 - self.turn_probability) ** dt
+        turn = self.rng.random(n) < p_turn
+        k = int(turn.sum())
+        if k:
+            speed = self.rng.uniform(0, self.max_speed, k)
+            angle = self.rng.uniform(0, 2 * np.pi, k)
+            self.velocities[turn] = np.column_stack((speed * np.cos(angle), speed * np.sin(angle)))
+        self.positions += self.velocities * dt
+        x_min, x_max, y_min, y_max = self.bounds
+        np.clip(self.positions[:, 0], x_min, x_max, out=self.positions[:, 0])
+        np.clip(self.positions[:, 1], y_min, y_max, out=self.positions[:, 1])
+
+
+class PresenceField:
+    """Presencia derivada de las posiciones de los clientes.
+
+    Los PresenceSimulator se registran con su posición y radio. El gestor
+    llama a `advance` una vez por tick: la multitud se mueve y se cuentan
+    los clientes de todos los sensores; `count` sólo consulta ese recuento,
+    así todos los sensores del mismo tick ven el mismo estado.
+    """
+
+    def __init__(self, crowd: ShopperCrowd, cell_size: Optional[float] = None):
+        self.crowd = crowd
+        self.cell_size = cell_size
+        self.sensors: Dict[str, int] = {}
+        self._positions = []
+        self._radii = []
+        self.grid: Optional[SpatialGrid] = None
+        self._counts = np.zeros(0, dtype=np.intp)
+        self._last_step: Optional[datetime] = None
+
+    def add_sensor(self, sensor_id: str, position: Tuple[float, float], radius: float):
+        if sensor_id not in self.sensors:
+            self.sensors[sensor_id] = len(self._positions)
+            self._positions.append(position)
+            self._radii.append(radius)
+        else:
+            self._positions[self.sensors[sensor_id]] = position
+            self._radii[self.sensors[sensor_id]] = radius
+        self.grid = None  # se reconstruye en el siguiente paso
+
+    def advance(self, timestamp: datetime):
+        """Avanza la multitud hasta `timestamp` y recuenta los sensores."""
+        if self._last_step is None or timestamp > self._last_step:
+            if self._last_step is not None:
+                self.crowd.step((timestamp - self._last_step).total_seconds())
+            self._last_step = timestamp
+        if self.grid is None:
+            self.grid = SpatialGrid(self._positions, self._radii, self.crowd.bounds, self.cell_size)
+        self._counts = self.grid.counts(self.crowd.positions)
+
+    def count(self, sensor_id: str) -> int:
+        """Clientes dentro del radio del sensor en el último `advance` (0 si aún no se contó)."""
+        index = self.sensors[sensor_id]
+        return int(self._counts[index]) if index < len(self._counts) else 0
+
+
+def brute_force_counts(points: np.ndarray, positions: np.ndarray, radii: np.ndarray) -> np.ndarray:
+    """O(clientes × sensores); referencia para comprobar la rejilla."""
+    d2 = ((points[:, None, :] - positions[None, :, :]) ** 2).sum(axis=2)
+    return (d2 <= radii[None, :] ** 2).sum(axis=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la rejilla espacial de presencia")
+    parser.add_argument("--shoppers", type=int, default=5000)
+    parser.add_argument("--sensors", type=int, default=300)
+    parser.add_argument("--radius", type=float, default=1.0)
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rnd = random.Random(args.seed)
+    x_min, x_max, y_min, y_max = FLOOR
+    sensors = np.array([(rnd.uniform(x_min, x_max), rnd.uniform(y_min, y_max))
+                        for _ in range(args.sensors)])
+    radii = np.full(args.sensors, args.radius)
+    grid = SpatialGrid(sensors, radii)
+    crowd = ShopperCrowd(args.shoppers, seed=args.seed)
+
+    hits = 0
+    started = time.perf_counter()
+    for _ in range(args.ticks):
+        crowd.step()
+        hits += int(grid.counts(crowd.positions).sum())
+    elapsed = time.perf_counter() - started
+
+    reference = brute_force_counts(crowd.positions, sensors, radii)
+    assert np.array_equal(grid.counts(crowd.positions), reference)
+    started = time.perf_counter()
+    for _ in range(10):
+        brute_force_counts(crowd.positions, sensors, radii)
+    brute = (time.perf_counter() - started) / 10
+    print(f"{args.ticks / elapsed:,.0f} ticks/s con {args.shoppers} clientes y {args.sensors} sensores "
+          f"({hits / args.ticks:,.0f} detecciones por tick, rejilla {grid.nx}x{grid.ny}); "
+          f"fuerza bruta: {1 / brute:,.0f} ticks/s")
+
+
+if __name__ == "__main__":
+    main()
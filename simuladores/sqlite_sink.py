@@ -0,0 +1,267 @@
+"""Persistencia directa de las lecturas de los simuladores en SQLite.
+
+`SQLiteSink` recibe lecturas desde el bucle asyncio de SimulatorManager y
+las escribe desde un hilo propio:
+
+- `submit` sólo encola (put_nowait); si la cola está llena la lectura se
+  descarta y se cuenta en `stats["dropped"]`, nunca se bloquea el bucle;
+- el hilo escritor agrupa lo recibido durante `commit_interval_ms` (o hasta
+  `max_batch` filas) y lo escribe con un `executemany` por tabla dentro de
+  una sola transacción (group commit);
+- la base se abre en modo WAL con synchronous=NORMAL;
+- si el hilo escritor falla, el error queda en `error` (y en
+  `stats["errors"]`), las filas del lote en curso se cuentan en
+  `stats["lost"]` y `submit`, `alert` y `stop` lanzan SinkError hasta que
+  se llame a `restart()`, que arranca otro hilo con lo que siga en cola.
+
+Qué se escribe:
+- TemperatureSimulator -> registro_temperaturas (el sensor se registra en
+  sensores_temperatura con su sensor_id como descripción la primera vez);
+- StockSimulator -> ingresos_stock cuando hay reposición;
+- `alert()` -> alertas (las emite AlertEngine, ver alert_engine.py).
+
+Uso rápido (benchmark): python sqlite_sink.py --readings 200000
+"""
+import argparse
+import logging
+import queue
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from esquema_tienda import STORE_DB, connect
+
+COMMIT_INTERVAL_MS = 50
+MAX_BATCH = 20_000
+QUEUE_SIZE = 200_000
+
+INSERTS = {
+    "registro_temperaturas": "INSERT INTO registro_temperaturas (sensor_id, temperatura, fecha_hora) "
+                             "VALUES (?, ?, ?)",
+    "ingresos_stock": "INSERT INTO ingresos_stock (producto_id, proveedor_id, cantidad, fecha_ingreso) "
+                      "VALUES (?, ?, ?, ?)",
+    "alertas": "INSERT INTO alertas (tipo, descripcion, nivel, fecha_hora, sensores_id, neveras_id) "
+               "VALUES (?, ?, ?, ?, ?, ?)",
+}
+
+_STOP = object()
+
+
+class SinkError(RuntimeError):
+    """El hilo escritor de SQLiteSink se detuvo por un error."""
+
+
+class SQLiteSink:
+    def __init__(self, db_path: str = STORE_DB,
+                 commit_interval_ms: float = COMMIT_INTERVAL_MS,
+                 max_batch: int = MAX_BATCH, queue_size: int = QUEUE_SIZE,
+                 products: Optional[Dict[str, int]] = None):
+        self.db_path = db_path
+        self.commit_interval = commit_interval_ms / 1000
+        self.max_batch = max_batch
+        # product_id del simulador ("PROD001") -> productos.id
+        self.products = dict(products or {})
+        self.stats = {"queued": 0, "dropped": 0, "written": 0, "commits": 0, "skipped": 0,
+                      "lost": 0, "errors": 0}
+        self.error: Optional[BaseException] = None
+        self.logger = logging.getLogger("SQLiteSink")
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._sensor_rows: Dict[str, int] = {}
+        self._product_rows: Dict[str, Optional[int]] = {}
+
+    # --- API usada desde el bucle de los simuladores ---
+
+    def submit(self, sensor_id: str, sensor_type: str, data: Dict[str, Any],
+               timestamp: Optional[datetime] = None):
+        """Encola una lectura sin bloquear."""
+        self._put(("reading", sensor_id, sensor_type, data, timestamp or datetime.now()))
+
+    def alert(self, tipo: str, descripcion: str, nivel: str,
+              timestamp: Optional[datetime] = None, sensor_id: Optional[str] = None,
+              nevera_id: Optional[int] = None):
+        """Encola una fila de alertas; `sensor_id` es el identificador del simulador."""
+        self._put(("alert", tipo, descripcion, nivel, timestamp or datetime.now(),
+                   sensor_id, nevera_id))
+
+    def _put(self, item):
+        self._raise_error()
+        try:
+            self._queue.put_nowait(item)
+            self.stats["queued"] += 1
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    # --- Ciclo de vida ---
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="SQLiteSink", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Escribe lo pendiente y detiene el hilo; SinkError si el hilo había fallado."""
+        if self._thread is not None:
+            if self._thread.is_alive():
+                self._queue.put(_STOP)
+                self._thread.join(timeout)
+            self._thread = None
+        self._raise_error()
+
+    def restart(self):
+        """Arranca un hilo escritor nuevo tras un fallo; lo encolado se conserva."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = None
+        self.error = None
+        self.start()
+
+    def _raise_error(self):
+        if self.error is not None:
+            raise SinkError(f"El hilo escritor de SQLite falló: {self.error}") from self.error
+
+    # --- Hilo escritor ---
+
+    def _run(self):
+        conn = None
+        pending: Dict[str, List[tuple]] = {table: [] for table in INSERTS}
+        count = 0
+        deadline = time.monotonic() + self.commit_interval
+        stopping = False
+        try:
+            conn = connect(self.db_path)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            while not stopping:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    item = None
+                # Vacía lo que ya esté en cola sin esperar más
+                while item is not None:
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    count += self._route(conn, item, pending)
+                    if count >= self.max_batch:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        item = None
+                if stopping or count >= self.max_batch or time.monotonic() >= deadline:
+                    if count:
+                        self._commit(conn, pending)
+                        count = 0
+                    deadline = time.monotonic() + self.commit_interval
+        except Exception as e:
+            self.logger.error(f"Error en el hilo escritor: {e}")
+            self.stats["lost"] += sum(len(rows) for rows in pending.values())
+            self.stats["errors"] += 1
+            self.error = e
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, pending: Dict[str, List[tuple]]):
+        with conn:
+            for table, rows in pending.items():
+                if rows:
+                    conn.executemany(INSERTS[table], rows)
+        # Sólo tras el commit: si falla, el lote entero cuenta en "lost"
+        for rows in pending.values():
+            self.stats["written"] += len(rows)
+            rows.clear()
+        self.stats["commits"] += 1
+
+    def _route(self, conn: sqlite3.Connection, item: tuple, pending: Dict[str, List[tuple]]) -> int:
+        if item[0] == "alert":
+            _, tipo, descripcion, nivel, timestamp, sensor_id, nevera_id = item
+            # alertas.sensores_id sólo admite sensores de temperatura ya registrados
+            sensor_row = self._sensor_row(conn, sensor_id, create=False) if sensor_id else None
+            pending["alertas"].append((tipo, descripcion, nivel,
+                                       timestamp.strftime("%Y-%m-%d %H:%M"), sensor_row, nevera_id))
+            return 1
+
+        _, sensor_id, sensor_type, data, timestamp = item
+        if sensor_type == "TemperatureSimulator":
+            pending["registro_temperaturas"].append(
+                (self._sensor_row(conn, sensor_id), data["temperature"], int(timestamp.timestamp()))
+            )
+            return 1
+        if sensor_type == "StockSimulator" and data.get("restock_amount"):
+            product_row = self._product_row(conn, data["product_id"])
+            if product_row is None:
+                self.stats["skipped"] += 1
+                return 0
+            pending["ingresos_stock"].append(
+                (product_row, None, data["restock_amount"], timestamp.strftime("%Y-%m-%d"))
+            )
+            return 1
+        return 0
+
+    def _sensor_row(self, conn: sqlite3.Connection, sensor_id: str,
+                    create: bool = True) -> Optional[int]:
+        """Fila de sensores_temperatura para el simulador, creándola si falta."""
+        row_id = self._sensor_rows.get(sensor_id)
+        if row_id is None:
+            row = conn.execute("SELECT id FROM sensores_temperatura WHERE descripcion = ?",
+                               (sensor_id,)).fetchone()
+            if row is None and not create:
+                return None
+            if row is None:
+                with conn:
+                    row_id = conn.execute(
+                        "INSERT INTO sensores_temperatura (nevera_id, descripcion) VALUES (NULL, ?)",
+                        (sensor_id,)
+                    ).lastrowid
+            else:
+                row_id = row[0]
+            self._sensor_rows[sensor_id] = row_id
+        return row_id
+
+    def _product_row(self, conn: sqlite3.Connection, product_id: str) -> Optional[int]:
+        """productos.id del simulador: mapeo explícito o los dígitos de "PROD001"."""
+        if product_id in self._product_rows:
+            return self._product_rows[product_id]
+        row_id = self.products.get(product_id)
+        if row_id is None:
+            digits = re.search(r"(\d+)$", product_id)
+            if digits and conn.execute("SELECT 1 FROM productos WHERE id = ?",
+                                       (int(digits.group(1)),)).fetchone():
+                row_id = int(digits.group(1))
+            else:
+                self.logger.warning(f"Producto {product_id} sin fila en productos; "
+                                    f"sus reposiciones no se guardan")
+        self._product_rows[product_id] = row_id
+        return row_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de SQLiteSink")
+    parser.add_argument("--db", default="/tmp/sqlite_sink_bench.db")
+    parser.add_argument("--readings", type=int, default=200_000)
+    parser.add_argument("--sensors", type=int, default=100)
+    parser.add_argument("--commit-ms", type=float, default=COMMIT_INTERVAL_MS)
+    args = parser.parse_args()
+
+    sink = SQLiteSink(args.db, commit_interval_ms=args.commit_ms)
+    sink.start()
+    now = datetime.now()
+    started = time.perf_counter()
+    for i in range(args.readings):
+        sink.submit(f"TEMP{i % args.sensors:05d}", "TemperatureSimulator",
+                    {"temperature": 4.0 + (i % 7) * 0.1}, now)
+    submitted = time.perf_counter() - started
+    sink.stop()
+    elapsed = time.perf_counter() - started
+    print(f"encolado: {args.readings / submitted:,.0f} lecturas/s; "
+          f"escrito: {sink.stats['written'] / elapsed:,.0f} filas/s "
+          f"({sink.stats['commits']} commits, {sink.stats['dropped']} descartadas)")
+
+
+if __name__ == "__main__":
+    main()
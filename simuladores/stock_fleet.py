@@ -0,0 +1,206 @@
+"""Motor vectorizado de inventario para flotas de productos.
+
+StockSimulator simula un producto con un `random.random()` por tick y dos
+probabilidades fijas (hora pico / valle). `StockFleet` simula miles de
+SKUs a la vez con arrays:
+
+- stock, umbrales, reposiciones en curso y su instante de inicio viven en
+  arrays de numpy;
+- la demanda sale de una tabla precalculada `demand[hora, sku]` con las
+  unidades medias por tick. Al crear la flota se convierte en tablas de
+  distribución acumulada (Poisson, o binomial acotada a `max_units`) por
+  hora, unidades y SKU; cada tick muestrea todas las ventas de una vez por
+  inversión: un uniforme por SKU comparado con la fila de su hora;
+- las reposiciones se procesan con máscaras, igual que
+  StockSimulator._check_restock / _process_restock.
+
+PROFILES contiene curvas horarias; LEGACY reproduce la media del
+StockSimulator original (30 % x 2 unidades en horas pico, 10 % x 2 fuera).
+`demand_table` combina perfiles y popularidad por SKU.
+
+Uso rápido (benchmark): python stock_fleet.py --skus 10000 --ticks 5000
+"""
+import argparse
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+PEAK_HOURS = [10, 11, 12, 13, 14, 17, 18, 19, 20]
+
+# Unidades medias por tick y hora (24 valores)
+LEGACY = np.array([0.6 if hour in PEAK_HOURS else 0.2 for hour in range(24)])
+PROFILES = {
+    "legacy": LEGACY,
+    # Panadería, desayuno: pico de 7 a 10
+    "morning": np.array([0.02] * 6 + [0.4, 0.9, 0.9, 0.6] + [0.3] * 6 + [0.2] * 4 + [0.05] * 4),
+    # Bebidas y preparados: pico de 18 a 21
+    "evening": np.array([0.02] * 8 + [0.15] * 4 + [0.3] * 6 + [0.9, 0.9, 0.7, 0.4] + [0.05] * 2),
+    "flat": np.full(24, 0.25),
+}
+
+RESTOCK_DURATION = 2 * 3600.0  # segundos, como StockSimulator.restock_duration
+TAIL = 1e-7  # masa de Poisson que se recorta al construir las tablas (float32)
+
+
+def demand_table(profile_of: Sequence[int], popularity: Optional[Sequence[float]] = None,
+                 profiles: Sequence[np.ndarray] = tuple(PROFILES.values())) -> np.ndarray:
+    """Tabla (24, skus) de unidades medias por tick: perfil del SKU x popularidad."""
+    curves = np.stack([np.asarray(p, dtype=np.float64) for p in profiles])  # (perfiles, 24)
+    table = curves[np.asarray(profile_of, dtype=np.intp)].T                   # (24, skus)
+    if popularity is not None:
+        table = table * np.asarray(popularity, dtype=np.float64)
+    return np.ascontiguousarray(table)
+
+
+def sales_cdf(demand: np.ndarray, sampling: str = "poisson", max_units: int = 3) -> np.ndarray:
+    """Tablas (24, unidades, skus) con P(ventas <= k) para cada hora y SKU."""
+    if sampling == "poisson":
+        lam = np.asarray(demand, dtype=np.float64)
+        cdf = np.exp(-lam)
+        levels = [cdf]
+        # Soporte acotado a λ + 10·√λ + 10: exp(-λ) es 0 en float64 para
+        # λ ≳ 745 y la CDF nunca llegaría a 1 - TAIL
+        peak = float(lam.max()) if lam.size else 0.0
+        max_k = math.ceil(peak + 10 * math.sqrt(peak) + 10)
+        with np.errstate(divide="ignore"):
+            log_lam = np.log(lam)
+        k = 0
+        # Hasta que la cola que queda fuera sea despreciable para el SKU más vendido
+        while k < max_k and (1.0 - cdf).max() > TAIL:
+            k += 1
+            # En logaritmos: el producto pmf * λ / k se queda en 0 si exp(-λ) ya lo era
+            cdf = cdf + np.exp(k * log_lam - lam - math.lgamma(k + 1))
+            levels.append(cdf)
+    elif sampling == "binomial":
+        # Probabilidad por unidad; la media por tick se conserva hasta max_units
+        p = np.clip(demand / max_units, 0.0, 1.0)
+        pmf = (1.0 - p) ** max_units
+        cdf = pmf.copy()
+        levels = [cdf]
+        for k in range(1, max_units):
+            with np.errstate(divide="ignore", invalid="ignore"):
+                pmf = np.where(p < 1.0, pmf * (max_units - k + 1) / k * p / (1.0 - p), 0.0)
+            cdf = cdf + pmf
+            levels.append(cdf)
+    else:
+        raise ValueError(f"Muestreo desconocido: {sampling}")
+    return np.stack(levels, axis=1).astype(np.float32)
+
+
+class StockFleet:
+    def __init__(self, max_stock, current_stock=None, restock_threshold=None,
+                 restock_duration: float = RESTOCK_DURATION,
+                 demand: Optional[np.ndarray] = None,
+                 sampling: str = "poisson", max_units: int = 3,
+                 seed: Optional[int] = None):
+        self.max_stock = np.asarray(max_stock, dtype=np.int64)
+        n = len(self.max_stock)
+        self.stock = (self.max_stock // 2 if current_stock is None
+                      else np.asarray(current_stock, dtype=np.int64).copy())
+        self.restock_threshold = (self.max_stock // 5 if restock_threshold is None
+                                  else np.broadcast_to(np.asarray(restock_threshold, dtype=np.int64), (n,)).copy())
+        self.restock_duration = restock_duration
+        self.demand = (np.repeat(LEGACY[:, None], n, axis=1) if demand is None
+                       else np.asarray(demand, dtype=np.float64))
+        if self.demand.shape != (24, n):
+            raise ValueError(f"La tabla de demanda debe ser (24, {n}), no {self.demand.shape}")
+        self.sampling = sampling
+        self.max_units = max_units
+        self._cdf = sales_cdf(self.demand, sampling, max_units)
+        # Contar escalones en uint8 es bastante más rápido que en int64
+        self._count_dtype = np.uint8 if self._cdf.shape[1] < 256 else np.int64
+        self.is_restocking = np.zeros(n, dtype=bool)
+        # Fin de la reposición en curso (inf si no hay ninguna)
+        self.restock_due = np.full(n, np.inf)
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return len(self.max_stock)
+
+    def step(self, now: datetime) -> Dict[str, np.ndarray]:
+        """Un tick para todos los SKUs en el instante `now`.
+
+        Devuelve arrays por SKU: sales (vendidas de verdad, nunca más que el
+        stock), needs_restock (la reposición empieza en este tick) y
+        restock_amount (unidades repuestas al terminar una reposición).
+        """
+        # Inversión de la distribución: unidades = nº de escalones de la CDF superados
+        u = self.rng.random(len(self), dtype=np.float32)
+        steps = u > self._cdf[now.hour]
+        wanted = steps.view(np.uint8).sum(axis=0, dtype=self._count_dtype)
+        sales = np.minimum(wanted, self.stock)
+        self.stock -= sales
+
+        t = now.timestamp()
+        needs_restock = self.stock <= self.restock_threshold
+        needs_restock &= ~self.is_restocking
+        self.is_restocking |= needs_restock
+        self.restock_due[needs_restock] = t + self.restock_duration
+
+        done = self.restock_due <= t
+        restock_amount = (self.max_stock - self.stock) * done
+        np.copyto(self.stock, self.max_stock, where=done)
+        self.is_restocking &= ~done
+        self.restock_due[done] = np.inf
+        return {"sales": sales, "needs_restock": needs_restock, "restock_amount": restock_amount}
+
+    def readings(self, result: Dict[str, np.ndarray], product_ids: Sequence[str],
+                 only_active: bool = True) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Lecturas con el formato de StockSimulator.generate_data.
+
+        Con only_active sólo salen los SKUs con ventas, reposición o aviso
+        en este tick; el resto no cambió.
+        """
+        sales, needs, amount = result["sales"], result["needs_restock"], result["restock_amount"]
+        if only_active:
+            indices = np.flatnonzero((sales > 0) | needs | (amount > 0))
+        else:
+            indices = range(len(self))
+        level = self.stock * (100.0 / self.max_stock)
+        for i in indices:
+            yield int(i), {
+                "product_id": product_ids[i],
+                "current_stock": int(self.stock[i]),
+                "stock_level": round(float(level[i]), 2),
+                "status": "restocking" if self.is_restocking[i] else "normal",
+                "sales": int(sales[i]),
+                "restock_amount": int(amount[i]),
+                "needs_restock": bool(needs[i]),
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de StockFleet")
+    parser.add_argument("--skus", type=int, default=10_000)
+    parser.add_argument("--ticks", type=int, default=5000)
+    parser.add_argument("--tick-seconds", type=float, default=60.0)
+    parser.add_argument("--sampling", choices=("poisson", "binomial"), default="poisson")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    max_stock = rng.integers(50, 201, args.skus)
+    demand = demand_table(rng.integers(0, len(PROFILES), args.skus),
+                          rng.lognormal(0.0, 0.5, args.skus))
+    fleet = StockFleet(max_stock, current_stock=max_stock, demand=demand,
+                       sampling=args.sampling, seed=args.seed)
+    now = datetime(2026, 1, 1)
+    tick = timedelta(seconds=args.tick_seconds)
+    sold = restocks = 0
+    started = time.perf_counter()
+    for _ in range(args.ticks):
+        result = fleet.step(now)
+        sold += int(result["sales"].sum())
+        restocks += int(result["needs_restock"].sum())
+        now += tick
+    elapsed = time.perf_counter() - started
+    print(f"{args.ticks / elapsed:,.0f} ticks/s con {args.skus} SKUs "
+          f"({args.ticks * args.skus / elapsed:,.0f} SKU-ticks/s); "
+          f"{sold:,} unidades vendidas, {restocks:,} reposiciones")
+
+
+if __name__ == "__main__":
+    main()
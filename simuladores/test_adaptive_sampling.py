@@ -0,0 +1,93 @@
+"""Pruebas de AdaptiveSampler: límites del intervalo, banda muerta y envíos urgentes.
+
+Ejecutar: python -m pytest test_adaptive_sampling.py
+"""
+import random
+import unittest
+
+from adaptive_sampling import AdaptiveSampler, Policy, field_value
+
+TEMP = "TemperatureSimulator"
+
+
+def reading(value, status="normal", door_open=False):
+    return {"temperature": value, "status": status, "door_open": door_open}
+
+
+class AdaptiveSamplerTest(unittest.TestCase):
+    def emit_times(self, sampler, values, step=0.5, sensor_id="TEMP001"):
+        return [i * step for i, value in enumerate(values)
+                if sampler.should_emit(sensor_id, TEMP, reading(value), i * step)]
+
+    def test_stable_value_backs_off_up_to_max_interval(self):
+        sampler = AdaptiveSampler()
+        times = self.emit_times(sampler, [5.0] * 400, step=0.5)
+        # Latidos a 1, 2, 4, 8, 16 y luego cada 30 s
+        self.assertEqual(times[:7], [0.0, 1.0, 3.0, 7.0, 15.0, 31.0, 61.0])
+        gaps = [b - a for a, b in zip(times, times[1:])]
+        self.assertTrue(all(1.0 <= gap <= 30.0 for gap in gaps))
+        self.assertEqual(sampler.interval("TEMP001"), 30.0)
+
+    def test_interval_always_within_bounds(self):
+        sampler = AdaptiveSampler()
+        rnd = random.Random(5)
+        value, last_emit = 5.0, None
+        for i in range(5000):
+            now = i * 0.25
+            value += rnd.choice([0.0, 0.0, 0.0, rnd.uniform(-1, 1)])
+            value = min(max(value, 3.0), 7.0)
+            if sampler.should_emit("TEMP001", TEMP, reading(value), now):
+                if last_emit is not None:
+                    self.assertGreaterEqual(now - last_emit, 1.0)
+                    self.assertLessEqual(now - last_emit, 30.0)
+                last_emit = now
+            self.assertGreaterEqual(sampler.interval("TEMP001"), 1.0)
+            self.assertLessEqual(sampler.interval("TEMP001"), 30.0)
+
+    def test_change_resets_interval_but_respects_min_interval(self):
+        sampler = AdaptiveSampler()
+        self.emit_times(sampler, [5.0] * 100)
+        self.assertEqual(sampler.interval("TEMP001"), 30.0)
+        self.assertTrue(sampler.should_emit("TEMP001", TEMP, reading(6.0), 100.0))
+        self.assertEqual(sampler.interval("TEMP001"), 1.0)
+        # Otro cambio a los 0.5 s espera a min_interval
+        self.assertFalse(sampler.should_emit("TEMP001", TEMP, reading(7.0), 100.5))
+        self.assertTrue(sampler.should_emit("TEMP001", TEMP, reading(7.0), 101.0))
+
+    def test_deadband(self):
+        sampler = AdaptiveSampler()
+        self.assertTrue(sampler.should_emit("TEMP001", TEMP, reading(5.0), 0.0))
+        self.assertTrue(sampler.should_emit("TEMP001", TEMP, reading(5.0), 1.0))  # latido
+        # Dentro de la banda: espera al siguiente latido (2 s)
+        self.assertFalse(sampler.should_emit("TEMP001", TEMP, reading(5.4), 2.5))
+        self.assertTrue(sampler.should_emit("TEMP001", TEMP, reading(5.6), 2.6))
+
+    def test_triggers_and_thresholds_are_sent_at_once(self):
+        sampler = AdaptiveSampler()
+        sampler.should_emit("TEMP001", TEMP, reading(7.9), 0.0)
+        self.assertTrue(sampler.should_emit("TEMP001", TEMP, reading(8.1), 0.1))  # cruza 8.0
+        self.assertTrue(sampler.should_emit("TEMP001", TEMP, reading(8.1, door_open=True), 0.2))
+        self.assertTrue(sampler.should_emit("TEMP001", TEMP, reading(8.1, "warning", True), 0.3))
+        self.assertEqual(sampler.stats["urgent"], 3)
+
+    def test_policies(self):
+        sampler = AdaptiveSampler({"TemperatureSimulator": {"fields": ("temperature",),
+                                                            "deadband": 0.1,
+                                                            "min_interval": 5,
+                                                            "max_interval": 2}})
+        self.assertEqual(sampler.policies[TEMP].max_interval, 5)
+        # Tipo sin política: se envía cada segundo
+        times = [t for t in range(5) if sampler.should_emit("X", "Otro", {"v": 1}, float(t))]
+        self.assertEqual(times, [0, 1, 2, 3, 4])
+        self.assertEqual(Policy(min_interval=3, max_interval=1).max_interval, 3)
+
+    def test_field_value(self):
+        data = {"position": {"x": 1.5}, "status": "normal", "flag": True}
+        self.assertEqual(field_value(data, "position.x"), 1.5)
+        self.assertIsNone(field_value(data, "position.y"))
+        self.assertIsNone(field_value(data, "status.x"))
+        self.assertIsNone(field_value(data, "status"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+"""Pruebas de AlertEngine: duración, histéresis, cooldown e índice de reglas.
+
+Ejecutar: python -m pytest test_alert_engine.py
+"""
+import unittest
+
+from alert_engine import PRUNE_MIN, AlertEngine, Rule
+
+CALIENTE = {"name": "nevera_caliente", "sensor_type": "TemperatureSimulator",
+            "field": "temperature", "op": ">", "threshold": 8.0,
+            "clear_threshold": 7.5, "duration": 300, "tipo": "temperatura"}
+
+
+class FakeSink:
+    def __init__(self):
+        self.rows = []
+
+    def alert(self, tipo, descripcion, nivel, timestamp=None, sensor_id=None):
+        self.rows.append((tipo, nivel, sensor_id))
+
+
+class AlertEngineTest(unittest.TestCase):
+    def feed(self, engine, values, start=0.0, step=60.0, sensor_id="TEMP001"):
+        """Una lectura cada `step` segundos; devuelve los instantes que dispararon."""
+        fired = []
+        for i, value in enumerate(values):
+            ts = start + i * step
+            if engine.evaluate(sensor_id, "TemperatureSimulator", {"temperature": value}, ts):
+                fired.append(ts)
+        return fired
+
+    def test_fires_after_duration(self):
+        engine = AlertEngine([CALIENTE])
+        # Por encima desde t=0: dispara en t=300, no antes ni después
+        self.assertEqual(self.feed(engine, [9.0] * 10), [300.0])
+        self.assertEqual(engine.active(), [("nevera_caliente", "TEMP001")])
+
+    def test_broken_condition_restarts_duration(self):
+        engine = AlertEngine([CALIENTE])
+        # Baja en t=240, vuelve en t=300: la cuenta empieza de nuevo
+        self.assertEqual(self.feed(engine, [9.0] * 4 + [7.0] + [9.0] * 6), [600.0])
+
+    def test_hysteresis(self):
+        engine = AlertEngine([dict(CALIENTE, duration=0)])
+        # 7.8 no cruza clear_threshold: sigue activa y no vuelve a disparar
+        self.assertEqual(self.feed(engine, [9.0, 7.8, 9.0, 7.8]), [0.0])
+        # 7.4 la rearma: la siguiente subida dispara otra vez
+        self.assertEqual(self.feed(engine, [7.4, 9.0], start=1000.0), [1060.0])
+        self.assertEqual(engine.stats["emitted"], 2)
+
+    def test_cooldown_suppresses_repeats(self):
+        engine = AlertEngine([dict(CALIENTE, duration=0, cooldown=600)])
+        self.assertEqual(self.feed(engine, [9.0, 7.0, 9.0, 7.0, 9.0]), [0.0])
+        self.assertEqual(engine.stats["suppressed"], 2)
+        self.assertEqual(self.feed(engine, [7.0, 9.0], start=600.0), [660.0])
+
+    def test_last_emitted_forgotten_after_cooldown_and_clear(self):
+        engine = AlertEngine([dict(CALIENTE, duration=0, cooldown=600)])
+        self.feed(engine, [9.0])
+        # Despejada dentro del cooldown: se recuerda para seguir suprimiendo
+        self.feed(engine, [7.0], start=60.0)
+        self.assertEqual(len(engine._last_emitted), 1)
+        # Sigue en alerta pasado el cooldown: también se recuerda
+        self.feed(engine, [9.0, 9.0], start=120.0, step=600.0)
+        self.assertEqual(len(engine._last_emitted), 1)
+        self.feed(engine, [7.0], start=1500.0)
+        self.assertEqual(engine._last_emitted, {})
+        self.assertEqual(engine.active(), [])
+
+    def test_last_emitted_pruned_for_sensors_cleared_in_cooldown(self):
+        engine = AlertEngine([dict(CALIENTE, duration=0, cooldown=600)])
+        sensors = PRUNE_MIN * 3
+        for i in range(sensors):
+            # Cada sensor dispara y se despeja antes de su cooldown
+            self.feed(engine, [9.0, 7.0], start=float(i), sensor_id=f"TEMP{i:05d}")
+        self.assertEqual(engine.stats["emitted"], sensors)
+        self.assertLessEqual(len(engine._last_emitted), 2 * PRUNE_MIN + 1)
+        # Los que siguen dentro del cooldown no se olvidan
+        self.assertEqual(self.feed(engine, [9.0], start=float(sensors),
+                                   sensor_id=f"TEMP{sensors - 1:05d}"), [])
+
+    def test_state_is_per_sensor(self):
+        engine = AlertEngine([dict(CALIENTE, duration=0)])
+        self.assertEqual(self.feed(engine, [9.0], sensor_id="TEMP001"), [0.0])
+        self.assertEqual(self.feed(engine, [9.0], sensor_id="TEMP002"), [0.0])
+        self.assertEqual(len(engine.active()), 2)
+
+    def test_rules_for_filters_by_id_and_type(self):
+        engine = AlertEngine([
+            CALIENTE,
+            {"name": "solo_temp002", "field": "temperature", "op": ">", "threshold": 0,
+             "sensor_ids": ["TEMP002"]},
+            {"name": "generica", "field": "battery", "op": "<", "threshold": 10},
+            {"name": "humedad", "sensor_type": "HumiditySimulator", "field": "humidity",
+             "op": ">", "threshold": 70},
+        ])
+        names = lambda sid, kind: [r.name for r in engine.rules_for(sid, kind)]
+        self.assertEqual(names("TEMP001", "TemperatureSimulator"), ["nevera_caliente", "generica"])
+        self.assertEqual(names("TEMP002", "TemperatureSimulator"),
+                         ["solo_temp002", "nevera_caliente", "generica"])
+        self.assertEqual(names("HUM001", "HumiditySimulator"), ["humedad", "generica"])
+
+    def test_operators_and_missing_fields(self):
+        engine = AlertEngine([{"name": "humedad", "sensor_type": "HumiditySimulator",
+                               "field": "status", "op": "in", "threshold": ["low", "high"]}])
+        self.assertEqual(engine.evaluate("HUM001", "HumiditySimulator", {"status": "normal"}, 0), [])
+        self.assertEqual(engine.evaluate("HUM001", "HumiditySimulator", {}, 1), [])
+        alerts = engine.evaluate("HUM001", "HumiditySimulator", {"status": "high"}, 2)
+        self.assertEqual([a.value for a in alerts], ["high"])
+        with self.assertRaises(ValueError):
+            Rule(0, "x", "f", "~", 1)
+
+    def test_alerts_reach_sink_and_callback(self):
+        sink, seen = FakeSink(), []
+        engine = AlertEngine([dict(CALIENTE, duration=0)], sink=sink, on_alert=seen.append)
+        self.feed(engine, [9.0])
+        self.assertEqual(sink.rows, [("temperatura", "media", "TEMP001")])
+        self.assertEqual([a.to_dict()["rule"] for a in seen], ["nevera_caliente"])
+
+    def test_callback_runs_even_if_sink_fails(self):
+        class BrokenSink:
+            def alert(self, *args, **kwargs):
+                raise RuntimeError("sin disco")
+
+        seen = []
+        engine = AlertEngine([dict(CALIENTE, duration=0)], sink=BrokenSink(), on_alert=seen.append)
+        with self.assertRaises(RuntimeError):
+            self.feed(engine, [9.0])
+        self.assertEqual(len(seen), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""Pruebas de fridge_thermal.py frente a la solución exponencial analítica.
+
+Ejecutar: python -m pytest test_fridge_thermal.py
+"""
+import asyncio
+import math
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import numpy as np
+
+from fridge_thermal import FridgeFleet
+from simulador_temperatura import TemperatureSimulator
+from simulator_manager import SimulatorManager
+
+START = datetime(2024, 1, 1, 12)
+
+
+def quiet_fleet(n=1, **kwargs):
+    """Flota sin aperturas aleatorias ni ruido."""
+    return FridgeFleet(n, door_rate=0.0, noise_level=0.0, seed=1, **kwargs)
+
+
+class FridgeFleetTest(unittest.TestCase):
+    def test_warming_without_compressor(self):
+        fleet = quiet_fleet(3, tau_closed=[3600.0, 7200.0, 14400.0])
+        fleet.fail_compressor(slice(None))
+        t0 = fleet.temperature.copy()
+        fleet.step(5400.0)
+        expected = 22.0 + (t0 - 22.0) * np.exp(-5400.0 / np.array([3600.0, 7200.0, 14400.0]))
+        np.testing.assert_allclose(fleet.temperature, expected, rtol=1e-12)
+
+    def test_cooling_towards_equilibrium(self):
+        # Setpoint muy bajo: el compresor no llega a apagarse
+        fleet = quiet_fleet(setpoint=-50.0)
+        fleet.temperature[:] = 10.0
+        fleet.compressor_on[:] = True
+        k_leak, k_cool = 1 / (4 * 3600.0), 1 / 1800.0
+        k = k_leak + k_cool
+        equilibrium = (k_leak * 22.0 + k_cool * -10.0) / k
+        elapsed = 0
+        for minutes in (10, 60, 240):
+            fleet.step((minutes - elapsed) * 60.0)
+            elapsed = minutes
+            expected = equilibrium + (10.0 - equilibrium) * math.exp(-k * minutes * 60.0)
+            self.assertAlmostEqual(float(fleet.temperature[0]), expected, places=9)
+
+    def test_open_door_uses_tau_open(self):
+        fleet = quiet_fleet(tau_open=600.0)
+        fleet.fail_compressor(0)
+        fleet.temperature[:] = 4.0
+        fleet.open_door([0], duration=300.0)
+        fleet.step(300.0)
+        self.assertAlmostEqual(float(fleet.temperature[0]), 22.0 - 18.0 * math.exp(-0.5), places=9)
+        self.assertFalse(fleet.door_open[0])
+        self.assertEqual(int(fleet.door_openings[0]), 1)
+
+    def test_long_steps_match_short_ones(self):
+        coarse, fine = quiet_fleet(), quiet_fleet()
+        for fleet in (coarse, fine):
+            fleet.fail_compressor(0)
+        coarse.step(3600.0)
+        for _ in range(360):
+            fine.step(10.0)
+        self.assertAlmostEqual(float(coarse.temperature[0]), float(fine.temperature[0]), places=9)
+
+    def test_thermostat_hysteresis(self):
+        fleet = quiet_fleet(100)
+        for _ in range(24 * 60):
+            fleet.step(60.0)
+            self.assertTrue((fleet.temperature < 4.0 + 1.0 + 0.1).all())
+            self.assertTrue((fleet.temperature > 4.0 - 1.0 - 0.1).all())
+        self.assertTrue(0.0 < fleet.compressor_on.mean() < 1.0)
+
+    def test_advance_uses_the_elapsed_time(self):
+        fleet = quiet_fleet()
+        with mock.patch.object(fleet, "step") as step:
+            fleet.advance(START)
+            fleet.advance(START)
+            fleet.advance(START + timedelta(seconds=90))
+            fleet.advance(START + timedelta(seconds=30))  # hacia atrás: se ignora
+        self.assertEqual([c.args[0] for c in step.call_args_list], [90.0])
+
+    def test_manager_advances_the_fleet_once_per_tick(self):
+        fleet = quiet_fleet(4)
+        manager = SimulatorManager(None)
+        manager.add_model(fleet)
+        clock = iter(START + timedelta(seconds=60 * i) for i in range(10))
+        manager.clock = lambda: next(clock)
+        for i in range(4):
+            manager.add_simulator(TemperatureSimulator(f"TEMP{i:03d}", "Neveras",
+                                                       thermal=fleet, fridge_index=i))
+        with mock.patch.object(fleet, "step", wraps=fleet.step) as step:
+            for _ in range(3):
+                asyncio.run(manager.tick())
+        self.assertEqual([c.args[0] for c in step.call_args_list], [60.0, 60.0])
+        for i in range(4):
+            reading = manager.last_readings[f"TEMP{i:03d}"]["data"]
+            self.assertEqual(reading["temperature"], round(float(fleet.temperature[i]), 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
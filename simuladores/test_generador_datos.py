@@ -0,0 +1,140 @@
+"""Pruebas de generador_datos.py y esquema_tienda.py sobre una base temporal.
+
+Ejecutar: python -m pytest test_generador_datos.py
+"""
+import os
+import random
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from esquema_tienda import connect, create_schema
+from generador_datos import (BulkWriter, ensure_catalog, generate_sales,
+                             generate_temperatures)
+
+START = datetime(2026, 3, 2)
+TABLES = ["usuarios", "categorias", "proveedores", "productos", "ingresos_stock", "ventas",
+          "detalle_venta", "neveras", "sensores_temperatura", "registro_temperaturas", "alertas"]
+
+
+class StoreTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db = os.path.join(tmp.name, "tienda.db")
+        self.conn = connect(self.db)
+        self.addCleanup(self.conn.close)
+
+    def count(self, table):
+        return self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def generate(self, products=10, users=20, fridges=3, days=1.0, seed=1):
+        rng = random.Random(seed)
+        catalog = ensure_catalog(self.conn, products, users, fridges, rng)
+        writer = BulkWriter(self.conn, batch_size=100, commit_rows=1000)
+        end = START + timedelta(days=days)
+        generate_sales(writer, self.conn, catalog, START, end, timedelta(minutes=15), rng)
+        generate_temperatures(writer, catalog, START, end, timedelta(minutes=10), rng)
+        writer.close()
+        return catalog, writer
+
+
+class SchemaTest(StoreTestCase):
+    def test_create_schema_is_idempotent(self):
+        self.conn.execute("INSERT INTO categorias (nombre) VALUES ('Bebidas')")
+        self.conn.commit()
+        create_schema(self.conn)
+        create_schema(self.conn)
+        names = {row[0] for row in self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertTrue(set(TABLES) <= names)
+        self.assertEqual(self.count("categorias"), 1)
+
+    def test_connect_enforces_foreign_keys(self):
+        self.assertEqual(self.conn.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.conn.execute("INSERT INTO detalle_venta (venta_id, producto_id, cantidad, precio) "
+                              "VALUES (999, 999, 1, 1.0)")
+
+
+class GeneratorTest(StoreTestCase):
+    def test_foreign_keys_hold(self):
+        self.generate()
+        self.assertEqual(self.conn.execute("PRAGMA foreign_key_check").fetchall(), [])
+        orphans = self.conn.execute(
+            "SELECT COUNT(*) FROM ventas v WHERE NOT EXISTS "
+            "(SELECT 1 FROM detalle_venta d WHERE d.venta_id = v.id)").fetchone()[0]
+        self.assertEqual(orphans, 0)
+
+    def test_row_counts_follow_scale(self):
+        catalog, writer = self.generate(products=10, users=20, fridges=3, days=1)
+        self.assertEqual((self.count("productos"), self.count("usuarios"),
+                          self.count("neveras"), self.count("sensores_temperatura")),
+                         (10, 20, 3, 3))
+        # 3 sensores, una lectura cada 10 minutos durante un día
+        self.assertEqual(self.count("registro_temperaturas"), 3 * 144)
+        for table, count in writer.counts.items():
+            self.assertEqual(self.count(table), count, table)
+        self.assertGreater(writer.counts["ventas"], 0)
+
+        _, writer = self.generate(products=10, users=20, fridges=6, days=2, seed=2)
+        self.assertEqual(self.count("neveras"), 6)
+        self.assertEqual(writer.counts["registro_temperaturas"], 6 * 288)
+        self.assertEqual(self.count("registro_temperaturas"), 3 * 144 + 6 * 288)
+
+    def test_catalog_is_completed_not_duplicated(self):
+        rng = random.Random(0)
+        ensure_catalog(self.conn, 5, 5, 2, rng)
+        catalog = ensure_catalog(self.conn, 8, 5, 2, rng)
+        self.assertEqual(len(catalog["products"]), 8)
+        self.assertEqual(len(catalog["users"]), 5)
+        self.assertEqual(len(catalog["sensors"]), 2)
+        self.assertEqual(self.count("categorias"), 3)
+
+
+class BulkWriterTest(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        ensure_catalog(self.conn, 2, 2, 1, random.Random(0))
+        self.reader = sqlite3.connect(self.db)
+        self.addCleanup(self.reader.close)
+
+    def committed(self, table):
+        return self.reader.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def test_flushes_per_batch_and_commits_per_commit_rows(self):
+        writer = BulkWriter(self.conn, batch_size=4, commit_rows=10)
+        for n in range(3):
+            writer.add("registro_temperaturas", (1, 4.0, n))
+        self.assertEqual(writer.pending, 3)
+        self.assertEqual(self.count("registro_temperaturas"), 0)
+        writer.add("registro_temperaturas", (1, 4.0, 3))
+        # Lote escrito en la transacción, pero aún sin confirmar
+        self.assertEqual((writer.pending, writer.uncommitted), (0, 4))
+        self.assertEqual(self.count("registro_temperaturas"), 4)
+        self.assertEqual(self.committed("registro_temperaturas"), 0)
+        for n in range(4, 12):
+            writer.add("registro_temperaturas", (1, 4.0, n))
+        # Tres lotes (12 filas) superan commit_rows: se confirman
+        self.assertEqual(writer.uncommitted, 0)
+        self.assertEqual(self.committed("registro_temperaturas"), 12)
+        writer.add("registro_temperaturas", (1, 4.0, 12))
+        writer.close()
+        self.assertEqual(self.committed("registro_temperaturas"), 13)
+        self.assertEqual(writer.counts["registro_temperaturas"], 13)
+
+    def test_flush_writes_parents_first(self):
+        writer = BulkWriter(self.conn, batch_size=100)
+        product = self.conn.execute("SELECT id FROM productos").fetchone()[0]
+        user = self.conn.execute("SELECT id FROM usuarios").fetchone()[0]
+        # El detalle se añade antes que su venta; el orden de INSERTS lo corrige
+        writer.add("detalle_venta", (1, product, 2, 1.5))
+        writer.add("ventas", (1, user, 3.0, "2026-03-02"))
+        writer.close()
+        self.assertEqual(self.committed("detalle_venta"), 1)
+        self.assertEqual(self.conn.execute("PRAGMA foreign_key_check").fetchall(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
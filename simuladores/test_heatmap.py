@@ -0,0 +1,57 @@
+"""Pruebas de heatmap.py: binning, decaimiento y trama compacta.
+
+Ejecutar: python -m pytest test_heatmap.py
+"""
+import unittest
+
+import numpy as np
+
+from heatmap import HeatmapStage, decode_frame
+
+
+class HeatmapStageTest(unittest.TestCase):
+    def test_binning_matches_histogram2d(self):
+        stage = HeatmapStage(bins=(8, 5), half_life=0)
+        points = np.random.default_rng(4).uniform(-10, 10, (3000, 2))
+        stage.add_points(points[:1000])
+        for x, y in points[1000:]:
+            stage.update({"position": {"x": x, "y": y, "z": 0.0}})
+        stage.flush(0.0)
+        expected, _, _ = np.histogram2d(points[:, 0], points[:, 1], bins=(8, 5),
+                                        range=((-10, 10), (-10, 10)))
+        np.testing.assert_array_equal(stage.occupancy(), expected)
+
+    def test_points_off_the_floor_go_to_the_edge_cells(self):
+        stage = HeatmapStage(bins=(4, 4))
+        stage.add_points([(-50, -50), (10, 10), (50, 0)])
+        stage.flush(0.0)
+        grid = stage.occupancy()
+        self.assertEqual((grid[0, 0], grid[3, 3], grid[3, 2]), (1, 1, 1))
+
+    def test_half_life_decay(self):
+        stage = HeatmapStage(bins=(2, 2), half_life=10)
+        stage.add_points([(-5, -5)] * 8)
+        stage.flush(0.0)
+        stage.flush(10.0)
+        self.assertAlmostEqual(stage.occupancy()[0, 0], 4.0)
+        stage.add_points([(-5, -5)])
+        stage.flush(30.0)
+        self.assertAlmostEqual(stage.occupancy()[0, 0], 2.0)
+
+    def test_frame_round_trip(self):
+        stage = HeatmapStage(bins=(6, 6), half_life=0)
+        stage.add_points(np.random.default_rng(1).uniform(-10, 10, (500, 2)))
+        stage.flush(0.0)
+        frame = stage.frame()
+        self.assertEqual(frame["type"], "heatmap")
+        decoded = decode_frame(frame)
+        np.testing.assert_allclose(decoded, stage.occupancy(), atol=frame["max"] / 255)
+
+    def test_empty_frame(self):
+        frame = HeatmapStage(bins=(3, 3)).frame()
+        self.assertEqual(frame["max"], 0.0)
+        self.assertFalse(decode_frame(frame).any())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+"""Pruebas de priority_lanes.py: prioridad estricta de alertas y turno ponderado.
+
+Ejecutar: python -m pytest test_priority_lanes.py
+"""
+import asyncio
+import json
+import unittest
+
+from priority_lanes import LaneClassifier, PriorityOutbox
+
+
+class Done(Exception):
+    pass
+
+
+class FakeWebSocket:
+    """Guarda lo enviado; `on_send(n)` se llama tras cada envío y puede cortar con Done."""
+
+    def __init__(self, limit, on_send=None, fail_at=None):
+        self.sent = []
+        self.limit = limit
+        self.on_send = on_send
+        self.fail_at = fail_at
+
+    async def send(self, message):
+        if self.fail_at is not None and len(self.sent) == self.fail_at:
+            self.fail_at = None
+            raise ConnectionError("caída")
+        self.sent.append(json.loads(message))
+        if self.on_send is not None:
+            self.on_send(len(self.sent))
+        if len(self.sent) >= self.limit:
+            raise Done
+
+
+def drain(outbox, websocket, **kwargs):
+    async def run():
+        with_stop = asyncio.wait_for(outbox.drain(websocket, **kwargs), timeout=5)
+        try:
+            await with_stop
+        except Done:
+            pass
+    asyncio.run(run())
+
+
+class PriorityOutboxTest(unittest.TestCase):
+    def test_alerts_have_strict_priority(self):
+        outbox = PriorityOutbox()
+        for i in range(5):
+            outbox.put({"n": f"r{i}"}, "routine")
+            outbox.put({"n": f"s{i}"}, "state")
+        outbox.put({"n": "a0"}, "alert")
+
+        def late_alert(count):
+            if count == 3:
+                outbox.put({"n": "a1"}, "alert")
+                outbox.put({"n": "a2"}, "alert")
+
+        websocket = FakeWebSocket(limit=13, on_send=late_alert)
+        drain(outbox, websocket)
+        order = [frame["n"] for frame in websocket.sent]
+        self.assertEqual(order[0], "a0")
+        # Las alertas encoladas durante el envío salen justo después
+        self.assertEqual(order[3:5], ["a1", "a2"])
+        self.assertEqual(sorted(order), sorted(["a0", "a1", "a2"] + [f"r{i}" for i in range(5)]
+                                               + [f"s{i}" for i in range(5)]))
+
+    def test_weighted_round_robin(self):
+        outbox = PriorityOutbox()
+        for i in range(100):
+            outbox.put({"lane": "state"}, "state")
+            outbox.put({"lane": "routine"}, "routine")
+        lanes = [outbox.next_lane() for _ in range(50)]
+        for lane in lanes:
+            outbox.lanes[lane].popleft()
+        self.assertEqual(lanes.count("state"), 40)
+        self.assertEqual(lanes.count("routine"), 10)
+        # Turno suave: nunca más de 4 "state" seguidas
+        self.assertNotIn(["state"] * 5, [lanes[i:i + 5] for i in range(46)])
+        # Si un carril se vacía, el otro lo aprovecha todo
+        outbox.clear("state")
+        self.assertEqual({outbox.next_lane() for _ in range(10)}, {"routine"})
+
+    def test_custom_weights(self):
+        outbox = PriorityOutbox(weights={"state": 1, "routine": 1})
+        for _ in range(10):
+            outbox.put({}, "state")
+            outbox.put({}, "routine")
+        lanes = [outbox.next_lane() for _ in range(10)]
+        self.assertEqual(lanes.count("state"), 5)
+
+    def test_limits_drop_oldest(self):
+        outbox = PriorityOutbox(limits={"routine": 3})
+        for i in range(5):
+            outbox.put({"n": i}, "routine")
+        self.assertEqual([frame["n"] for frame, _ in outbox.lanes["routine"]], [2, 3, 4])
+        self.assertEqual(outbox.stats["routine"]["dropped"], 2)
+
+    def test_clear_with_keep(self):
+        outbox = PriorityOutbox()
+        outbox.put({"seq": 1}, "state")
+        outbox.put({}, "state")
+        self.assertEqual(outbox.clear("state", keep=lambda frame: "seq" in frame), 1)
+        self.assertEqual(outbox.pending(), 1)
+
+    def test_failed_send_is_requeued_stamped(self):
+        outbox = PriorityOutbox()
+        outbox.put({"n": 0}, "alert")
+        outbox.put({"n": 1}, "alert")
+        seqs = iter(range(1, 100))
+        stamp = lambda frame, lane: dict(frame, seq=next(seqs), lane=lane)
+
+        with self.assertRaises(ConnectionError):
+            drain(outbox, FakeWebSocket(limit=10, fail_at=1), stamp=stamp)
+        frame, _ = outbox.lanes["alert"][0]
+        self.assertEqual((frame["n"], frame["seq"]), (1, 2))
+        # Al reconectar sale con el mismo seq
+        websocket = FakeWebSocket(limit=1)
+        drain(outbox, websocket, stamp=stamp)
+        self.assertEqual(websocket.sent, [{"n": 1, "seq": 2, "lane": "alert"}])
+        # Latencia medida sólo para el primer envío (el último lo corta Done)
+        self.assertEqual(outbox.latency()["alert"]["n"], 1)
+        self.assertIsNone(outbox.latency()["routine"]["mean_ms"])
+
+
+class LaneClassifierTest(unittest.TestCase):
+    def test_lanes(self):
+        classifier = LaneClassifier()
+        self.assertEqual(classifier.lane("T", {"status": "normal", "temperature": 4}), "routine")
+        self.assertEqual(classifier.lane("T", {"status": "normal", "temperature": 5}), "routine")
+        self.assertEqual(classifier.lane("T", {"status": "warning"}), "alert")
+        self.assertEqual(classifier.lane("T", {"status": "normal"}), "state")
+        self.assertEqual(classifier.lane("S", {"needs_restock": True}), "alert")
+        self.assertEqual(classifier.lane("P", {"presence": False}), "routine")
+        self.assertEqual(classifier.lane("P", {"presence": True}), "state")
+
+
+if __name__ == "__main__":
+    unittest.main()
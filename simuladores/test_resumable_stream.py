@@ -0,0 +1,182 @@
+"""Pruebas de resumable_stream.py: reenvío, snapshot con hueco y esperas.
+
+Ejecutar: python -m pytest test_resumable_stream.py
+"""
+import asyncio
+import json
+import random
+import unittest
+from datetime import datetime
+
+from priority_lanes import PriorityOutbox
+from resumable_stream import ResumableStream
+from simulator_manager import SimulatorManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeWebSocket:
+    def __init__(self, incoming=None):
+        self.incoming = incoming
+        self.sent = []
+
+    async def recv(self):
+        if self.incoming is None:
+            await asyncio.sleep(3600)
+        return self.incoming
+
+    async def send(self, message):
+        self.sent.append(json.loads(message))
+
+
+def fill(stream, lanes):
+    for i, lane in enumerate(lanes):
+        stream.stamp({"n": i}, lane)
+
+
+class ResumableStreamTest(unittest.TestCase):
+    def test_stamp_and_replay(self):
+        stream = ResumableStream()
+        fill(stream, ["routine", "state", "routine", "alert", "routine"])
+        frames, complete = stream.replay_after(1)
+        self.assertTrue(complete)
+        # Sólo alertas y cambios de estado, con su seq original
+        self.assertEqual([(f["seq"], f["n"]) for f in frames], [(2, 1), (4, 3)])
+        self.assertEqual(stream.replay_after(5), ([], True))
+
+    def test_gap_when_buffer_no_longer_reaches(self):
+        stream = ResumableStream(replay_size=3)
+        fill(stream, ["state"] * 6)
+        frames, complete = stream.replay_after(2)
+        self.assertFalse(complete)
+        self.assertEqual([f["seq"] for f in frames], [4, 5, 6])
+        self.assertTrue(stream.replay_after(3)[1])
+
+    def test_snapshot_does_not_consume_seq(self):
+        stream = ResumableStream()
+        fill(stream, ["routine", "state"])
+        snapshot = stream.snapshot({"T": {}}, "2024-01-01T00:00:00", gap=True)
+        self.assertEqual((snapshot["type"], snapshot["seq"], snapshot["gap"]), ("snapshot", 2, True))
+        self.assertEqual(len(stream.buffer), 2)
+        self.assertEqual(stream.stamp({}, "routine")["seq"], 3)
+        self.assertNotIn("gap", stream.snapshot({}, "t"))
+
+    def test_read_resume(self):
+        stream = ResumableStream(resume_timeout=0.05)
+        request = {"type": "resume", "stream": stream.stream_id, "last_seq": 7}
+
+        def read(message):
+            return asyncio.run(stream.read_resume(FakeWebSocket(message)))
+
+        self.assertEqual(read(json.dumps(request)), 7)
+        self.assertIsNone(read(json.dumps(dict(request, stream="otro"))))
+        self.assertIsNone(read(json.dumps(dict(request, last_seq="7"))))
+        self.assertIsNone(read("no es json"))
+        self.assertIsNone(read(None))  # no dice nada: se agota la espera
+        stream.resume_timeout = 0
+        self.assertIsNone(read(json.dumps(request)))
+
+    def test_backoff_grows_with_jitter_and_cap(self):
+        stream = ResumableStream(backoff_base=0.5, backoff_max=8.0, rng=random.Random(1))
+        delays = [stream.backoff() for _ in range(8)]
+        for n, delay in enumerate(delays):
+            cap = min(8.0, 0.5 * 2 ** n)
+            self.assertTrue(cap / 2 <= delay <= cap, (n, delay))
+
+    def test_backoff_resets_only_after_a_stable_connection(self):
+        clock = FakeClock()
+        stream = ResumableStream(backoff_base=1.0, backoff_max=60.0, stable_after=30.0,
+                                 rng=random.Random(2), clock=clock)
+        for _ in range(3):
+            stream.backoff()
+        # El servidor acepta y corta al momento: la espera sigue creciendo
+        stream.connected()
+        clock.now += 1.0
+        self.assertGreaterEqual(stream.backoff(), 4.0)
+        self.assertEqual(stream.attempt, 4)
+        # Conexión estable: se vuelve a empezar desde la base
+        stream.connected()
+        clock.now += 30.0
+        self.assertLessEqual(stream.backoff(), 1.0)
+        self.assertEqual(stream.attempt, 1)
+        # Sin conexión entre medias no hay nada que reiniciar
+        clock.now += 100.0
+        self.assertEqual((stream.backoff() >= 1.0, stream.attempt), (True, 2))
+
+
+class ManagerResumeTest(unittest.TestCase):
+    def manager(self, **kwargs):
+        manager = SimulatorManager(None, stream=ResumableStream(resume_timeout=0.05, **kwargs))
+        manager.last_readings = {"TEMP001": {"type": "TemperatureSimulator", "data": {}}}
+        return manager
+
+    def resume(self, manager, last_seq):
+        request = None
+        if last_seq is not None:
+            request = json.dumps({"type": "resume", "stream": manager.stream.stream_id,
+                                  "last_seq": last_seq})
+        websocket = FakeWebSocket(request)
+        asyncio.run(manager.resume(websocket))
+        return websocket.sent
+
+    def test_replay_then_snapshot_without_gap(self):
+        manager = self.manager()
+        fill(manager.stream, ["routine", "state", "routine", "alert"])
+        sent = self.resume(manager, 1)
+        self.assertEqual([(f.get("type"), f["seq"]) for f in sent],
+                         [(None, 2), (None, 4), ("snapshot", 4)])
+        self.assertNotIn("gap", sent[-1])
+        self.assertEqual(sent[-1]["sensors"], manager.last_readings)
+
+    def test_gap_triggers_snapshot_flag(self):
+        manager = self.manager(replay_size=2)
+        fill(manager.stream, ["state"] * 5)
+        sent = self.resume(manager, 1)
+        self.assertEqual([f["seq"] for f in sent], [4, 5, 5])
+        self.assertTrue(sent[-1]["gap"])
+
+    def test_new_client_only_gets_the_snapshot(self):
+        manager = self.manager()
+        fill(manager.stream, ["alert"] * 3)
+        sent = self.resume(manager, None)
+        self.assertEqual([f["type"] for f in sent], ["snapshot"])
+
+    def test_snapshot_uses_manager_clock(self):
+        manager = self.manager()
+        manager.clock = lambda: datetime(2026, 3, 2, 12, 30)
+        sent = self.resume(manager, None)
+        self.assertEqual(sent[-1]["timestamp"], "2026-03-02T12:30:00")
+
+    def test_numbered_frames_left_in_outbox_are_dropped(self):
+        for last_seq in (None, 1):
+            manager = self.manager()
+            manager.outbox = PriorityOutbox()
+            # Tramas numeradas cuyo envío falló y otras aún sin numerar
+            for lane in ("state", "alert"):
+                manager.outbox.put(manager.stream.stamp({"lane": lane}, lane), lane)
+                manager.outbox.put({"lane": lane, "pending": True}, lane)
+            manager.outbox.put({"lane": "routine"}, "routine")
+            sent = self.resume(manager, last_seq)
+            self.assertEqual(sent[-1]["type"], "snapshot")
+            self.assertEqual(sent[-1]["seq"], 2)
+            # Nada de lo que queda saldrá tras el snapshot con una seq menor
+            self.assertEqual(manager.outbox.pending(), 2)
+            for lane in ("state", "alert"):
+                self.assertEqual([frame for frame, _ in manager.outbox.lanes[lane]],
+                                 [{"lane": lane, "pending": True}])
+
+    def test_frames_are_not_numbered_without_stream(self):
+        manager = SimulatorManager(None)
+        websocket = FakeWebSocket()
+        asyncio.run(manager.emit(websocket, {"type": "stats"}))
+        self.assertEqual(websocket.sent, [{"type": "stats"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""Pruebas de rolling_stats.py frente a un cálculo por fuerza bruta.
+
+Ejecutar: python -m pytest test_rolling_stats.py
+"""
+import random
+import statistics
+import unittest
+
+from rolling_stats import RollingStats, StatsStage
+
+
+class RollingStatsTest(unittest.TestCase):
+    def test_matches_brute_force_over_window(self):
+        rnd = random.Random(7)
+        for window in (1, 2, 5, 60):
+            rolling = RollingStats(window=window, alpha=0.2)
+            values, ewma = [], None
+            for _ in range(500):
+                # Tramos crecientes, decrecientes y con repeticiones
+                x = rnd.choice([rnd.gauss(5, 2), round(rnd.uniform(0, 3)), 1000 + rnd.random()])
+                rolling.add(x)
+                values.append(x)
+                ewma = x if ewma is None else ewma + 0.2 * (x - ewma)
+                last = values[-window:]
+                with self.subTest(window=window, n=len(values)):
+                    self.assertEqual(rolling.count, len(last))
+                    self.assertAlmostEqual(rolling.mean, statistics.fmean(last), places=6)
+                    expected_var = statistics.variance(last) if len(last) > 1 else 0.0
+                    self.assertAlmostEqual(rolling.variance, expected_var, places=4)
+                    self.assertEqual(rolling.minimum, min(last))
+                    self.assertEqual(rolling.maximum, max(last))
+                    self.assertAlmostEqual(rolling.ewma, ewma, places=9)
+
+    def test_trend(self):
+        rolling = RollingStats()
+        rolling.add(1.0)
+        self.assertEqual(rolling.trend, "stable")
+        rolling.add(2.0)
+        self.assertEqual(rolling.trend, "increasing")
+        rolling.add(0.0)
+        self.assertEqual(rolling.trend, "decreasing")
+
+    def test_empty_summary(self):
+        summary = RollingStats().summary()
+        self.assertEqual(summary["n"], 0)
+        self.assertIsNone(summary["min"])
+        self.assertIsNone(summary["ewma"])
+
+
+class StatsStageTest(unittest.TestCase):
+    def test_numeric_fields_only(self):
+        stage = StatsStage(window=3)
+        for value in (1, 2, 3, 4):
+            summary = stage.update("HUM001", "HumiditySimulator",
+                                   {"humidity": value, "status": "normal", "alarm": True})
+        self.assertEqual(set(summary), {"humidity"})
+        self.assertEqual(summary["humidity"]["mean"], 3.0)
+        self.assertEqual(summary["humidity"]["min"], 2.0)
+
+    def test_selected_fields_and_detached_summary(self):
+        stage = StatsStage(attach=False, fields={"StockSimulator": ["quantity"]})
+        summary = stage.update("STOCK001", "StockSimulator", {"quantity": 5, "restock_amount": 2})
+        self.assertEqual(summary, {})
+        self.assertEqual(set(stage.snapshot()["STOCK001"]), {"quantity"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+"""Pruebas de shm_transport.py: ida y vuelta, vuelta del anillo y seqlock.
+
+Ejecutar: python -m pytest test_shm_transport.py
+"""
+import os
+import unittest
+from datetime import datetime
+from unittest import mock
+
+import shm_transport
+from shm_transport import HEADER_SIZE, RECORD_SIZE, SEQ, ShmReader, ShmWriter
+
+READING = {"temperature": 4.25, "unit": "celsius", "status": "warning"}
+WHEN = datetime(2024, 1, 1, 12, 0, 0)
+
+
+class ShmTransportTest(unittest.TestCase):
+    def setUp(self):
+        self.name = f"replikstore_test_{os.getpid()}_{id(self)}"
+
+    def open(self, **kwargs):
+        writer = ShmWriter(name=self.name, **kwargs)
+        self.addCleanup(writer.close)
+        reader = ShmReader(name=self.name)
+        self.addCleanup(reader.close)
+        return writer, reader
+
+    def test_round_trip(self):
+        writer, reader = self.open(capacity=8, slots=4)
+        writer.publish("TEMP001", "TemperatureSimulator", READING, WHEN)
+        writer.publish("STOCK001", "StockSimulator",
+                       {"current_stock": 7, "stock_level": 0.1, "sales": 2, "restock_amount": 0,
+                        "needs_restock": True, "status": "normal"}, WHEN)
+        temp, stock = list(reader.poll())
+        self.assertEqual((temp["seq"], temp["sensor_id"], temp["sensor_type"]),
+                         (1, "TEMP001", "TemperatureSimulator"))
+        self.assertEqual(temp["status"], "warning")
+        self.assertEqual(temp["values"], [4.25])
+        self.assertEqual(temp["timestamp"], WHEN.timestamp())
+        self.assertTrue(stock["needs_restock"])
+        self.assertEqual(stock["values"], [7.0, 0.1, 2.0, 0.0])
+        self.assertEqual(list(reader.poll()), [])
+        self.assertEqual(set(reader.latest()), {"TEMP001", "STOCK001"})
+
+    def test_wrap_around(self):
+        writer, reader = self.open(capacity=8, slots=4)
+        for i in range(5):
+            writer.publish("TEMP001", "TemperatureSimulator", {"temperature": i}, WHEN)
+        self.assertEqual([r["seq"] for r in reader.poll()], [1, 2, 3, 4, 5])
+        # 20 más con capacidad 8: sólo quedan las 8 últimas
+        for i in range(5, 25):
+            writer.publish(f"TEMP{i % 3}", "TemperatureSimulator", {"temperature": i}, WHEN)
+        records = list(reader.poll())
+        self.assertEqual([r["seq"] for r in records], list(range(18, 26)))
+        self.assertEqual([r["values"][0] for r in records], [float(i) for i in range(17, 25)])
+        self.assertEqual(reader.stats["overrun"], 12)
+        self.assertEqual({k: v["values"][0] for k, v in reader.latest().items()},
+                         {"TEMP001": 4.0, "TEMP0": 24.0, "TEMP1": 22.0, "TEMP2": 23.0})
+
+    def test_torn_ring_record_is_skipped(self):
+        writer, reader = self.open(capacity=8, slots=4)
+        for i in range(3):
+            writer.publish("TEMP001", "TemperatureSimulator", {"temperature": i}, WHEN)
+        # El registro 2 está a medio escribir (seq = 0)
+        SEQ.pack_into(writer.region.buf, HEADER_SIZE + RECORD_SIZE, 0)
+        self.assertEqual([r["seq"] for r in reader.poll()], [1, 3])
+        self.assertEqual(reader.stats["torn"], 1)
+
+    def test_state_table_retries_torn_reads(self):
+        writer, reader = self.open(capacity=8, slots=4)
+        writer.publish("TEMP001", "TemperatureSimulator", READING, WHEN)
+        offset = writer.state_offset
+        buf = reader.region.buf
+        original = ShmReader._record
+        calls = []
+
+        def racing_record(self, off, expected=None):
+            # Primer intento: el escritor cambia seq durante la copia
+            calls.append(off)
+            if len(calls) == 1:
+                seq = SEQ.unpack_from(buf, off)[0]
+                with mock.patch.object(shm_transport, "SEQ", RacingSeq(buf, off, seq)):
+                    return original(self, off, expected)
+            return original(self, off, expected)
+
+        with mock.patch.object(ShmReader, "_record", racing_record):
+            state = reader.latest()
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(state["TEMP001"]["values"], [4.25])
+
+        SEQ.pack_into(writer.region.buf, offset, 0)  # nunca termina de escribirse
+        self.assertEqual(reader.latest(retries=3), {})
+
+    def test_live_segment_is_not_replaced(self):
+        writer, _ = self.open(capacity=8, slots=4)
+        writer.publish("TEMP001", "TemperatureSimulator", READING, WHEN)
+        with self.assertRaises(FileExistsError):
+            ShmWriter(name=self.name, capacity=8, slots=4)
+        self.assertEqual(list(ShmReader(name=self.name).poll())[0]["sensor_id"], "TEMP001")
+
+    def test_replace_and_dead_owner(self):
+        old = ShmWriter(name=self.name, capacity=8, slots=4)
+        old.publish("TEMP001", "TemperatureSimulator", READING, WHEN)
+        old.close(unlink=False)
+        new = ShmWriter(name=self.name, capacity=8, slots=4, replace=True)
+        self.addCleanup(new.close)
+        reader = ShmReader(name=self.name)
+        self.addCleanup(reader.close)
+        self.assertEqual(reader.write_seq, 0)
+
+        with mock.patch.object(shm_transport, "_pid_alive", lambda pid: False):
+            newer = ShmWriter(name=self.name, capacity=8, slots=4)
+        newer.close(unlink=False)  # el cleanup de `new` lo borra
+
+
+class RacingSeq:
+    """SEQ que simula una reescritura entre la copia y la comprobación."""
+
+    def __init__(self, buf, offset, seq):
+        self.buf, self.offset, self.seq = buf, offset, seq
+
+    def unpack_from(self, data, offset=0):
+        if data is self.buf and offset == self.offset:
+            return (self.seq + 1,)
+        return SEQ.unpack_from(data, offset)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""Pruebas de spatial_index.py: rejilla frente a fuerza bruta y avance por tick.
+
+Ejecutar: python -m pytest test_spatial_index.py
+"""
+import asyncio
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import numpy as np
+
+from simulador_presencia import PresenceSimulator
+from simulator_manager import SimulatorManager
+from spatial_index import FLOOR, PresenceField, ShopperCrowd, SpatialGrid, brute_force_counts
+
+
+class SpatialGridTest(unittest.TestCase):
+    def test_counts_match_brute_force(self):
+        rng = np.random.default_rng(11)
+        for sensors, radius, cell_size in ((1, 2.0, None), (50, 1.0, None), (300, 0.5, None),
+                                           (40, rng.uniform(0.2, 3.0, 40), 0.7), (20, 25.0, None)):
+            positions = rng.uniform(-10, 10, (sensors, 2))
+            radii = np.broadcast_to(radius, (sensors,))
+            # Incluye puntos fuera de la planta y justo en los bordes
+            points = np.vstack((rng.uniform(-12, 12, (2000, 2)),
+                                [[-10, -10], [10, 10], [10, -10], [0, 0]]))
+            grid = SpatialGrid(positions, radii, cell_size=cell_size)
+            with self.subTest(sensors=sensors, cell_size=cell_size):
+                np.testing.assert_array_equal(grid.counts(points),
+                                              brute_force_counts(points, positions, radii))
+
+    def test_query_pairs(self):
+        grid = SpatialGrid([(0, 0), (5, 5)], [1.0, 1.0])
+        point_idx, sensor_idx = grid.query([(0.5, 0.5), (5, 5.9), (3, 3), (1.0, 0.0)])
+        self.assertEqual(sorted(zip(point_idx.tolist(), sensor_idx.tolist())),
+                         [(0, 0), (1, 1), (3, 0)])
+
+    def test_no_sensors(self):
+        grid = SpatialGrid(np.empty((0, 2)), [])
+        self.assertEqual(len(grid.counts([(0, 0)])), 0)
+
+    def test_zero_radii_and_invalid_cell_size(self):
+        # Todos los radios a 0: no hay medio radio, se usa una sola celda
+        grid = SpatialGrid([(0, 0), (5, 5)], 0.0)
+        self.assertEqual((grid.nx, grid.ny), (1, 1))
+        self.assertEqual(grid.counts([(0, 0), (1, 1)]).tolist(), [1, 0])
+        for cell_size in (0.0, -1.0, float("nan")):
+            with self.assertRaises(ValueError):
+                SpatialGrid([(0, 0)], 1.0, cell_size=cell_size)
+
+
+class ShopperCrowdTest(unittest.TestCase):
+    def test_stays_on_the_floor(self):
+        crowd = ShopperCrowd(500, max_speed=5.0, seed=3)
+        for _ in range(50):
+            crowd.step(2.0)
+        x_min, x_max, y_min, y_max = FLOOR
+        self.assertTrue(((crowd.positions[:, 0] >= x_min) & (crowd.positions[:, 0] <= x_max)).all())
+        self.assertTrue(((crowd.positions[:, 1] >= y_min) & (crowd.positions[:, 1] <= y_max)).all())
+
+    def test_turn_probability_is_per_second(self):
+        # Con p = 0.2 por segundo, en 0.1 s gira ~2.2 % de los clientes
+        crowd = ShopperCrowd(100_000, turn_probability=0.2, seed=5)
+        crowd.step(0.1)
+        turned = np.count_nonzero(np.linalg.norm(crowd.velocities, axis=1))
+        self.assertAlmostEqual(turned / 100_000, 1 - 0.8 ** 0.1, delta=0.003)
+        crowd.step(0.0)  # dt = 0 no cambia ninguna velocidad
+        self.assertEqual(np.count_nonzero(np.linalg.norm(crowd.velocities, axis=1)), turned)
+
+
+class PresenceFieldTest(unittest.TestCase):
+    def setUp(self):
+        self.crowd = ShopperCrowd(2000, seed=9)
+        self.field = PresenceField(self.crowd)
+        self.start = datetime(2024, 1, 1, 12)
+        self.sensors = {f"PRES{i:03d}": (float(x), float(y)) for i, (x, y) in
+                        enumerate(np.random.default_rng(2).uniform(-9, 9, (30, 2)))}
+        for sensor_id, position in self.sensors.items():
+            self.field.add_sensor(sensor_id, position, 1.5)
+
+    def expected(self):
+        positions = np.array(list(self.sensors.values()))
+        counts = brute_force_counts(self.crowd.positions, positions, np.full(len(positions), 1.5))
+        return dict(zip(self.sensors, counts.tolist()))
+
+    def test_count_is_a_lookup_of_the_last_advance(self):
+        self.assertEqual(self.field.count("PRES000"), 0)
+        self.field.advance(self.start)
+        with mock.patch.object(self.crowd, "step", wraps=self.crowd.step) as step:
+            self.field.advance(self.start + timedelta(seconds=1))
+            counts = {sensor_id: self.field.count(sensor_id) for sensor_id in self.sensors}
+            self.assertEqual(step.call_count, 1)
+        self.assertEqual(counts, self.expected())
+
+    def test_manager_steps_the_crowd_once_per_tick(self):
+        manager = SimulatorManager(None)
+        manager.add_model(self.field)
+        clock = iter(self.start + timedelta(seconds=i) for i in range(100))
+        manager.clock = lambda: next(clock)
+        for sensor_id, position in self.sensors.items():
+            manager.add_simulator(PresenceSimulator(sensor_id, "Tienda", detection_radius=1.5,
+                                                    field=self.field, position=position,
+                                                    false_positive_rate=0))
+        with mock.patch.object(self.crowd, "step", wraps=self.crowd.step) as step:
+            for _ in range(3):
+                asyncio.run(manager.tick())
+            self.assertEqual([c.args for c in step.call_args_list], [(1.0,), (1.0,)])
+        expected = self.expected()
+        for sensor_id, reading in manager.last_readings.items():
+            self.assertEqual(reading["data"]["count"], expected[sensor_id])
+            self.assertEqual(reading["data"]["presence"], expected[sensor_id] > 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""Pruebas de SQLiteSink: escritura por lotes y fallos del hilo escritor.
+
+Ejecutar: python -m pytest test_sqlite_sink.py
+"""
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from datetime import datetime
+
+from sqlite_sink import SinkError, SQLiteSink
+
+
+class SQLiteSinkTest(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.dir = tmpdir.name
+        self.path = os.path.join(self.dir, "tienda.db")
+
+    def rows(self, table):
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        finally:
+            conn.close()
+
+    def wait_for_error(self, sink, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while sink.error is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIsNotNone(sink.error)
+
+    def submit(self, sink, n, sensor="TEMP001"):
+        for i in range(n):
+            sink.submit(sensor, "TemperatureSimulator", {"temperature": 4.0 + i / 100},
+                        datetime(2024, 1, 1, 12, 0, i % 60))
+
+    def test_writes_readings_and_alerts(self):
+        sink = SQLiteSink(self.path, commit_interval_ms=5)
+        sink.start()
+        self.submit(sink, 500)
+        sink.alert("temperatura", "Fuera de rango", "alto", sensor_id="TEMP001")
+        sink.stop()
+        self.assertEqual(self.rows("registro_temperaturas"), 500)
+        self.assertEqual(self.rows("alertas"), 1)
+        self.assertEqual(sink.stats["written"], 501)
+        self.assertEqual(sink.stats["errors"], 0)
+
+    def test_failed_writer_is_reported_and_restartable(self):
+        sink = SQLiteSink(os.path.join(self.dir, "no", "existe.db"), commit_interval_ms=5)
+        sink.start()
+        self.wait_for_error(sink)
+        with self.assertRaises(SinkError):
+            self.submit(sink, 1)
+        with self.assertRaises(SinkError):
+            sink.alert("temperatura", "x", "alto")
+        self.assertEqual(sink.stats["errors"], 1)
+
+        sink.db_path = self.path
+        sink.restart()
+        self.submit(sink, 10)
+        sink.stop()
+        self.assertEqual(self.rows("registro_temperaturas"), 10)
+
+    def test_failed_commit_counts_lost_rows_and_stop_raises(self):
+        sink = SQLiteSink(self.path, commit_interval_ms=5)
+        sink.start()
+        self.submit(sink, 5)
+        time.sleep(0.2)
+        conn = sqlite3.connect(self.path)
+        conn.execute("DROP TABLE registro_temperaturas")
+        conn.commit()
+        conn.close()
+        self.submit(sink, 3, sensor="TEMP002")
+        self.wait_for_error(sink)
+        self.assertEqual(sink.stats["written"], 5)
+        self.assertGreaterEqual(sink.stats["lost"], 1)
+        with self.assertRaises(SinkError):
+            sink.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
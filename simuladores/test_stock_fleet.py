@@ -0,0 +1,115 @@
+"""Pruebas de stock_fleet.py: tablas de distribución y máscaras de reposición.
+
+Ejecutar: python -m pytest test_stock_fleet.py
+"""
+import math
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from stock_fleet import LEGACY, TAIL, StockFleet, demand_table, sales_cdf
+
+NOON = datetime(2026, 1, 1, 12)
+
+
+def flat(n, value):
+    return np.full((24, n), value, dtype=np.float64)
+
+
+class SalesCdfTest(unittest.TestCase):
+    def test_poisson_matches_closed_form(self):
+        lams = [0.0, 0.2, 1.5, 7.0]
+        cdf = sales_cdf(np.array([lams] * 24))
+        for j, lam in enumerate(lams):
+            total = 0.0
+            for k in range(cdf.shape[1]):
+                total += math.exp(-lam) * lam ** k / math.factorial(k)
+                self.assertAlmostEqual(float(cdf[0, k, j]), total, places=6)
+        self.assertGreaterEqual(float(cdf[:, -1].min()), 1 - 2 * TAIL)
+
+    def test_large_demand_terminates(self):
+        # exp(-λ) es 0 en float64 a partir de λ ≈ 745
+        for lam in (800.0, 5000.0):
+            cdf = sales_cdf(flat(2, lam))
+            with self.subTest(lam=lam):
+                self.assertLessEqual(cdf.shape[1], lam + 10 * math.sqrt(lam) + 12)
+                self.assertAlmostEqual(float(cdf[0, -1, 0]), 1.0, places=5)
+                # Mediana en torno a λ
+                median = int(np.argmax(cdf[0, :, 0] >= 0.5))
+                self.assertLess(abs(median - lam), 2)
+
+    def test_large_demand_sales_have_the_right_mean(self):
+        fleet = StockFleet(np.full(2000, 10 ** 6), demand=flat(2000, 900.0), seed=1)
+        sales = fleet.step(NOON)["sales"]
+        self.assertAlmostEqual(float(sales.mean()), 900.0, delta=3.0)
+        self.assertAlmostEqual(float(sales.std()), 30.0, delta=3.0)
+
+    def test_binomial_is_bounded(self):
+        cdf = sales_cdf(flat(3, 1.0), sampling="binomial", max_units=3)
+        self.assertEqual(cdf.shape, (24, 3, 3))
+        p = 1 / 3
+        expected = [sum(math.comb(3, i) * p ** i * (1 - p) ** (3 - i) for i in range(k + 1))
+                    for k in range(3)]
+        np.testing.assert_allclose(cdf[0, :, 0], expected, rtol=1e-6)
+        with self.assertRaises(ValueError):
+            sales_cdf(flat(1, 1.0), sampling="uniforme")
+
+
+class StockFleetTest(unittest.TestCase):
+    def test_restock_masks(self):
+        max_stock = np.array([100, 100, 100])
+        fleet = StockFleet(max_stock, current_stock=[50, 21, 5], restock_threshold=20,
+                           restock_duration=3600, demand=flat(3, 0.0), seed=0)
+        result = fleet.step(NOON)
+        # Sólo el SKU por debajo del umbral empieza a reponer
+        self.assertEqual(result["needs_restock"].tolist(), [False, False, True])
+        self.assertEqual(fleet.is_restocking.tolist(), [False, False, True])
+        self.assertEqual(fleet.restock_due[2], NOON.timestamp() + 3600)
+
+        # Mientras repone no se vuelve a avisar
+        fleet.stock[1] = 10
+        result = fleet.step(NOON + timedelta(minutes=30))
+        self.assertEqual(result["needs_restock"].tolist(), [False, True, False])
+        self.assertFalse(result["restock_amount"].any())
+
+        result = fleet.step(NOON + timedelta(hours=1))
+        self.assertEqual(result["restock_amount"].tolist(), [0, 0, 95])
+        self.assertEqual(fleet.stock.tolist(), [50, 10, 100])
+        self.assertEqual(fleet.is_restocking.tolist(), [False, True, False])
+        self.assertEqual(fleet.restock_due[2], np.inf)
+
+    def test_sales_never_exceed_stock(self):
+        fleet = StockFleet(np.full(500, 10), current_stock=np.arange(500) % 4,
+                           restock_threshold=-1, demand=flat(500, 5.0), seed=2)
+        before = fleet.stock.copy()
+        sales = fleet.step(NOON)["sales"]
+        self.assertTrue((sales <= before).all())
+        self.assertTrue((fleet.stock >= 0).all())
+        np.testing.assert_array_equal(fleet.stock, before - sales)
+
+    def test_legacy_demand_by_hour(self):
+        fleet = StockFleet(np.full(20000, 10 ** 6), seed=3)
+        for hour in (3, 12):
+            sales = fleet.step(NOON.replace(hour=hour))["sales"]
+            self.assertAlmostEqual(float(sales.mean()), LEGACY[hour], delta=0.02)
+
+    def test_readings_only_active(self):
+        fleet = StockFleet(np.array([100, 100]), current_stock=[50, 5], restock_threshold=20,
+                           demand=flat(2, 0.0), seed=0)
+        result = fleet.step(NOON)
+        readings = list(fleet.readings(result, ["PROD001", "PROD002"]))
+        self.assertEqual([i for i, _ in readings], [1])
+        self.assertEqual(readings[0][1]["status"], "restocking")
+        self.assertEqual(len(list(fleet.readings(result, ["PROD001", "PROD002"], False))), 2)
+
+    def test_demand_table_shape(self):
+        table = demand_table([0, 3], popularity=[2.0, 1.0])
+        self.assertEqual(table.shape, (24, 2))
+        np.testing.assert_allclose(table[:, 0], LEGACY * 2)
+        with self.assertRaises(ValueError):
+            StockFleet([10, 10], demand=table[:, :1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,257 @@
+"""Pruebas de Asesor_Indices.py sobre una base SQLite temporal.
+
+Ejecutar: python -m pytest test_asesor_indices.py
+"""
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import Asesor_Indices as asesor
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+SCHEMA = """
+CREATE TABLE sensores (id INTEGER PRIMARY KEY, nevera_id INTEGER, codigo TEXT UNIQUE);
+CREATE TABLE lecturas (
+    id INTEGER PRIMARY KEY,
+    sensor_id INTEGER NOT NULL REFERENCES sensores(id),
+    fecha_hora INTEGER,
+    temperatura REAL
+);
+"""
+
+
+class AsesorTestCase(unittest.TestCase):
+    sensores = 20
+    lecturas = 3000
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmpdir = tmp.name
+        self.db = os.path.join(self.tmpdir, "tienda.db")
+        conn = sqlite3.connect(self.db)
+        conn.executescript(SCHEMA)
+        conn.executemany("INSERT INTO sensores VALUES (?, ?, ?)",
+                         ((i, i % 4, f"S{i}") for i in range(1, self.sensores + 1)))
+        conn.executemany("INSERT INTO lecturas (sensor_id, fecha_hora, temperatura) VALUES (?, ?, ?)",
+                         ((i % self.sensores + 1, 1000 + i, 4.0) for i in range(self.lecturas)))
+        conn.commit()
+        conn.close()
+        self.conn = sqlite3.connect(self.db)
+        self.addCleanup(self.conn.close)
+
+    def schema(self):
+        return asesor.Schema(self.conn)
+
+    def roles(self, sql, table):
+        schema = self.schema()
+        refs = asesor.table_refs(sql, schema)
+        return asesor.column_roles(sql, table, refs, schema)
+
+    def report(self, *statements, min_rows=1000):
+        return asesor.analyze(self.conn, asesor.collect(statements), min_rows)
+
+
+class HeuristicsTest(AsesorTestCase):
+    def test_normalize_replaces_literals(self):
+        self.assertEqual(
+            asesor.normalize("SELECT *  FROM t\n WHERE a = 12 AND b = 'x''y' AND c = -1.5;"),
+            "SELECT * FROM t WHERE a = ? AND b = ? AND c = ?",
+        )
+        self.assertEqual(asesor.normalize("SELECT t1.a FROM t1"), "SELECT t1.a FROM t1")
+
+    def test_collect_groups_by_shape(self):
+        queries = asesor.collect([
+            "SELECT * FROM lecturas WHERE sensor_id = 1",
+            "SELECT * FROM lecturas WHERE sensor_id = 2",
+            "PRAGMA table_info(lecturas)",
+            "SELECT name FROM sqlite_master",
+        ])
+        self.assertEqual(list(queries.values()),
+                         [{"sql": "SELECT * FROM lecturas WHERE sensor_id = 1", "count": 2}])
+
+    def test_table_refs_aliases(self):
+        refs = asesor.table_refs(
+            "SELECT l.fecha_hora FROM lecturas l JOIN sensores AS s ON s.id = l.sensor_id "
+            "WHERE s.codigo = 'FROM nada'", self.schema())
+        self.assertEqual(refs, {"lecturas": "lecturas", "l": "lecturas",
+                                "sensores": "sensores", "s": "sensores"})
+        refs = asesor.table_refs("SELECT * FROM lecturas WHERE id = 1", self.schema())
+        self.assertEqual(refs, {"lecturas": "lecturas"})
+        # Sin alias, el JOIN siguiente no se toma como alias de la primera tabla
+        refs = asesor.table_refs("SELECT * FROM lecturas JOIN sensores ON sensor_id = sensores.id",
+                                 self.schema())
+        self.assertEqual(refs, {"lecturas": "lecturas", "sensores": "sensores"})
+
+    def test_column_roles(self):
+        roles = self.roles("SELECT temperatura FROM lecturas WHERE sensor_id = 3 "
+                           "AND fecha_hora >= 1500 ORDER BY fecha_hora", "lecturas")
+        self.assertEqual(roles["eq"], ["sensor_id"])
+        self.assertEqual(roles["range"], ["fecha_hora"])
+        self.assertEqual(roles["order"], ["fecha_hora"])
+        self.assertEqual(roles["select"], ["temperatura"])
+        self.assertFalse(roles["star"])
+
+    def test_column_roles_join_and_ambiguous_columns(self):
+        sql = ("SELECT l.temperatura FROM lecturas l JOIN sensores s ON s.id = l.sensor_id "
+               "WHERE s.nevera_id = 1")
+        self.assertEqual(self.roles(sql, "lecturas")["eq"], ["sensor_id"])
+        self.assertEqual(self.roles(sql, "sensores")["eq"], ["id", "nevera_id"])
+        # `id` sin calificar existe en las dos tablas: no se atribuye a ninguna
+        sql = "SELECT * FROM lecturas JOIN sensores ON sensor_id = sensores.id WHERE id = 1"
+        self.assertNotIn("id", self.roles(sql, "lecturas")["eq"])
+        self.assertTrue(self.roles(sql, "lecturas")["star"])
+
+    def test_propose_index_where_order(self):
+        schema = self.schema()
+        roles = self.roles("SELECT temperatura FROM lecturas WHERE sensor_id = 3 "
+                           "AND fecha_hora >= 1500 ORDER BY fecha_hora", "lecturas")
+        # igualdad, después el rango, y el resto para cubrir la consulta
+        self.assertEqual(asesor.propose_index("lecturas", roles, schema),
+                         ["sensor_id", "fecha_hora", "temperatura"])
+        roles = self.roles("SELECT * FROM lecturas ORDER BY fecha_hora", "lecturas")
+        self.assertEqual(asesor.propose_index("lecturas", roles, schema), ["fecha_hora"])
+
+    def test_propose_index_skips_rowid_and_unfiltered(self):
+        schema = self.schema()
+        roles = self.roles("SELECT * FROM lecturas WHERE id = 5", "lecturas")
+        self.assertIsNone(asesor.propose_index("lecturas", roles, schema))
+        roles = self.roles("SELECT temperatura FROM lecturas", "lecturas")
+        self.assertIsNone(asesor.propose_index("lecturas", roles, schema))
+
+
+class AnalyzeTest(AsesorTestCase):
+    def test_flags_scan_with_where_proposal(self):
+        [item] = self.report("SELECT fecha_hora FROM lecturas WHERE sensor_id = 4")
+        [scan] = item["scans"]
+        self.assertEqual(scan["table"], "lecturas")
+        self.assertEqual(scan["rows"], self.lecturas)
+        self.assertEqual(scan["index"], ["sensor_id", "fecha_hora"])
+        self.assertEqual(scan["index_sql"],
+                         'CREATE INDEX IF NOT EXISTS "idx_lecturas_sensor_id_fecha_hora" '
+                         'ON "lecturas" ("sensor_id", "fecha_hora")')
+
+    def test_flags_scan_for_join(self):
+        [item] = self.report("SELECT l.temperatura FROM sensores s "
+                             "JOIN lecturas l ON l.sensor_id = s.id WHERE s.nevera_id = 1")
+        self.assertEqual([(s["table"], s["index"]) for s in item["scans"]],
+                         [("lecturas", ["sensor_id", "temperatura"])])
+
+    def test_flags_scan_for_order_by(self):
+        [item] = self.report("SELECT temperatura FROM lecturas ORDER BY fecha_hora")
+        self.assertEqual(item["scans"][0]["index"], ["fecha_hora", "temperatura"])
+        self.assertEqual(item["temp_btree"], ["USE TEMP B-TREE FOR ORDER BY"])
+
+    def test_existing_index_is_not_flagged(self):
+        sql = "SELECT fecha_hora FROM lecturas WHERE sensor_id = 4"
+        self.conn.execute("CREATE INDEX idx_sensor ON lecturas (sensor_id)")
+        [item] = self.report(sql)
+        self.assertEqual(item["scans"], [])
+        self.assertTrue(any("USING INDEX idx_sensor" in d for d in item["plan"]))
+        # Un recorrido de un índice que cubre la consulta tampoco se marca
+        self.conn.execute("CREATE INDEX idx_cubre ON lecturas (fecha_hora, temperatura)")
+        [item] = self.report("SELECT temperatura FROM lecturas ORDER BY fecha_hora")
+        self.assertEqual(item["scans"], [])
+
+    def test_small_tables_errors_and_early_exit(self):
+        report = self.report(
+            "SELECT * FROM sensores WHERE nevera_id = 1",
+            "SELECT * FROM no_existe WHERE a = 1",
+            "SELECT temperatura FROM lecturas LIMIT 5",
+        )
+        self.assertEqual(report[0]["scans"], [])  # 20 filas < min_rows
+        self.assertIn("no such table", report[1]["error"])
+        self.assertEqual(report[2]["scans"], [])
+
+    def test_builtin_queries_follow_schema(self):
+        queries, skipped = asesor.builtin_queries(self.schema())
+        self.assertEqual(queries, [])
+        self.assertEqual(set(skipped), set(asesor.BUILTIN_QUERIES))
+        self.conn.executescript(
+            "CREATE TABLE products (id INTEGER PRIMARY KEY, name, price, stock, category, created_at);"
+            "CREATE TABLE users (id INTEGER PRIMARY KEY, username, email, password, role);"
+        )
+        queries, skipped = asesor.builtin_queries(self.schema())
+        self.assertEqual(queries, asesor.BUILTIN_QUERIES["api"])
+        self.assertIn("registro_temperaturas", skipped["tienda"])
+
+
+class ScaledCopyTest(AsesorTestCase):
+    sensores = 5
+    lecturas = 40
+
+    def test_keeps_foreign_keys_and_unique(self):
+        dest = os.path.join(self.tmpdir, "escalada.db")
+        sizes = asesor.scaled_copy(self.db, dest, scale=10)
+        self.assertEqual(sizes["lecturas"], (40, 400))
+        # `codigo` es UNIQUE: los duplicados se descartan y la tabla no crece
+        self.assertEqual(sizes["sensores"], (5, 5))
+        conn = sqlite3.connect(dest)
+        self.addCleanup(conn.close)
+        self.assertEqual(conn.execute("PRAGMA foreign_key_check").fetchall(), [])
+        self.assertEqual(conn.execute("SELECT COUNT(DISTINCT codigo), COUNT(*) FROM sensores")
+                         .fetchone(), (5, 5))
+        sql = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'lecturas'").fetchone()[0]
+        self.assertIn("REFERENCES sensores(id)", sql)
+
+    def test_max_rows_caps_growth_and_source_untouched(self):
+        dest = os.path.join(self.tmpdir, "escalada.db")
+        sizes = asesor.scaled_copy(self.db, dest, scale=100, max_rows=100)
+        self.assertEqual(sizes["lecturas"], (40, 100))
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM lecturas").fetchone()[0], 40)
+
+
+class BenchmarkTest(AsesorTestCase):
+    def test_measures_and_drops_proposed_index(self):
+        sql = "SELECT fecha_hora FROM lecturas WHERE sensor_id = 4"
+        report = self.report(sql, "DELETE FROM lecturas WHERE sensor_id = 4")
+        self.conn.close()
+        [result] = asesor.benchmark(self.db, report, repeat=1)
+        self.assertEqual(result["columns"], ["sensor_id", "fecha_hora"])
+        [query] = result["queries"]  # el DELETE no se ejecuta
+        self.assertEqual(query["sql"], sql)
+        self.assertTrue(query["used"])
+        self.assertGreater(query["before_s"], 0)
+        conn = sqlite3.connect(self.db)
+        self.addCleanup(conn.close)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM lecturas").fetchone()[0], self.lecturas)
+        self.assertIsNone(conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'").fetchone())
+
+
+class CommandLineTest(AsesorTestCase):
+    def run_cli(self, *args):
+        return subprocess.run([sys.executable, os.path.join(ROOT, "Asesor_Indices.py"), *args],
+                              capture_output=True, text=True, cwd=self.tmpdir)
+
+    def test_capture_then_analyze(self):
+        log = os.path.join(self.tmpdir, "consultas.jsonl")
+        script = ("import sys; sys.path.insert(0, {!r}); from readonly_db import connect_readonly; "
+                  "c = connect_readonly({!r}); "
+                  "c.execute('SELECT temperatura FROM lecturas WHERE sensor_id = 2').fetchall(); "
+                  "c.close()").format(ROOT, self.db)
+        result = self.run_cli("capture", "--log", log, "--", sys.executable, "-c", script)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("sentencias registradas", result.stdout)
+        self.assertIn("SELECT temperatura FROM lecturas WHERE sensor_id = 2",
+                      asesor.load_log(log))
+
+        result = self.run_cli("analyze", "--db", self.db, "--log", log, "--json")
+        self.assertEqual(result.returncode, 0, result.stderr)
+        [item] = json.loads(result.stdout)["report"]
+        self.assertEqual(item["scans"][0]["index"], ["sensor_id", "temperatura"])
+
+    def test_builtin_fails_when_no_group_applies(self):
+        result = self.run_cli("analyze", "--db", self.db, "--builtin",
+                              "--log", os.path.join(self.tmpdir, "no_existe.jsonl"))
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("Ninguna consulta de --builtin", result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
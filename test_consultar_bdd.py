@@ -0,0 +1,46 @@
+"""Pruebas del muestreo de Consultar_BDD.py (--sample) con huecos de rowid.
+
+Ejecutar: python -m pytest test_consultar_bdd.py
+"""
+import sqlite3
+import unittest
+
+import Consultar_BDD
+
+
+class SampleTest(unittest.TestCase):
+    def setUp(self):
+        self.conn = sqlite3.connect(":memory:")
+        self.conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v)")
+        self.conn.executemany("INSERT INTO t VALUES (?, ?)", ((i, i) for i in range(1, 100_001)))
+        self.addCleanup(self.conn.close)
+
+    def sample(self, table, n):
+        _, rows = Consultar_BDD.iter_rows(self.conn, table, 10, n)
+        return list(rows)
+
+    def test_gaps_still_return_n_rows(self):
+        self.conn.execute("DELETE FROM t WHERE id % 20 != 0")  # 95 % huecos
+        rows = self.sample("t", 50)
+        self.assertEqual(len(rows), 50)
+        self.assertEqual(len(set(rows)), 50)
+        self.assertTrue(all(row[0] % 20 == 0 for row in rows))
+
+    def test_very_sparse_range_falls_back_to_scan(self):
+        self.conn.execute("DELETE FROM t WHERE id NOT IN (1, 100000)")
+        self.assertEqual(sorted(row[0] for row in self.sample("t", 5)), [1, 100000])
+
+    def test_small_and_without_rowid_tables(self):
+        self.conn.execute("DELETE FROM t WHERE id > 30")
+        self.assertEqual(len(self.sample("t", 50)), 30)
+        self.conn.execute("CREATE TABLE w (k TEXT PRIMARY KEY, v) WITHOUT ROWID")
+        self.conn.executemany("INSERT INTO w VALUES (?, ?)", ((str(i), i) for i in range(40)))
+        self.assertEqual(len(set(self.sample("w", 25))), 25)
+
+    def test_empty_table(self):
+        self.conn.execute("DELETE FROM t")
+        self.assertEqual(self.sample("t", 5), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
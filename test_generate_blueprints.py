@@ -0,0 +1,157 @@
+"""Pruebas de generate_blueprints.py y blueprint_planner.py sin el editor.
+
+generate_blueprints se importa con el módulo `unreal` falso de
+fake_unreal.py. Ejecutar: python -m pytest test_generate_blueprints.py
+"""
+import copy
+import importlib
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+import blueprint_planner
+from fake_unreal import make_fake_unreal
+
+SPEC = blueprint_planner.load_spec()
+TOTAL = len(SPEC['blueprints'])
+
+
+class PlannerTest(unittest.TestCase):
+    def setUp(self):
+        self.desired = blueprint_planner.desired_assets(SPEC)
+        self.manifest = {path: blueprint_planner.spec_hash(entry)
+                         for path, entry in self.desired.items()}
+        # Listado tal como lo devuelve list_assets: rutas de objeto
+        self.listing = [f"{path}.{path.rsplit('/', 1)[1]}" for path in self.desired]
+
+    def ops(self, result):
+        return {(op['op'], op['path']) for op in result['operations']}
+
+    def test_empty_project_creates_folders_and_everything(self):
+        result = blueprint_planner.plan(SPEC, [], {})
+        counts = blueprint_planner.summarize(result)
+        self.assertEqual(counts['create'], TOTAL)
+        self.assertEqual(counts['make_directory'], len(SPEC['folders']))
+
+    def test_up_to_date_project_has_empty_plan(self):
+        result = blueprint_planner.plan(SPEC, self.listing, self.manifest)
+        self.assertEqual(result['operations'], [])
+        self.assertEqual(len(result['unchanged']), TOTAL)
+
+    def test_minimal_diff(self):
+        spec = copy.deepcopy(SPEC)
+        spec['blueprints'][4]['parent'] = 'Character'            # BP_Product
+        spec['blueprints'] = [e for e in spec['blueprints'] if e['name'] != 'BP_TutorialManager']
+        spec['blueprints'].append({'name': 'BP_Onboarding', 'folder': 'Blueprints/Help', 'parent': 'Actor'})
+        listing = self.listing + ['/Game/Blueprints/Help/BP_Manual.BP_Manual']
+        result = blueprint_planner.plan(spec, listing, self.manifest)
+        self.assertEqual(self.ops(result), {
+            ('modify', '/Game/Blueprints/Inventory/BP_Product'),
+            ('delete', '/Game/Blueprints/Help/BP_TutorialManager'),
+            ('create', '/Game/Blueprints/Help/BP_Onboarding'),
+        })
+        # BP_Manual no es del generador: no se borra ni entra en el manifiesto
+        self.assertNotIn('/Game/Blueprints/Help/BP_Manual', result['manifest'])
+
+    def test_member_change_is_a_modify(self):
+        spec = copy.deepcopy(SPEC)
+        manager = next(e for e in spec['blueprints'] if e['name'] == 'BP_WebSocketManager')
+        manager['functions'].append({'name': 'Disconnect', 'inputs': [], 'outputs': []})
+        result = blueprint_planner.plan(spec, self.listing, self.manifest)
+        self.assertEqual(self.ops(result), {('modify', '/Game/Blueprints/BP_WebSocketManager')})
+
+
+class IncrementalBlueprintTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.unreal = make_fake_unreal(self.tmp.name)
+        sys.modules['unreal'] = self.unreal
+        sys.modules.pop('generate_blueprints', None)
+        self.gb = importlib.import_module('generate_blueprints')
+        self.manifest = os.path.join(self.tmp.name, 'manifest.json')
+
+    def tearDown(self):
+        sys.modules.pop('generate_blueprints', None)
+        sys.modules.pop('unreal', None)
+        self.tmp.cleanup()
+
+    def test_first_run_creates_everything_and_saves_once(self):
+        summary = self.gb.sync_blueprints(manifest_path=self.manifest)
+        self.assertEqual(len(summary['created']), TOTAL)
+        self.assertEqual(self.unreal.calls['save_dirty_packages'], 1)
+        self.assertEqual(self.unreal.assets['/Game/Blueprints/Customer/BP_VirtualCustomer'], 'Character')
+        self.assertEqual(self.unreal.functions['/Game/Blueprints/BP_WebSocketManager'],
+                         ['ConnectToServer', 'ProcessSensorData', 'UpdateDigitalTwin'])
+
+    def test_second_run_touches_nothing(self):
+        self.gb.sync_blueprints(manifest_path=self.manifest)
+        calls = dict(self.unreal.calls)
+        summary = self.gb.sync_blueprints(manifest_path=self.manifest)
+        self.assertEqual(len(summary['unchanged']), TOTAL)
+        self.assertEqual(self.unreal.calls, calls)
+
+    def test_only_changed_specs_are_rebuilt(self):
+        self.gb.sync_blueprints(manifest_path=self.manifest)
+        spec = copy.deepcopy(SPEC)
+        spec['blueprints'][4]['parent'] = 'Character'            # BP_Product
+        spec['blueprints'] = [e for e in spec['blueprints'] if e['name'] != 'BP_TutorialManager']
+        spec['blueprints'].append({'name': 'BP_Onboarding', 'folder': 'Blueprints/Help', 'parent': 'Actor'})
+        summary = self.gb.sync_blueprints(spec, self.manifest)
+        self.assertEqual(summary['updated'], ['/Game/Blueprints/Inventory/BP_Product'])
+        self.assertEqual(summary['created'], ['/Game/Blueprints/Help/BP_Onboarding'])
+        self.assertEqual(summary['deleted'], ['/Game/Blueprints/Help/BP_TutorialManager'])
+        self.assertEqual(self.unreal.assets['/Game/Blueprints/Inventory/BP_Product'], 'Character')
+        self.assertEqual(self.unreal.calls['save_dirty_packages'], 2)
+
+    def test_asset_deleted_in_editor_is_recreated(self):
+        self.gb.sync_blueprints(manifest_path=self.manifest)
+        del self.unreal.assets['/Game/Blueprints/Security/BP_SecurityCamera']
+        summary = self.gb.sync_blueprints(manifest_path=self.manifest)
+        self.assertEqual(summary['created'], ['/Game/Blueprints/Security/BP_SecurityCamera'])
+
+    def test_precomputed_plan_is_applied_in_one_batch(self):
+        plan_path = os.path.join(self.tmp.name, 'plan.json')
+        result = blueprint_planner.plan(SPEC, [], {})
+        with open(plan_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        summary = self.gb.apply_plan_file(plan_path, self.manifest)
+        self.assertEqual(len(summary['created']), TOTAL)
+        self.assertEqual(self.unreal.calls['save_dirty_packages'], 1)
+        # El manifiesto escrito deja la siguiente pasada sin cambios
+        summary = self.gb.sync_blueprints(manifest_path=self.manifest)
+        self.assertEqual(len(summary['unchanged']), TOTAL)
+
+    def test_failed_delete_keeps_previous_hash_or_drops_path(self):
+        stale = '/Game/Blueprints/Old/BP_Old'
+        self.unreal.assets[stale] = 'Actor'
+        result = blueprint_planner.plan(SPEC, [stale], {stale: 'hash-anterior'})
+        self.gb.force_delete_asset = lambda path: False
+        summary, assets = self.gb.apply_plan(result, {stale: 'hash-anterior'})
+        self.assertEqual(summary['failed'], [stale])
+        self.assertEqual(assets[stale], 'hash-anterior')
+        # Plan precalculado con otro manifiesto: no hay hash que conservar
+        summary, assets = self.gb.apply_plan(result, {})
+        self.assertEqual(summary['failed'], [stale])
+        self.assertNotIn(stale, assets)
+
+    def test_spec_root_is_respected(self):
+        spec = dict(SPEC, root='/Game/Twin')
+        summary = self.gb.sync_blueprints(spec, self.manifest)
+        self.assertEqual(len(summary['created']), TOTAL)
+        self.assertIn('/Game/Twin/Blueprints/BP_WebSocketManager', self.unreal.assets)
+        self.assertFalse(any(p.startswith('/Game/Blueprints/') for p in self.unreal.assets))
+        # Un plan precalculado lleva su root
+        result = blueprint_planner.plan(dict(SPEC, root='/Mod'), [], {})
+        self.assertEqual(result['root'], '/Mod')
+        self.gb.apply_plan(result)
+        self.assertIn('/Mod/Blueprints/BP_WebSocketManager', self.unreal.assets)
+
+    def test_default_manifest_lives_in_saved_dir(self):
+        self.gb.setup_digital_twin()
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, self.gb.MANIFEST_NAME)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Pruebas de readonly_db.py: garantías de solo lectura, snapshots y registro de consultas.
+
+Ejecutar: python -m pytest test_readonly_db.py
+"""
+import gc
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import readonly_db
+from readonly_db import QUERY_LOG_ENV, connect_readonly, read_snapshot
+
+
+class ReadOnlyTest(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.dir = tmpdir.name
+        self.path = os.path.join(self.dir, "store.db")
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v INTEGER)")
+        conn.executemany("INSERT INTO t (v) VALUES (?)", ((i,) for i in range(10)))
+        conn.commit()
+        conn.close()
+
+    def open(self, **kwargs):
+        conn = connect_readonly(self.path, **kwargs)
+        self.addCleanup(conn.close)
+        return conn
+
+    def test_rejects_writes(self):
+        conn = self.open()
+        for sql in ("INSERT INTO t (v) VALUES (1)", "CREATE TABLE u (x)",
+                    "UPDATE t SET v = 0", "DROP TABLE t"):
+            with self.subTest(sql=sql):
+                with self.assertRaises(sqlite3.OperationalError):
+                    conn.execute(sql)
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 10)
+
+    def test_missing_file_is_not_created(self):
+        missing = os.path.join(self.dir, "no_existe.db")
+        with self.assertRaises(sqlite3.OperationalError):
+            connect_readonly(missing)
+        self.assertFalse(os.path.exists(missing))
+
+    def test_pragmas(self):
+        conn = self.open(mmap_size=1 << 20, cache_kib=2048)
+        self.assertEqual(conn.execute("PRAGMA query_only").fetchone()[0], 1)
+        self.assertEqual(conn.execute("PRAGMA mmap_size").fetchone()[0], 1 << 20)
+        self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -2048)
+        self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0],
+                         readonly_db.BUSY_TIMEOUT_MS)
+
+    def test_snapshot_is_consistent_while_another_connection_writes(self):
+        reader = self.open()
+        writer = sqlite3.connect(self.path)
+        self.addCleanup(writer.close)
+        with read_snapshot(reader):
+            before = reader.execute("SELECT COUNT(*), SUM(v) FROM t").fetchone()
+            writer.execute("INSERT INTO t (v) VALUES (100)")
+            writer.execute("UPDATE t SET v = v + 1")
+            writer.commit()  # WAL: el lector no bloquea el commit
+            self.assertEqual(reader.execute("SELECT COUNT(*), SUM(v) FROM t").fetchone(), before)
+        self.assertEqual(reader.execute("SELECT COUNT(*), SUM(v) FROM t").fetchone(), (11, 156))
+        self.assertFalse(reader.in_transaction)
+
+    def test_query_log_env(self):
+        log_path = os.path.join(self.dir, "queries.jsonl")
+        with mock.patch.dict(os.environ, {QUERY_LOG_ENV: log_path}):
+            conn = connect_readonly(self.path)
+        conn.execute("SELECT v FROM t WHERE id = 3").fetchone()
+        log = conn.query_log
+        self.assertFalse(log.closed)
+        conn.close()
+        self.assertTrue(log.closed)
+        with open(log_path, encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        self.assertIn("SELECT v FROM t WHERE id = 3", [line["sql"] for line in lines])
+
+    def test_query_log_closed_when_connection_is_released(self):
+        with mock.patch.dict(os.environ, {QUERY_LOG_ENV: os.path.join(self.dir, "q.jsonl")}):
+            conn = connect_readonly(self.path)
+        log = conn.query_log
+        del conn
+        gc.collect()
+        self.assertTrue(log.closed)
+
+    def test_own_trace_is_left_to_the_caller(self):
+        seen = []
+        with mock.patch.dict(os.environ, {QUERY_LOG_ENV: os.path.join(self.dir, "q.jsonl")}):
+            conn = self.open(trace=seen.append)
+        conn.execute("SELECT 1")
+        self.assertIsNone(conn.query_log)
+        self.assertIn("SELECT 1", seen)
+        self.assertFalse(os.path.exists(os.path.join(self.dir, "q.jsonl")))
+
+
+if __name__ == "__main__":
+    unittest.main()